@@ -0,0 +1,49 @@
+"""
+Run benchmarks:
+    python -m tests.benchmarks --save baseline.json
+    python -m tests.benchmarks --compare baseline.json --threshold 0.25
+
+The comparison exits with code 1 if any metric has regressed beyond the threshold.
+"""
+import argparse
+import json
+import sys
+
+from tests.benchmarks.runner import compare, run_all
+from tests.benchmarks.suite import BENCHMARKS
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks")
+    parser.add_argument("names", nargs="*",
+                        help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--save", metavar="PATH", help="save results as a json baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare results with a baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative change treated as a regression, 0.25 by default")
+    parser.add_argument("--scale", type=float, default=1.0, help="size scale factor")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of every benchmark")
+    parser.add_argument("--child", metavar="NAME", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    if args.child:
+        print(json.dumps(BENCHMARKS[args.child](args.scale)))
+        return 0
+
+    results = run_all(args.names, args.scale, args.repeat)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if compare(baseline, results, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
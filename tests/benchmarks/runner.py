@@ -0,0 +1,85 @@
+"""
+Benchmark runner: runs every benchmark in a fresh interpreter (so peak RSS is not shared),
+stores results as a json baseline and compares results with a baseline.
+"""
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from tests.benchmarks.suite import BENCHMARKS
+
+
+# Peak RSS growth of a few megabytes is noise, cost changes below it are not regressions
+MIN_COST_CHANGE = 1.0
+
+
+def higher_is_better(metric: str) -> bool:
+    """Throughput metrics are named *_per_s, the rest are costs"""
+    return metric.endswith("_per_s")
+
+
+def run_benchmark(name: str, scale: float = 1.0, repeat: int = 3) -> dict:
+    """
+    Run a benchmark several times in subprocesses keeping the best value of every metric.
+
+    :param name: benchmark name, one of BENCHMARKS keys
+    :param scale: size scale factor
+    :param repeat: number of runs
+    :return: dict with metrics
+    """
+    best = {}
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-m", "tests.benchmarks", "--child", name,
+                                 "--scale", str(scale)],
+                                stdout=subprocess.PIPE, check=True)
+        for metric, value in json.loads(output.stdout.decode()).items():
+            pick = max if higher_is_better(metric) else min
+            best[metric] = pick(best[metric], value) if metric in best else value
+    return best
+
+
+def run_all(names=None, scale: float = 1.0, repeat: int = 3) -> dict:
+    """
+    Run benchmarks.
+
+    :param names: benchmark names, all by default
+    :param scale: size scale factor
+    :param repeat: number of runs of every benchmark
+    :return: dict with results and run details
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        started = time.perf_counter()
+        results[name] = run_benchmark(name, scale, repeat)
+        print(f"{name} ({time.perf_counter() - started:.1f}s): "
+              + ", ".join(f"{metric}={value:.2f}" for metric, value in results[name].items()),
+              file=sys.stderr)
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "scale": scale, "results": results}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.25) -> list:
+    """
+    Compare benchmark results with a baseline.
+
+    :param baseline: results stored by run_all
+    :param current: results made by run_all
+    :param threshold: relative change treated as a regression, e.g. 0.25 for 25%
+    :return: list with regression descriptions, empty if there are none
+    """
+    regressions = []
+    for name, metrics in current["results"].items():
+        for metric, value in metrics.items():
+            base = baseline["results"].get(name, {}).get(metric)
+            if not base:
+                continue
+            change = (value - base) / base
+            regressed = (change < -threshold if higher_is_better(metric)
+                         else change > threshold and value - base > MIN_COST_CHANGE)
+            line = f"{name}.{metric}: {base:.2f} -> {value:.2f} ({change:+.1%})"
+            print(("REGRESSION " if regressed else "") + line, file=sys.stderr)
+            if regressed:
+                regressions.append(line)
+    return regressions
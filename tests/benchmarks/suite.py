@@ -0,0 +1,179 @@
+"""
+Benchmarks of the session and endpoint hot paths against a local stub HTTP server.
+
+Every benchmark takes a size scale factor and returns a dict with metrics. Metrics named
+*_per_s are throughputs (higher is better), the rest (like peak_rss_mb) are costs
+(lower is better).
+"""
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from zephyr.scale.cloud import models
+from zephyr.scale.cloud.endpoints.endpoints import TestExecutionEndpoints
+from zephyr.scale.zephyr_session import ZephyrSession
+from tests.stub_server import StubServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the process in megabytes"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def pages_responder(total: int, item_size: int):
+    """Responder serving `total` items of about `item_size` bytes with Cloud pagination"""
+    item = {"id": 0, "key": "TEST-T0", "objective": "x" * item_size}
+    page_cache = {}
+
+    def responder(method, path, body):
+        start_at = int(re.search(r"startAt=(\d+)", path).group(1)) if "startAt=" in path else 0
+        max_results = int(re.search(r"maxResults=(\d+)", path).group(1))
+        if (start_at, max_results) not in page_cache:
+            values = [dict(item, id=i) for i in range(start_at, min(start_at + max_results, total))]
+            is_last = start_at + max_results >= total
+            next_url = f"http://stub/testcases?maxResults={max_results}&startAt={start_at + max_results}"
+            page_cache[(start_at, max_results)] = json.dumps(
+                {"next": None if is_last else next_url, "startAt": start_at,
+                 "maxResults": max_results, "total": total, "isLast": is_last,
+                 "values": values}).encode()
+        return 200, page_cache[(start_at, max_results)], {}
+    return responder
+
+
+def session_requests(scale: float) -> dict:
+    """Requests per second through ZephyrSession._request, sequential and from a thread pool"""
+    count = int(2000 * scale)
+    with StubServer() as server:
+        zsession = ZephyrSession(server.url, token="token", pool_maxsize=16)
+        started = time.perf_counter()
+        for _ in range(count):
+            zsession.get("healthcheck")
+        sequential = count / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(16) as executor:
+            list(executor.map(lambda _: zsession.get("healthcheck"), range(count)))
+        threaded = count / (time.perf_counter() - started)
+    return {"sequential_requests_per_s": sequential, "threaded_requests_per_s": threaded}
+
+
+def _paginated(scale: float, **kwargs) -> dict:
+    total = int(50000 * scale)
+    with StubServer(pages_responder(total, 200)) as server:
+        zsession = ZephyrSession(server.url, token="token", **kwargs)
+        rss_before = peak_rss_mb()
+        started = time.perf_counter()
+        count = sum(1 for _ in zsession.get_paginated("testcases", {"maxResults": 1000}))
+        elapsed = time.perf_counter() - started
+    assert count == total, f"Got {count} items instead of {total}"
+    return {"items_per_s": total / elapsed, "peak_rss_mb": peak_rss_mb() - rss_before}
+
+
+def paginated(scale: float) -> dict:
+    """Items per second and peak RSS growth through get_paginated fetching pages sequentially"""
+    return _paginated(scale)
+
+
+def paginated_prefetch(scale: float) -> dict:
+    """Items per second and peak RSS growth through get_paginated with 4 prefetched pages"""
+    return _paginated(scale, prefetch_pages=4)
+
+
+def paginated_stream(scale: float) -> dict:
+    """Items per second and peak RSS growth through get_paginated parsing pages incrementally"""
+    return _paginated(scale, stream_pages=True)
+
+
+def bulk_create(scale: float) -> dict:
+    """Test executions created per second by TestExecutionEndpoints.create_test_executions"""
+    count = int(2000 * scale)
+    executions = ({"projectKey": "TEST", "testCaseKey": f"TEST-T{i}", "testCycleKey": "TEST-R1",
+                   "statusName": "Pass"} for i in range(count))
+    with StubServer(lambda method, path, body: (201, {"id": 1}, {})) as server:
+        zsession = ZephyrSession(server.url, token="token", pool_maxsize=16)
+        report = TestExecutionEndpoints(zsession).create_test_executions(executions, workers=16)
+    assert len(report.succeeded) == count, f"Bulk creation failed: {report}"
+    return {"items_per_s": report.throughput}
+
+
+def post_file_upload(scale: float) -> dict:
+    """Upload speed and peak RSS growth of ZephyrSession.post_file"""
+    size = int(64 * 1024 * 1024 * scale)
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "upload.bin")
+        with open(file_path, "wb") as file:
+            for _ in range(size // (1024 * 1024)):
+                file.write(os.urandom(1024 * 1024))
+            file.write(os.urandom(size % (1024 * 1024)))
+
+        with StubServer(discard_body=True) as server:
+            zsession = ZephyrSession(server.url, token="token")
+            rss_before = peak_rss_mb()
+            started = time.perf_counter()
+            zsession.post_file("attachments", file_path)
+            elapsed = time.perf_counter() - started
+    return {"megabytes_per_s": size / (1024 * 1024) / elapsed,
+            "peak_rss_mb": peak_rss_mb() - rss_before}
+
+
+def execution_json(index: int) -> str:
+    """Cloud test execution response json"""
+    base = "https://api.zephyrscale.smartbear.com/v2"
+    return json.dumps({
+        "id": index, "key": f"TEST-E{index}", "project": {"id": 10000, "self": f"{base}/projects/10000"},
+        "testCase": {"self": f"{base}/testcases/TEST-T{index % 2000}/versions/1", "id": index % 2000},
+        "environment": {"id": 1, "self": f"{base}/environments/1"}, "jiraProjectVersion": None,
+        "testExecutionStatus": {"id": index % 4, "self": f"{base}/statuses/{index % 4}"},
+        "actualEndDate": "2024-01-01T10:00:00Z", "estimatedTime": 138000, "executionTime": 120000,
+        "executedById": "5b10a2844c20165700ede21g", "assignedToId": "5b10a2844c20165700ede21g",
+        "comment": "Test failed user could not login", "automated": False,
+        "testCycle": {"self": f"{base}/testcycles/{index % 50}", "id": index % 50},
+        "customFields": {"Build Number": 20, "Release Date": "2020-01-01", "Pre-Condition(s)": None},
+        "links": {"self": f"{base}/testexecutions/{index}/links", "issues": []}})
+
+
+def models_memory(scale: float) -> dict:
+    """Memory taken by test executions as response dicts and as compact models"""
+    count = int(100000 * scale)
+    documents = [execution_json(i) for i in range(count)]
+
+    def measure(build):
+        tracemalloc.start()
+        try:
+            started = time.perf_counter()
+            items = [build(document) for document in documents]
+            elapsed = time.perf_counter() - started
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(items) == count
+        return size / (1024 * 1024), count / elapsed
+
+    dict_mb, dict_per_s = measure(json.loads)
+    model_mb, model_per_s = measure(lambda document: models.TestExecution.from_dict(
+        json.loads(document)))
+    return {"dict_mb": dict_mb, "model_mb": model_mb, "dict_items_per_s": dict_per_s,
+            "model_items_per_s": model_per_s}
+
+
+BENCHMARKS = {benchmark.__name__: benchmark for benchmark in (session_requests,
+                                                              paginated,
+                                                              paginated_prefetch,
+                                                              paginated_stream,
+                                                              bulk_create,
+                                                              post_file_upload,
+                                                              models_memory)}
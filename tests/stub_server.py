@@ -0,0 +1,100 @@
+"""Local HTTP/1.1 keep-alive stub server for tests and benchmarks"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+
+def default_responder(method, path, body):
+    """Respond with a small json body to any request"""
+    return 200, {"method": method, "path": path, "size": len(body)}, {}
+
+
+class _ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.stub.lock:
+            self.server.stub.connections.add(self.client_address)
+
+    def log_message(self, *args):
+        pass
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            size = 0
+            while True:
+                chunk_size = int(self.rfile.readline().strip(), 16)
+                if chunk_size == 0:
+                    self.rfile.readline()
+                    return size
+                while chunk_size:
+                    read = len(self.rfile.read(min(chunk_size, 1024 * 1024)))
+                    size += read
+                    chunk_size -= read
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length", 0))
+        if self.server.stub.discard_body:
+            remaining = length
+            while remaining:
+                remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+            return length
+        return self.rfile.read(length)
+
+    def _handle(self):
+        body = self._read_body()
+        stub = self.server.stub
+        with stub.lock:
+            stub.requests += 1
+        status, content, headers = stub.responder(self.command, self.path,
+                                                  body if isinstance(body, bytes) else b"")
+        if not isinstance(content, bytes):
+            content = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+
+class StubServer:
+    """
+    Threaded HTTP/1.1 server listening on localhost. It keeps track of the number of requests
+    and distinct client connections, so connection reuse could be checked.
+
+    :param responder: callable(method, path, body) returning (status, content, headers)
+    :param discard_body: do not keep non-chunked request bodies in memory
+    """
+    def __init__(self, responder=default_responder, discard_body=False):
+        self.responder = responder
+        self.discard_body = discard_body
+        self.lock = threading.Lock()
+        self.connections = set()
+        self.requests = 0
+        self._server = _ThreadingServer(("127.0.0.1", 0), _Handler)
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        """Base url of the server"""
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
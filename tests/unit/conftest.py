@@ -0,0 +1,38 @@
+import pytest
+
+from zephyr.scale.fake_backend import CLOUD, SERVER, FakeZephyrAdapter
+from zephyr.scale.scale import API_V1, API_V2, ZephyrScale
+
+
+FAKE_URL = "https://fake.zephyr/"
+BASE_URLS = {CLOUD: (f"{FAKE_URL}v2/", API_V2), SERVER: (f"{FAKE_URL}rest/atm/1.0/", API_V1)}
+
+
+@pytest.fixture
+def fake_zscale_factory():
+    """
+    Factory of ZephyrScale objects sending requests to the given FakeZephyrAdapter,
+    for tests which need several objects or ZephyrScale arguments (e.g. retry or hooks).
+    """
+    def factory(adapter, **kwargs):
+        base_url, api_version = BASE_URLS[adapter.api]
+        return ZephyrScale(base_url=base_url, api_version=api_version, token="token_test",
+                           adapters={FAKE_URL: adapter}, **kwargs)
+    return factory
+
+
+@pytest.fixture
+def fake_zscale(request, fake_zscale_factory):
+    """
+    ZephyrScale object sending requests to an in-memory FakeZephyrAdapter, Cloud by default.
+    Parametrize it indirectly with a dict of FakeZephyrAdapter arguments to change the backend,
+    e.g. {"api": "server", "page_size": 2}. Modules seed their entities with the adapter fixture.
+    """
+    options = dict(getattr(request, "param", {}))
+    return fake_zscale_factory(FakeZephyrAdapter(options.pop("api", CLOUD), **options))
+
+
+@pytest.fixture
+def adapter(fake_zscale):
+    """FakeZephyrAdapter the fake_zscale requests are sent to"""
+    return fake_zscale.api.session._session.get_adapter(FAKE_URL)
@@ -0,0 +1,162 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+from requests import HTTPError
+
+from zephyr.scale.scale import AsyncZephyrScale
+from zephyr.scale.zephyr_session import InvalidAuthData
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from zephyr.scale.async_session import AsyncZephyrSession  # noqa: E402
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+async def handle_cases(request):
+    start_at = int(request.query.get("startAt", 0))
+    values = list(range(10))[start_at:start_at + 4]
+    return web.json_response({"values": values,
+                              "isLast": start_at + 4 >= 10,
+                              "next": str(request.url.with_query(startAt=start_at + 4, maxResults=4))})
+
+
+async def handle_case(request):
+    if request.match_info["key"] == "missing":
+        return web.json_response({"message": "not found"}, status=404)
+    return web.json_response({"key": request.match_info["key"],
+                              "auth": request.headers.get("Authorization")})
+
+
+def read_field(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    return value.file.read().decode()
+
+
+async def handle_automation(request):
+    form = await request.post()
+    return web.json_response({"file": read_field(form["file"]),
+                              "testCycle": read_field(form["testCycle"]),
+                              "autoCreate": request.query.get("autoCreateTestCases")})
+
+
+async def handle_junit(request):
+    form = await request.post()
+    with zipfile.ZipFile(io.BytesIO(form["file"].file.read())) as archive:
+        return web.json_response({"filename": form["file"].filename,
+                                  "files": sorted(archive.namelist())})
+
+
+async def with_server(coro_func):
+    app = web.Application()
+    app.router.add_get("/testcases", handle_cases)
+    app.router.add_get("/testcases/{key}", handle_case)
+    app.router.add_post("/automations/executions/custom", handle_automation)
+    app.router.add_post("/automations/executions/junit", handle_junit)
+    async with TestServer(app) as server:
+        async with AsyncZephyrScale(base_url=str(server.make_url("/")), token="token_test") as zscale:
+            return await coro_func(zscale)
+
+
+@pytest.mark.unit
+class TestAsyncZephyrSession:
+    def test_auth_exception(self):
+        with pytest.raises(InvalidAuthData):
+            AsyncZephyrSession("test.com")
+
+    def test_token_keeps_session_headers(self):
+        session = AsyncZephyrSession("test.com", token="token_test",
+                                     session_attrs={"headers": {"User-Agent": "test"}})
+
+        assert session._session_attrs["headers"] == {"User-Agent": "test",
+                                                     "Authorization": "Bearer token_test"}
+
+    def test_get(self):
+        async def scenario(zscale):
+            return await zscale.api.test_cases.get_test_case("TEST-T1")
+
+        assert run(with_server(scenario)) == {"key": "TEST-T1", "auth": "Bearer token_test"}
+
+    def test_concurrent_gets(self):
+        async def scenario(zscale):
+            keys = [f"TEST-T{i}" for i in range(50)]
+            cases = await asyncio.gather(*(zscale.api.test_cases.get_test_case(key) for key in keys))
+            return keys, [case["key"] for case in cases]
+
+        keys, result = run(with_server(scenario))
+        assert keys == result
+
+    def test_error_status(self):
+        async def scenario(zscale):
+            with pytest.raises(HTTPError):
+                await zscale.api.test_cases.get_test_case("missing")
+
+        run(with_server(scenario))
+
+    def test_get_paginated(self):
+        async def scenario(zscale):
+            return [value async for value in zscale.api.test_cases.get_test_cases(maxResults=4)]
+
+        assert run(with_server(scenario)) == list(range(10))
+
+    def test_post_file(self, tmp_path):
+        report = tmp_path / "report.zip"
+        report.write_bytes(b"zip content")
+
+        async def scenario(zscale):
+            return await zscale.api.automations.post_custom_format("TEST", str(report),
+                                                                   auto_create=True,
+                                                                   test_cycle={"name": "cycle"})
+
+        assert run(with_server(scenario)) == {"file": "zip content",
+                                              "testCycle": '{"name": "cycle"}',
+                                              "autoCreate": "true"}
+
+    def test_post_reports_directory(self, tmp_path):
+        (tmp_path / "reports").mkdir()
+        for name in ("TEST-a.xml", "TEST-b.xml"):
+            (tmp_path / "reports" / name).write_text("<testsuite/>")
+
+        async def scenario(zscale):
+            return await zscale.api.automations.post_junit_xml_format("TEST", tmp_path / "reports")
+
+        assert run(with_server(scenario)) == {"filename": "reports.zip",
+                                              "files": ["TEST-a.xml", "TEST-b.xml"]}
+
+    def test_post_reports_missing_path(self, tmp_path):
+        async def scenario(zscale):
+            return await zscale.api.automations.post_junit_xml_format("TEST",
+                                                                      str(tmp_path / "missing"))
+
+        with pytest.raises(FileNotFoundError):
+            run(with_server(scenario))
+
+    def test_post_reports_progress(self, tmp_path):
+        (tmp_path / "reports").mkdir()
+        (tmp_path / "reports" / "TEST-a.xml").write_text("<testsuite/>")
+        (tmp_path / "report.zip").write_bytes(b"zip content")
+        zipped, archived = [], []
+
+        async def scenario(zscale):
+            await zscale.api.automations.post_junit_xml_format(
+                "TEST", tmp_path / "reports", progress=lambda *sent: zipped.append(sent))
+            return await zscale.api.automations.post_custom_format(
+                "TEST", str(tmp_path / "report.zip"), test_cycle={"name": "cycle"},
+                progress=lambda *sent: archived.append(sent))
+
+        assert run(with_server(scenario))["file"] == "zip content"
+        assert zipped and zipped[-1][0] > 0 and zipped[-1][1] is None
+        assert archived == [(11, 11)]
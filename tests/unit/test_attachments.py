@@ -0,0 +1,139 @@
+import io
+from urllib.parse import urlparse
+
+import pytest
+from requests import ConnectionError as RequestsConnectionError, Response
+from requests.adapters import BaseAdapter
+
+from zephyr.scale.scale import API_V1, ZephyrScale
+from zephyr.scale.server.attachments import AttachmentTransfer
+from zephyr.scale.server.endpoints.paths import ServerPaths
+
+
+class _BrokenStream(io.BytesIO):
+    """Response body dropping the connection after `limit` bytes"""
+    def __init__(self, content, limit):
+        super().__init__(content)
+        self.limit = limit
+
+    def read(self, size=-1):
+        if self.tell() >= self.limit:
+            raise RequestsConnectionError("Connection dropped")
+        return super().read(min(size, self.limit - self.tell()) if size >= 0 else -1)
+
+
+class FileServerAdapter(BaseAdapter):
+    """Transport adapter serving files with Range requests support"""
+    def __init__(self, files, drop_after=None):
+        super().__init__()
+        self.files = files
+        self.drop_after = drop_after
+        self.ranges = []
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        content = self.files[urlparse(request.url).path]
+        start = int(request.headers.get("Range", "bytes=0-")[6:-1])
+        self.ranges.append(start)
+        response = Response()
+        response.request = request
+        response.url = request.url
+        if start >= len(content):
+            response.status_code = 416
+            response.raw = io.BytesIO(b"")
+            return response
+        response.status_code = 206 if start else 200
+        drop_after = self.drop_after.pop(0) if self.drop_after else None
+        body = content[start:]
+        response.raw = _BrokenStream(body, drop_after) if drop_after else io.BytesIO(body)
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.mark.unit
+class TestAttachmentTransfer:
+    @pytest.mark.parametrize("fake_zscale", [{"api": "server"}], indirect=True)
+    def test_upload_dedupe(self, fake_zscale, tmp_path, mocker):
+        screenshot = tmp_path / "screenshot.png"
+        screenshot.write_bytes(b"png" * 1000)
+        copy = tmp_path / "copy.png"
+        copy.write_bytes(b"png" * 1000)
+        log = tmp_path / "run.log"
+        log.write_text("log")
+        post_file = mocker.spy(fake_zscale.api.session, "post_file")
+        items = [(ServerPaths.RES_ATTACH.format(result_id), str(path))
+                 for result_id in range(1, 51) for path in (screenshot, copy, log)]
+
+        transfer = AttachmentTransfer(fake_zscale.api.session, workers=8)
+        digest = mocker.spy(transfer, "digest")
+        report = transfer.upload(items)
+
+        assert (len(report.succeeded), len(report.skipped), len(report.failed)) == (100, 50, 0)
+        assert post_file.call_count == 100
+        assert sorted(result.index
+                      for result in report.succeeded + report.skipped) == list(range(150))
+        assert all(result.item[1] == str(copy) for result in report.skipped)
+        assert digest.call_count == 150
+
+        assert len(transfer.upload(items[:3]).skipped) == 3
+
+    @pytest.mark.parametrize("fake_zscale", [{"api": "server"}], indirect=True)
+    def test_failed_upload_is_not_deduped(self, fake_zscale, tmp_path, mocker):
+        screenshot = tmp_path / "screenshot.png"
+        screenshot.write_bytes(b"png")
+        mocker.patch.object(fake_zscale.api.session, "post_file", side_effect=ValueError("failed"))
+        items = [(ServerPaths.RES_ATTACH.format(1), str(screenshot))] * 2
+
+        transfer = AttachmentTransfer(fake_zscale.api.session)
+        report = transfer.upload(items)
+
+        assert len(report.failed) == 2 and not report.skipped
+        mocker.patch.object(fake_zscale.api.session, "post_file", return_value={"id": 1})
+        assert len(transfer.upload(items).succeeded) == 1
+
+    @pytest.mark.parametrize("fake_zscale", [{"api": "server"}], indirect=True)
+    def test_upload_missing_file(self, fake_zscale, tmp_path):
+        screenshot = tmp_path / "screenshot.png"
+        screenshot.write_bytes(b"png")
+        items = [(ServerPaths.RES_ATTACH.format(1), str(tmp_path / "missing.png")),
+                 (ServerPaths.RES_ATTACH.format(1), str(screenshot))]
+
+        report = AttachmentTransfer(fake_zscale.api.session).upload(items)
+
+        assert [result.index for result in report.succeeded] == [1]
+        assert [(result.index, result.attempts) for result in report.failed] == [(0, 0)]
+        assert isinstance(report.failed[0].error, FileNotFoundError)
+
+    def test_download_resume(self, tmp_path):
+        content = bytes(range(256)) * 4000
+        adapter = FileServerAdapter({"/attachment/1": content, "/attachment/2": b"small"},
+                                    drop_after=[100000])
+        zscale = ZephyrScale(base_url="https://jira.test/rest/atm/1.0/", api_version=API_V1,
+                             token="token_test", adapters={"https://jira.test/": adapter})
+        (tmp_path / "existing.txt").write_bytes(b"done")
+
+        report = zscale.api.attachments.download_attachments(
+            [("https://jira.test/attachment/1", str(tmp_path / "big.bin")),
+             ("https://jira.test/attachment/2", str(tmp_path / "nested" / "small.txt")),
+             ("https://jira.test/attachment/3", str(tmp_path / "existing.txt"))],
+            workers=1, backoff=0)
+
+        assert (len(report.succeeded), len(report.skipped), len(report.failed)) == (2, 1, 0)
+        assert (tmp_path / "big.bin").read_bytes() == content
+        assert (tmp_path / "nested" / "small.txt").read_bytes() == b"small"
+        assert sorted(adapter.ranges) == [0, 0, 100000]
+        assert not list(tmp_path.glob("**/*.part"))
+
+    def test_download_complete_part(self, tmp_path):
+        adapter = FileServerAdapter({"/attachment/1": b"content"})
+        zscale = ZephyrScale(base_url="https://jira.test/rest/atm/1.0/", api_version=API_V1,
+                             token="token_test", adapters={"https://jira.test/": adapter})
+        (tmp_path / "file.txt.part").write_bytes(b"content")
+
+        report = AttachmentTransfer(zscale.api.session).download(
+            [("https://jira.test/attachment/1", str(tmp_path / "file.txt"))])
+
+        assert report.succeeded[0].result == str(tmp_path / "file.txt")
+        assert (tmp_path / "file.txt").read_bytes() == b"content"
+        assert adapter.ranges == [7]
@@ -0,0 +1,19 @@
+import pytest
+
+from tests.benchmarks.runner import compare
+
+
+def results(items_per_s, peak_rss_mb):
+    return {"results": {"paginated": {"items_per_s": items_per_s, "peak_rss_mb": peak_rss_mb}}}
+
+
+@pytest.mark.unit
+class TestBenchmarks:
+    @pytest.mark.parametrize("baseline, current, regressed", [
+        (results(1000, 40), results(800, 40), False),
+        (results(1000, 40), results(700, 40), True),
+        (results(1000, 40), results(1200, 60), True),
+        (results(1000, 0.2), results(1000, 0.9), False),
+    ])
+    def test_compare(self, baseline, current, regressed):
+        assert bool(compare(baseline, current, threshold=0.25)) is regressed
@@ -0,0 +1,220 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+from requests import (ConnectionError as RequestsConnectionError, ConnectTimeout, HTTPError,
+                      ReadTimeout)
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from zephyr.scale.bulk import get_many, is_retryable, run_bulk
+from zephyr.scale.cache import MemoryCache
+from zephyr.scale.cloud import endpoints as cloud_endpoints
+from zephyr.scale.cloud.endpoints.paths import CloudPaths
+from zephyr.scale.cloud.folders import FolderTree
+from zephyr.scale.scale import AsyncZephyrScale
+
+
+def http_error(status_code):
+    return HTTPError(f"Error {status_code}", response=Mock(status_code=status_code))
+
+
+@pytest.mark.unit
+class TestBulk:
+    @pytest.mark.parametrize("error, expected", [(http_error(429), True),
+                                                 (http_error(503), True),
+                                                 (http_error(400), False),
+                                                 (RequestsConnectionError(), True),
+                                                 (ValueError(), False)])
+    def test_is_retryable(self, error, expected):
+        assert is_retryable(error) is expected
+
+    @pytest.mark.parametrize("error, expected", [
+        (http_error(429), True),
+        (http_error(503), False),
+        (http_error(500), False),
+        (ReadTimeout(), False),
+        (RequestsConnectionError("Connection aborted"), False),
+        (ConnectTimeout(), True),
+        (RequestsConnectionError(MaxRetryError(None, "/", NewConnectionError(None, "refused"))),
+         True)])
+    def test_is_retryable_not_idempotent(self, error, expected):
+        assert is_retryable(error, idempotent=False) is expected
+
+    def test_create_test_executions_not_duplicated(self):
+        session = Mock()
+        session.post.side_effect = [ReadTimeout(), http_error(429), {"id": 1}]
+
+        report = cloud_endpoints.TestExecutionEndpoints(session).create_test_executions(
+            [{"testCaseKey": "TEST-T1"}, {"testCaseKey": "TEST-T2"}], workers=1, backoff=0)
+
+        assert isinstance(report.failed[0].error, ReadTimeout)
+        assert (report.failed[0].attempts, report.succeeded[0].attempts) == (1, 2)
+        assert session.post.call_count == 3
+
+    def test_run_bulk_report(self):
+        attempts = {}
+        lock = threading.Lock()
+
+        def func(item):
+            with lock:
+                attempts[item] = attempts.get(item, 0) + 1
+            if item == 3 and attempts[item] == 1:
+                raise http_error(429)
+            if item == 5:
+                raise http_error(400)
+            return item * 10
+
+        report = run_bulk(func, range(10), workers=3, retries=2, backoff=0)
+
+        assert report.total == 10
+        assert sorted(res.result for res in report.succeeded) == [i * 10 for i in range(10) if i != 5]
+        assert [(res.index, res.item, res.attempts) for res in report.failed] == [(5, 5, 1)]
+        assert attempts[3] == 2
+        assert all(res.item is None for res in report.succeeded)
+
+    def test_run_bulk_consumes_lazily(self):
+        consumed = []
+        max_ahead = []
+
+        def items():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        def func(item):
+            max_ahead.append(len(consumed) - item)
+
+        run_bulk(func, items(), workers=4)
+
+        assert len(consumed) == 100
+        assert max(max_ahead) <= 8
+
+    def test_run_bulk_counts_only(self):
+        results = []
+
+        report = run_bulk(lambda item: item / (item - 5), range(10), workers=3, retries=0,
+                          keep_results=False, on_result=results.append)
+
+        assert report.succeeded == [] and report.succeeded_count == 9 and report.total == 10
+        assert [(res.index, type(res.error)) for res in report.failed] == [(5, ZeroDivisionError)]
+        assert len(results) == 10
+
+    def test_async_session_rejected(self):
+        zscale = AsyncZephyrScale(base_url="https://fake.zephyr/v2/", token="token_test")
+
+        with pytest.raises(TypeError, match="synchronous session"):
+            zscale.api.test_executions.create_test_executions([{"testCaseKey": "TEST-T1"}])
+        with pytest.raises(TypeError, match="synchronous session"):
+            zscale.api.test_cases.get_many_test_cases(["TEST-T1", "TEST-T2"])
+        with pytest.raises(TypeError, match="FolderTree needs a synchronous session"):
+            FolderTree(zscale.api, "TEST")
+
+    def test_create_test_executions(self):
+        session = Mock()
+        session.post.side_effect = lambda endpoint, json: {"id": json["testCaseKey"]}
+        executions = ({"projectKey": "TEST", "testCaseKey": f"TEST-T{i}", "testCycleKey": "TEST-R1",
+                       "statusName": "Pass"} for i in range(20))
+
+        report = cloud_endpoints.TestExecutionEndpoints(session).create_test_executions(executions, workers=4)
+
+        assert len(report.succeeded) == 20 and not report.failed
+        assert {call.args[0] for call in session.post.call_args_list} == {"testexecutions"}
+
+    def test_post_test_steps_bulk(self):
+        posted = {}
+        lock = threading.Lock()
+        failures = {("TEST-T1", 2): [429], ("TEST-T2", 1): [503], ("TEST-T3", 0): [503]}
+
+        def post(endpoint, json):
+            key = endpoint.split("/")[1]
+            with lock:
+                chunk = len(posted.setdefault(key, []))
+                if failures.get((key, chunk)):
+                    raise http_error(failures[(key, chunk)].pop())
+                posted[key].append((json["mode"], json["items"]))
+
+        session = Mock()
+        session.post.side_effect = post
+        steps = {f"TEST-T{i}": [{"inline": {"description": f"step {n}"}} for n in range(250)]
+                 for i in range(4)}
+
+        report = cloud_endpoints.TestCaseEndpoints(session).post_test_steps_bulk(steps, workers=4,
+                                                                                 backoff=0)
+
+        assert sorted(res.result for res in report.succeeded) == [250, 250, 250]
+        assert [(res.item[0], res.error.completed) for res in report.failed] == [("TEST-T2", 100)]
+        assert [(mode, len(items)) for mode, items in posted["TEST-T1"]] == [("OVERWRITE", 100),
+                                                                            ("APPEND", 100),
+                                                                            ("APPEND", 50)]
+        assert [item for _, items in posted["TEST-T0"] for item in items] == steps["TEST-T0"]
+
+    def test_get_many(self):
+        def func(key):
+            if key == "missing":
+                raise http_error(404)
+            return {"key": key}
+
+        results = get_many(func, ["b", "a", "missing", "b", "a"], workers=2, backoff=0)
+
+        assert list(results) == ["b", "a"]
+        assert results["a"] == {"key": "a"}
+        assert list(results.errors) == ["missing"]
+        assert results.errors["missing"].response.status_code == 404
+
+    @pytest.mark.parametrize("fake_zscale", [{"latency": 0.01}], indirect=True)
+    def test_get_many_test_cases(self, fake_zscale, adapter):
+        adapter.add(CloudPaths.CASES, [{"name": f"case {i}"} for i in range(1, 11)])
+        keys = [f"TEST-T{i}" for i in range(1, 13)] * 3
+
+        results = fake_zscale.api.test_cases.get_many_test_cases(keys, workers=4, as_model=True)
+
+        assert [case.name for case in results.values()] == [f"case {i}" for i in range(1, 11)]
+        assert sorted(results.errors) == ["TEST-T11", "TEST-T12"]
+        assert adapter.calls[("GET", "CASE_KEY")] == 12
+
+    @pytest.mark.parametrize("fake_zscale", [{"latency": 0.01}], indirect=True)
+    def test_patch_test_cases(self, fake_zscale, adapter):
+        adapter.add(CloudPaths.CASES, [{"name": f"case {i}", "labels": ["smoke"] if i % 2 else []}
+                                       for i in range(1, 21)])
+
+        def add_label(test_case):
+            if "smoke" not in test_case["labels"]:
+                test_case["labels"].append("smoke")
+
+        keys = [f"TEST-T{i}" for i in range(1, 22)] + ["TEST-T1"]
+        results = fake_zscale.api.test_cases.patch_test_cases(keys, add_label, workers=4,
+                                                              backoff=0)
+
+        assert len(results.updated) == 10 and len(results.unchanged) == 10
+        assert list(results.errors) == ["TEST-T21"]
+        assert results["TEST-T2"]["labels"] == ["smoke"]
+        assert all(case["labels"] == ["smoke"] for case in adapter.entities(CloudPaths.CASES))
+        assert adapter.calls[("GET", "CASE_KEY")] == 21
+        assert adapter.calls[("PUT", "CASE_KEY")] == 10
+
+    def test_patch_test_cases_bypasses_cache(self, fake_zscale, adapter):
+        adapter.add(CloudPaths.CASES, [{"name": "case", "labels": []}])
+        fake_zscale.api.session.cache = MemoryCache(default_ttl=60)
+        fake_zscale.api.test_cases.get_test_case("TEST-T1")
+        adapter.entities(CloudPaths.CASES)[0]["labels"] = ["regression"]
+
+        fake_zscale.api.test_cases.patch_test_cases(
+            ["TEST-T1"], lambda test_case: test_case["labels"].append("smoke"))
+
+        assert adapter.entities(CloudPaths.CASES)[0]["labels"] == ["regression", "smoke"]
+
+    def test_patch_test_cycles_transform_error(self, fake_zscale, adapter):
+        adapter.add(CloudPaths.CYCLES, [{"name": "cycle"}, {"name": "other"}])
+
+        def rename(test_cycle):
+            if test_cycle["name"] == "other":
+                raise ValueError("Unexpected cycle")
+            return dict(test_cycle, name="renamed")
+
+        results = fake_zscale.api.test_cycles.patch_test_cycles(["TEST-R1", "TEST-R2"], rename)
+
+        assert results.updated == ["TEST-R1"]
+        assert isinstance(results.errors["TEST-R2"], ValueError)
+        assert [cycle["name"] for cycle in adapter.entities(CloudPaths.CYCLES)] == ["renamed",
+                                                                                     "other"]
+        assert adapter.calls[("PUT", "CYCLE_KEY")] == 1
@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from zephyr.scale.cache import CacheEntry, DiskCache, MemoryCache, SingleFlight
+from zephyr.scale.scale import DEFAULT_BASE_URL, ZephyrSession
+
+
+def response(status_code, body=None, etag=None):
+    text = json.dumps(body) if body is not None else ""
+    return Mock(status_code=status_code, text=text, headers={"ETag": etag} if etag else {},
+                json=Mock(return_value=body))
+
+
+@pytest.fixture(params=["memory", "disk"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache(default_ttl=60, ttls={"statuses*": 3600})
+    return DiskCache(str(tmp_path), default_ttl=60, ttls={"statuses*": 3600})
+
+
+@pytest.mark.unit
+class TestCache:
+    @pytest.mark.parametrize("endpoint, ttl", [("statuses", 3600), ("statuses/1", 3600),
+                                               ("testcases", 60)])
+    def test_ttl_for(self, endpoint, ttl):
+        assert MemoryCache(default_ttl=60, ttls={"statuses*": 3600}).ttl_for(endpoint) == ttl
+
+    def test_backend_roundtrip(self, cache):
+        cache.set("statuses", "key1", CacheEntry('{"id": 1}', "etag1", 10.0))
+        cache.set("projects", "key2", CacheEntry('{"id": 2}'))
+
+        entry = cache.get("statuses", "key1")
+        assert (entry.body, entry.etag, entry.expires) == ('{"id": 1}', "etag1", 10.0)
+
+        cache.invalidate("statuses")
+        assert cache.get("statuses", "key1") is None
+        assert cache.get("projects", "key2").body == '{"id": 2}'
+
+        cache.clear()
+        assert cache.get("projects", "key2") is None
+
+    def test_memory_lru_eviction(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set("c", "a", CacheEntry("a"))
+        cache.set("c", "b", CacheEntry("b"))
+        cache.get("c", "a")
+        cache.set("c", "c", CacheEntry("c"))
+
+        assert cache.get("c", "b") is None
+        assert cache.get("c", "a") is not None and len(cache) == 2
+
+    def test_disk_size_eviction(self, tmp_path):
+        cache = DiskCache(str(tmp_path), max_bytes=300)
+        for index in range(10):
+            cache.set("c", str(index), CacheEntry("x" * 50))
+
+        assert sum(f.stat().st_size for f in tmp_path.iterdir()) <= 300
+        assert cache.get("c", "9") is not None and cache.get("c", "0") is None
+
+    def test_session_cache_hit(self, cache, mocker):
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", cache=cache)
+        request_mock = mocker.patch.object(zsession._session, "request",
+                                           return_value=response(200, {"id": 1}))
+
+        assert zsession.get("statuses/1") == {"id": 1}
+        assert zsession.get("statuses/1") == {"id": 1}
+        assert zsession.get("statuses/1", params={"a": 1}) == {"id": 1}
+        assert request_mock.call_count == 2
+
+    def test_session_cache_revalidation(self, mocker):
+        cache = MemoryCache(default_ttl=0)
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", cache=cache)
+        request_mock = mocker.patch.object(zsession._session, "request",
+                                           side_effect=[response(200, {"id": 1}, etag="v1"),
+                                                        response(304)])
+
+        assert zsession.get("projects/TEST") == {"id": 1}
+        assert zsession.get("projects/TEST") == {"id": 1}
+        assert request_mock.call_args.kwargs["headers"] == {"If-None-Match": "v1"}
+
+    def test_session_cache_default_ttl(self, mocker):
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test",
+                                 cache=MemoryCache(ttls={"statuses*": 3600}))
+        request_mock = mocker.patch.object(zsession._session, "request",
+                                           side_effect=lambda *_, **__: response(200, {"id": 1}))
+
+        zsession.get("statuses/1")
+        zsession.get("statuses/1")
+        zsession.get("testcases/TEST-T1")
+        zsession.get("testcases/TEST-T1")
+        assert request_mock.call_count == 3
+
+    def test_session_cache_bypass(self, cache, mocker):
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", cache=cache)
+        request_mock = mocker.patch.object(zsession._session, "request",
+                                           side_effect=[response(200, {"name": "old"}),
+                                                        response(200, {"name": "new"})])
+
+        zsession.get("statuses/1")
+        assert zsession.get("statuses/1", use_cache=False) == {"name": "new"}
+        assert "use_cache" not in request_mock.call_args.kwargs
+        assert request_mock.call_count == 2
+
+    def test_session_cache_invalidation(self, cache, mocker):
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", cache=cache)
+        request_mock = mocker.patch.object(zsession._session, "request",
+                                           side_effect=[response(200, {"name": "old"}),
+                                                        response(200, {}),
+                                                        response(200, {"name": "new"})])
+
+        zsession.get("statuses/1")
+        zsession.put("statuses/1", json={"name": "new"})
+
+        assert zsession.get("statuses/1") == {"name": "new"}
+        assert request_mock.call_count == 3
+
+    def test_single_flight(self):
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"values": [1]}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("key", func)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do("key", func)))
+                     for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        while flight.coalesced < 4:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join()
+
+        assert len(calls) == 1 and flight.coalesced == 4
+        assert results == [{"values": [1]}] * 5
+        assert len({id(result) for result in results}) == 5
+        with pytest.raises(ValueError):
+            flight.do("key", Mock(side_effect=ValueError))
+
+    def test_session_coalesce_gets(self, mocker):
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", coalesce_gets=True)
+        request_mock = mocker.patch.object(zsession._session, "request",
+                                           return_value=response(200, {"id": 1}))
+
+        assert zsession.get("statuses/1") == {"id": 1}
+        zsession.get("statuses/1", return_raw=True)
+        zsession.post("statuses", json={})
+
+        assert request_mock.call_count == 3
+        assert zsession.single_flight.coalesced == 0
@@ -0,0 +1,62 @@
+import pytest
+from requests import HTTPError
+
+from zephyr.scale.cloud.endpoints.paths import CloudPaths
+from zephyr.scale.fake_backend import FakeZephyrAdapter
+from zephyr.scale.throttling import RetryPolicy
+
+
+@pytest.mark.unit
+class TestFakeBackend:
+    def test_cloud_crud(self, fake_zscale):
+        api = fake_zscale.api
+
+        created = api.test_cases.create_test_case("TEST", "first")
+        api.test_cases.update_test_case(created["key"], created["id"], "renamed", 1, 1, 1)
+        api.test_cases.post_test_steps(created["key"], "APPEND", [{"inline": {}}] * 3)
+
+        assert created["key"] == "TEST-T1"
+        assert api.test_cases.get_test_case("TEST-T1")["name"] == "renamed"
+        assert len(list(api.test_cases.get_test_steps("TEST-T1"))) == 3
+        with pytest.raises(HTTPError):
+            api.test_cases.get_test_case("TEST-T2")
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_cloud_pagination(self, stream, fake_zscale_factory):
+        adapter = FakeZephyrAdapter(page_size=7)
+        adapter.add(CloudPaths.CASES, [{"projectKey": "TEST" if i % 2 else "OTHER", "name": str(i)}
+                                       for i in range(40)])
+        zscale = fake_zscale_factory(adapter, stream_pages=stream)
+
+        cases = list(zscale.api.test_cases.get_test_cases(projectKey="TEST"))
+
+        assert [case["name"] for case in cases] == [str(i) for i in range(1, 40, 2)]
+        assert adapter.calls[("GET", "CASES")] == 3
+
+    def test_throttling_is_reproducible(self, fake_zscale_factory):
+        def run():
+            adapter = FakeZephyrAdapter(throttle_rate=0.3, error_rate=0.1, seed=42)
+            zscale = fake_zscale_factory(adapter, retry=RetryPolicy(total=10, backoff_factor=0))
+            for _ in range(20):
+                zscale.api.healthcheck.get_health()
+            return adapter.calls[("GET", "HEALTHCHECK")]
+
+        calls = run()
+
+        assert calls > 20
+        assert run() == calls
+
+    @pytest.mark.parametrize("fake_zscale", [{"api": "server"}], indirect=True)
+    def test_server_routes(self, fake_zscale):
+        api = fake_zscale.api
+        for i in range(5):
+            api.test_cases.create_test_case("TEST" if i < 4 else "OTHER", f"case {i}")
+        run = api.test_runs.create_test_run("TEST", "run")
+
+        found = api.test_cases.search_cases('projectKey = "TEST"', startAt=1, maxResults=2,
+                                            fields="key,name")
+        api.test_runs.create_test_results(run["key"], [{"testCaseKey": "TEST-T1"},
+                                                       {"testCaseKey": "TEST-T2"}])
+
+        assert found == [{"key": "TEST-T2", "name": "case 1"}, {"key": "TEST-T3", "name": "case 2"}]
+        assert len(api.test_runs.get_test_results(run["key"])) == 2
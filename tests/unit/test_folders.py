@@ -0,0 +1,91 @@
+import pytest
+from requests import HTTPError
+
+from zephyr.scale.cloud.endpoints.paths import CloudPaths
+from zephyr.scale.cloud.folders import FolderTree
+
+
+@pytest.fixture
+def zscale(fake_zscale, adapter):
+    adapter.add(CloudPaths.FOLDERS, [
+        {"id": 3, "name": "Auth", "parentId": 2, "folderType": "TEST_CASE", "projectKey": "TEST"},
+        {"id": 1, "name": "Regression", "parentId": None, "folderType": "TEST_CASE",
+         "projectKey": "TEST"},
+        {"id": 2, "name": "API", "parentId": 1, "folderType": "TEST_CASE", "projectKey": "TEST"},
+        {"id": 4, "name": "Regression", "parentId": None, "folderType": "TEST_CYCLE",
+         "projectKey": "TEST"},
+        {"id": 5, "name": "Orphan", "parentId": 99, "folderType": "TEST_CASE",
+         "projectKey": "TEST"},
+    ])
+    return fake_zscale
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("fake_zscale", [{"page_size": 2}], indirect=True)
+class TestFolderTree:
+    def test_load(self, zscale, adapter):
+        tree = FolderTree(zscale.api, "TEST").load(page_size=2)
+
+        assert len(tree) == 3
+        assert tree.id_of("Regression/API/Auth") == 3
+        assert tree.id_of(["Regression", "API"]) == 2
+        assert tree.id_of("/Regression/") == 1
+        assert tree.path_of(3) == "Regression/API/Auth"
+        assert tree.path_of(4) is None and "Orphan" not in tree
+        assert adapter.calls[("GET", "FOLDERS")] == 3
+
+    def test_ensure_paths(self, zscale, adapter):
+        tree = FolderTree(zscale.api, "TEST").load()
+
+        results = tree.ensure_paths(["Regression/API/Auth", "Regression/API/Users",
+                                     "Regression/UI/Login", "Regression/UI/Login", "Smoke"],
+                                    workers=4)
+
+        assert not results.errors
+        assert list(results) == ["Regression/API/Auth", "Regression/API/Users",
+                                 "Regression/UI/Login", "Smoke"]
+        assert adapter.calls[("POST", "FOLDERS")] == 4
+        assert results["Regression/API/Auth"] == 3
+        for path, folder_id in results.items():
+            assert tree.path_of(folder_id) == path
+        created = {folder["id"]: folder for folder in adapter.entities(CloudPaths.FOLDERS)}
+        login = created[results["Regression/UI/Login"]]
+        assert created[login["parentId"]]["parentId"] == 1
+
+        reloaded = FolderTree(zscale.api, "TEST").load()
+        assert reloaded.id_of("Regression/UI/Login") == results["Regression/UI/Login"]
+        assert tree.ensure_path("Regression/UI/Login") == results["Regression/UI/Login"]
+        assert adapter.calls[("POST", "FOLDERS")] == 4
+
+    def test_ensure_paths_failure(self, zscale, mocker):
+        tree = FolderTree(zscale.api, "TEST").load()
+        create_folder = zscale.api.folders.create_folder
+        error = HTTPError("Error 400", response=mocker.Mock(status_code=400))
+
+        def create(name, *args, **kwargs):
+            if name == "Broken":
+                raise error
+            return create_folder(name, *args, **kwargs)
+
+        mocker.patch("zephyr.scale.cloud.endpoints.endpoints.FolderEndpoints.create_folder",
+                     side_effect=create)
+
+        results = tree.ensure_paths(["Broken/Child", "Regression/New"])
+
+        assert results.errors == {"Broken/Child": error}
+        assert tree.path_of(results["Regression/New"]) == "Regression/New"
+        assert "Broken" not in tree
+        with pytest.raises(HTTPError):
+            tree.ensure_path("Broken")
+
+    def test_ambiguous_failure_is_not_retried(self, zscale, mocker):
+        tree = FolderTree(zscale.api, "TEST").load()
+        error = HTTPError("Error 503", response=mocker.Mock(status_code=503))
+        create_folder = mocker.patch(
+            "zephyr.scale.cloud.endpoints.endpoints.FolderEndpoints.create_folder",
+            side_effect=error)
+
+        results = tree.ensure_paths(["Smoke"], retries=2)
+
+        assert results.errors == {"Smoke": error}
+        assert create_folder.call_count == 1
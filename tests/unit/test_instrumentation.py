@@ -0,0 +1,84 @@
+import pytest
+from requests import HTTPError
+
+from zephyr.scale.cloud.endpoints.paths import CloudPaths
+from zephyr.scale.fake_backend import FakeZephyrAdapter
+from zephyr.scale.instrumentation import (LatencyCollector, LatencyHistogram, RequestHook,
+                                          endpoint_template)
+
+
+@pytest.mark.unit
+class TestInstrumentation:
+    @pytest.mark.parametrize("endpoint, template", [("testcases", "testcases"),
+                                                    ("testcases/PRJ-T1", "testcases/{}"),
+                                                    ("testcases/PRJ-T1/versions/2", "testcases/{}/versions/{}"),
+                                                    ("testcase/search", "testcase/search"),
+                                                    ("testrun/PRJ-C1/testresults", "testrun/{}/testresults"),
+                                                    ("unknown/path", "unknown/path")])
+    def test_endpoint_template(self, endpoint, template):
+        assert endpoint_template(endpoint) == template
+
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for millis in range(1, 1001):
+            histogram.record(millis / 1000)
+
+        summary = histogram.summary()
+
+        assert summary["count"] == 1000 and summary["max"] == 1.0
+        for percent in (50, 90, 99):
+            assert abs(summary[f"p{percent}"] - percent / 100) <= percent / 100 / 32
+
+    def test_latency_collector(self, fake_zscale_factory):
+        adapter = FakeZephyrAdapter(throttle_rate=0.3, seed=1)
+        adapter.add(CloudPaths.CASES, [{"projectKey": "TEST"} for _ in range(3)])
+        collector = LatencyCollector()
+        zsession = fake_zscale_factory(adapter, hooks=[collector], retry=10).api.session
+
+        for key in ("TEST-T1", "TEST-T2", "TEST-T3"):
+            zsession.get(f"testcases/{key}")
+        zsession.post("testcases", json={"projectKey": "TEST", "name": "new"})
+
+        stats = collector.stats()
+        assert set(stats) == {"GET testcases/{}", "POST testcases"}
+        assert stats["GET testcases/{}"]["count"] == 3
+        assert stats["GET testcases/{}"]["retries"] == adapter.calls[("GET", "CASE_KEY")] - 3
+        assert stats["GET testcases/{}"]["response_bytes"] > 0
+        assert stats["POST testcases"]["request_bytes"] == len(b'{"projectKey": "TEST", "name": "new"}')
+
+    def test_failing_hook(self, fake_zscale_factory):
+        class FailingHook(RequestHook):
+            def before_request(self, info):
+                raise RuntimeError("broken hook")
+
+        collector = LatencyCollector()
+        zsession = fake_zscale_factory(FakeZephyrAdapter(), hooks=[FailingHook()]).api.session
+        zsession.add_hook(collector)
+
+        with pytest.raises(HTTPError):
+            zsession.get("testcases/TEST-T1")
+        assert collector.stats()["GET testcases/{}"]["errors"] == 1
+
+        zsession.remove_hook(collector)
+        zsession.get("healthcheck")
+        assert "GET healthcheck" not in collector.stats()
+
+    def test_opentelemetry_spans(self, fake_zscale_factory):
+        pytest.importorskip("opentelemetry.sdk")
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        from zephyr.scale.instrumentation import OpenTelemetryHook
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        zsession = fake_zscale_factory(FakeZephyrAdapter(),
+                                       hooks=[OpenTelemetryHook(provider.get_tracer("test"))])
+        zsession = zsession.api.session
+
+        zsession.get("healthcheck")
+
+        span, = exporter.get_finished_spans()
+        assert span.name == "GET healthcheck"
+        assert span.attributes["http.response.status_code"] == 200
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from zephyr.scale.scale import ZephyrSession
+from zephyr.utils.json_stream import PageStream
+from tests.stub_server import StubServer
+
+
+def chunked(data: bytes, size: int):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+PAGE = {"next": "https://test.com/testcases?startAt=3", "startAt": 0, "maxResults": 3,
+        "values": [{"id": 1, "name": "Кейс ✓", "labels": ["a", "b"], "steps": [{"n": 1.5}]},
+                   {"id": 22, "customFields": {"nested": {"deep": [1, 2, [3]]}}, "n": None},
+                   12345],
+        "total": 1000, "isLast": False}
+
+
+@pytest.mark.unit
+class TestPageStream:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 100000])
+    def test_values_and_fields(self, chunk_size):
+        page = PageStream(chunked(json.dumps(PAGE, ensure_ascii=False).encode(), chunk_size))
+
+        assert list(page.values()) == PAGE["values"]
+        assert page.has_values
+        assert page.fields == {key: value for key, value in PAGE.items() if key != "values"}
+
+    def test_values_are_yielded_lazily(self):
+        body = json.dumps({"isLast": True, "values": list(range(1000))}).encode()
+        read = []
+
+        def chunks():
+            for chunk in chunked(body, 16):
+                read.append(chunk)
+                yield chunk
+
+        values = PageStream(chunks()).values()
+        assert next(values) == 0
+        assert len(read) < 5
+
+    def test_no_values(self):
+        page = PageStream([b'{"errorCode": 404, "message": "no"}'])
+
+        assert list(page.values()) == []
+        assert not page.has_values and page.fields["errorCode"] == 404
+
+    @pytest.mark.parametrize("body", [b'{"values": [{"id": 1}, {"id"', b'["values"]', b''])
+    def test_invalid_body(self, body):
+        with pytest.raises(ValueError):
+            list(PageStream(chunked(body, 4)).values())
+
+    def test_session_streamed_pagination(self):
+        items = [{"id": i, "script": "x" * 100} for i in range(250)]
+
+        def responder(method, path, body):
+            start_at = int(path.split("startAt=")[1].split("&")[0]) if "startAt=" in path else 0
+            is_last = start_at + 100 >= len(items)
+            return 200, {"values": items[start_at:start_at + 100], "isLast": is_last,
+                         "next": f"https://test.com/testcases?maxResults=100&startAt={start_at + 100}",
+                         "startAt": start_at, "maxResults": 100}, {}
+
+        with StubServer(responder) as server:
+            zsession = ZephyrSession(server.url, token="token_test", stream_pages=True)
+            result = list(zsession.get_paginated("testcases", params={"maxResults": 100}))
+
+        assert result == items
+        assert server.requests == 3
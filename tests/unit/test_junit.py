@@ -0,0 +1,114 @@
+import io
+import json
+import tracemalloc
+from email.parser import BytesParser
+
+import pytest
+
+from tests.unit.test_zip_stream import RecordingAdapter, read_archive
+from zephyr.scale.scale import ZephyrScale
+from zephyr.utils.junit import iter_junit_executions, junit_files, shard_executions
+
+
+REPORT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<testsuites>
+  <testsuite name="suite" tests="4">
+    <testcase classname="tests.Login" name="test_ok"><system-out>all good</system-out></testcase>
+    <testcase classname="tests.Login" name="test_PROJ-T12_fails">
+      <failure message="assert 1 == 2">Traceback</failure>
+      <system-out>%s</system-out>
+    </testcase>
+    <testcase classname="tests.Login" name="test_skipped"><skipped/></testcase>
+    <testcase name="test_error"><error message="boom"/></testcase>
+    <system-out>suite level output</system-out>
+  </testsuite>
+</testsuites>
+"""
+
+
+def large_report(cases: int, output_size: int) -> io.BytesIO:
+    """JUnit report with a number of passed test cases each one with a large system-out"""
+    output = b"x" * output_size
+    body = b"".join(b'<testcase classname="c" name="t%d"><system-out>%s</system-out></testcase>'
+                    % (i, output) for i in range(cases))
+    return io.BytesIO(b'<testsuite name="large">' + body + b"</testsuite>")
+
+
+@pytest.mark.unit
+class TestJUnit:
+    def test_executions(self):
+        report = io.BytesIO(REPORT % (b"line\n" * 1000))
+        report.name = "/reports/TEST-login.xml"
+
+        executions = list(iter_junit_executions(report, max_output=100, chunk_size=64))
+
+        assert [execution["result"] for execution in executions] == ["Passed", "Failed",
+                                                                     "Not Executed", "Failed"]
+        assert executions[0] == {"source": "TEST-login.xml", "result": "Passed",
+                                 "testCase": {"name": "tests.Login.test_ok"},
+                                 "comment": "all good"}
+        assert executions[1]["testCase"] == {"name": "tests.Login.test_PROJ-T12_fails",
+                                             "key": "PROJ-T12"}
+        assert executions[1]["comment"].startswith("assert 1 == 2\nTraceback\n\nline\nline")
+        assert executions[1]["comment"].endswith("[4900 characters truncated]")
+        assert executions[3]["comment"] == "boom"
+
+    def test_drop_output(self):
+        executions = list(iter_junit_executions(io.BytesIO(REPORT % b"output"), max_output=0))
+
+        assert "comment" not in executions[0]
+
+    def test_bounded_memory(self):
+        report = large_report(50, 1024 * 1024)
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in iter_junit_executions(report))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert count == 50
+        assert peak < 5 * 1024 * 1024
+
+    def test_shards(self):
+        executions = [{"source": "a.xml", "result": "Passed", "testCase": {"name": f"t{i}"}}
+                      for i in range(100)]
+
+        shards = list(shard_executions(executions, max_bytes=1000))
+
+        assert all(len(shard) <= 1000 for shard in shards)
+        assert [execution for shard in shards
+                for execution in json.loads(shard)["executions"]] == executions
+        assert json.loads(shards[0])["version"] == 1
+
+    def test_junit_files(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        for name in ("b.xml", "a.xml", "notes.txt", "sub/c.xml"):
+            (tmp_path / name).write_text("<testsuite/>")
+
+        assert junit_files(tmp_path) == [str(tmp_path / name) for name in ("a.xml", "b.xml",
+                                                                           "sub/c.xml")]
+        assert junit_files(tmp_path / "a.xml") == [str(tmp_path / "a.xml")]
+
+    def test_post_junit_xml_sharded(self, tmp_path):
+        for index in range(3):
+            (tmp_path / f"TEST-{index}.xml").write_bytes(large_report(20, 500).getvalue())
+        adapter = RecordingAdapter()
+        zscale = ZephyrScale(base_url="https://fake.zephyr/v2/", token="token_test",
+                             adapters={"https://fake.zephyr/": adapter})
+
+        report = zscale.api.automations.post_junit_xml_sharded(
+            "TEST", tmp_path, test_cycle={"name": "nightly"}, max_shard_bytes=4096, max_output=100)
+
+        assert len(report.succeeded) == len(adapter.bodies) > 3 and not report.failed
+        assert all(result.result["testCycle"]["key"] for result in report.succeeded)
+        assert adapter.calls[("POST", "AUT_CUSTOM")] == len(adapter.bodies)
+        executions = []
+        for headers, body in adapter.bodies:
+            message = BytesParser().parsebytes(
+                f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode() + body)
+            file_part = message.get_payload()[0]
+            for name, content in read_archive(file_part.get_payload(decode=True)).items():
+                assert name.startswith("executions-") and len(content) <= 4096
+                executions.extend(json.loads(content)["executions"])
+        assert len(executions) == 60
@@ -0,0 +1,107 @@
+from unittest.mock import Mock
+
+import pytest
+
+from zephyr.scale.cloud.mirror import ProjectMirror
+
+
+def make_case(index, status_id=1, name=None):
+    return {"id": index, "key": f"TEST-T{index}", "name": name or f"case {index}",
+            "folder": {"id": index % 3}, "status": {"id": status_id},
+            "createdOn": f"2024-01-{index + 1:02d}T00:00:00Z"}
+
+
+def paginated(items, fail_at=None):
+    def get_items(startAt=0, **params):
+        for index, item in enumerate(items[startAt:], start=startAt):
+            if index == fail_at:
+                raise ConnectionError("network is down")
+            yield item
+    return Mock(side_effect=get_items)
+
+
+@pytest.fixture
+def api():
+    api = Mock()
+    api.test_cases.get_test_cases = paginated([make_case(i) for i in range(10)])
+    api.test_cycles.get_test_cycles = paginated([])
+    api.test_executions.get_test_executions = paginated(
+        [{"id": 1, "key": "TEST-E1", "testExecutionStatus": {"id": 5},
+          "actualEndDate": "2024-02-01T00:00:00Z"}])
+    return api
+
+
+@pytest.mark.unit
+class TestProjectMirror:
+    def test_sync_and_query(self, api, tmp_path):
+        mirror = ProjectMirror(api, "TEST", str(tmp_path / "mirror.db"), page_size=4)
+
+        stats = mirror.sync_all()
+
+        assert [(s.entity, s.fetched, s.changed) for s in stats] == [("test_cases", 10, 10),
+                                                                     ("test_cycles", 0, 0),
+                                                                     ("test_executions", 1, 1)]
+        assert [case["key"] for case in mirror.query("test_cases", folder_id=1)] == ["TEST-T1",
+                                                                                     "TEST-T4",
+                                                                                     "TEST-T7"]
+        assert mirror.get("test_cases", "TEST-T2") == make_case(2)
+        assert len(mirror.query("test_cases", updated_after="2024-01-08T00:00:00Z")) == 2
+        assert mirror.query("test_executions", status_id=5)[0]["key"] == "TEST-E1"
+
+    def test_incremental_sync(self, api, tmp_path):
+        mirror = ProjectMirror(api, "TEST", str(tmp_path / "mirror.db"), page_size=4)
+        mirror.sync_all()
+
+        cases = [make_case(i) for i in range(10)]
+        cases[3] = make_case(3, status_id=2)
+        api.test_cases.get_test_cases = paginated(cases)
+
+        assert mirror.sync("test_cases").changed == 1
+        assert mirror.query("test_cases", status_id=2) == [cases[3]]
+
+        mirror.sync("test_executions")
+        assert (api.test_executions.get_test_executions.call_args.kwargs["actualEndDateAfter"]
+                == "2024-02-01T00:00:00Z")
+
+    def test_resume_from_checkpoint(self, api, tmp_path):
+        cases = [make_case(i) for i in range(10)]
+        api.test_cases.get_test_cases = paginated(cases, fail_at=9)
+        mirror = ProjectMirror(api, "TEST", str(tmp_path / "mirror.db"), page_size=4)
+
+        with pytest.raises(ConnectionError):
+            mirror.sync("test_cases")
+        assert mirror.get_state("test_cases")["checkpoint"] == 8
+        assert len(mirror.query("test_cases")) == 8
+
+        api.test_cases.get_test_cases = paginated(cases)
+        stats = mirror.sync("test_cases")
+
+        assert api.test_cases.get_test_cases.call_args.kwargs["startAt"] == 8
+        assert (stats.fetched, stats.changed) == (2, 2)
+        assert mirror.get_state("test_cases")["checkpoint"] == 0
+        assert len(mirror.query("test_cases")) == 10
+
+    def test_delete_missing(self, api, tmp_path):
+        db_path = str(tmp_path / "mirror.db")
+        mirror = ProjectMirror(api, "TEST", db_path, page_size=4)
+        other = ProjectMirror(api, "OTHER", db_path, page_size=4)
+        mirror.sync_all()
+        api.test_cases.get_test_cases = paginated([make_case(i) for i in range(100, 102)])
+        other.sync("test_cases")
+
+        cases = [make_case(i) for i in range(10) if i not in (2, 5)]
+        api.test_cases.get_test_cases = paginated(cases, fail_at=6)
+        with pytest.raises(ConnectionError):
+            mirror.sync("test_cases")
+        api.test_cases.get_test_cases = paginated(cases)
+        assert mirror.sync("test_cases").deleted == 0
+        assert len(mirror.query("test_cases")) == 10
+
+        stats = mirror.sync("test_cases")
+
+        assert (stats.fetched, stats.changed, stats.deleted) == (8, 0, 2)
+        assert mirror.query("test_cases") == cases
+        assert len(other.query("test_cases")) == 2
+        api.test_executions.get_test_executions = paginated([])
+        assert mirror.sync("test_executions").deleted == 0
+        assert len(mirror.query("test_executions")) == 1
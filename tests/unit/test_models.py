@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from tests.benchmarks.suite import execution_json
+from zephyr.scale.cloud import models
+from zephyr.scale.cloud.endpoints.paths import CloudPaths
+from zephyr.scale.pagination import PaginationCursor
+
+
+@pytest.fixture
+def zscale(fake_zscale, adapter):
+    adapter.add(CloudPaths.EXECUTIONS, [json.loads(execution_json(i)) for i in range(25)])
+    adapter.add(CloudPaths.STATUSES, [{"id": 1, "name": "Pass", "color": "#00ff00",
+                                       "project": {"id": 10000, "self": "https://p/10000"}}])
+    return fake_zscale
+
+
+@pytest.mark.unit
+class TestModels:
+    def test_round_trip(self):
+        data = json.loads(execution_json(7))
+
+        execution = models.TestExecution.from_dict(data)
+
+        assert (execution.id, execution.key, execution.comment) == (7, "TEST-E7", data["comment"])
+        assert execution.test_case.id == 7
+        assert execution.jira_project_version is None
+        assert execution.custom_fields == data["customFields"]
+        assert execution.links == data["links"]
+        assert execution.to_dict() == data
+        assert not hasattr(execution, "__dict__")
+
+    def test_interned_references(self):
+        first, second = (models.TestExecution.from_dict(json.loads(execution_json(i)))
+                         for i in (4, 8))
+
+        assert first.project is second.project
+        assert first.test_execution_status is second.test_execution_status
+        assert first.executed_by_id is second.executed_by_id
+        assert first.test_case is not second.test_case
+        assert models.Ref.of({"id": 1}) != models.AccountRef.of({"accountId": 1})
+
+    def test_unknown_fields_are_kept(self):
+        test_case = models.TestCase.from_dict({"id": 1, "key": "TEST-T1", "labels": ["smoke"],
+                                               "owner": {"accountId": "abc", "self": "u"},
+                                               "testScript": {"self": "s"}, "newField": 1})
+
+        assert test_case.labels == ("smoke",)
+        assert test_case.owner.id == "abc"
+        assert test_case.test_script == {"self": "s"}
+        assert test_case.custom_fields is None
+        assert test_case.to_dict()["newField"] == 1
+        assert test_case.to_dict()["owner"] == {"accountId": "abc", "self": "u"}
+
+    def test_endpoints_as_model(self, zscale):
+        executions = zscale.api.test_executions.get_test_executions(as_model=True)
+
+        first = next(executions)
+        rest = list(executions)
+
+        assert isinstance(first, models.TestExecution) and len(rest) == 24
+        assert isinstance(executions.cursor, PaginationCursor) and executions.cursor.done
+        assert "as_model" not in executions.cursor.params
+        assert isinstance(zscale.api.test_executions.get_test_execution("TEST-E3", as_model=True),
+                          models.TestExecution)
+        status = zscale.api.statuses.get_status(1, as_model=True)
+        assert (status.name, status.project.id) == ("Pass", 10000)
+        assert zscale.api.statuses.get_status(1)["name"] == "Pass"
+
+    def test_decode_async_results(self):
+        async def get():
+            return {"id": 1, "name": "folder", "folderType": "TEST_CASE"}
+
+        async def get_paginated():
+            for index in range(3):
+                yield {"id": index}
+
+        async def scenario():
+            folder = await models.decode(get(), models.Folder)
+            folders = [value async for value in models.decode(get_paginated(), models.Folder)]
+            return folder, folders
+
+        loop = asyncio.new_event_loop()
+        try:
+            folder, folders = loop.run_until_complete(scenario())
+        finally:
+            loop.close()
+
+        assert (folder.name, folder.folder_type) == ("folder", "TEST_CASE")
+        assert [value.id for value in folders] == [0, 1, 2]
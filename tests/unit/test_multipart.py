@@ -0,0 +1,115 @@
+import io
+from email.parser import BytesParser
+
+import pytest
+from requests import Request
+
+from tests.stub_server import StubServer
+from zephyr.scale.throttling import RetryPolicy
+from zephyr.scale.zephyr_session import ZephyrSession
+from zephyr.utils.multipart import MultipartEncoder, form_fields
+
+
+def parse(body: bytes, content_type: str) -> dict:
+    """Parse a multipart body into {name: (filename, content)}"""
+    headers = f"Content-Type: {content_type}\r\n\r\n".encode()
+    message = BytesParser().parsebytes(headers + body)
+    assert message.is_multipart() and message.defects == []
+    return {part.get_param("name", header="content-disposition"):
+            (part.get_filename(), part.get_payload(decode=True)) for part in message.get_payload()}
+
+
+@pytest.mark.unit
+class TestMultipartEncoder:
+    def test_matches_requests_encoding(self, tmp_path):
+        file_path = tmp_path / "report.json"
+        file_path.write_bytes(b'{"result": "pass"}' * 1000)
+        with open(file_path, "rb") as file:
+            body = MultipartEncoder([("testCycle", '{"name": "cycle"}'),
+                                     ("file", ("report.json", file, "application/json"))],
+                                    chunk_size=1000)
+            encoded = b"".join(body)
+        with open(file_path, "rb") as file:
+            prepared = Request("POST", "https://test.com/", data={"testCycle": '{"name": "cycle"}'},
+                               files={"file": ("report.json", file, "application/json")}).prepare()
+
+        assert len(encoded) == body.len
+        assert parse(encoded, body.content_type) == parse(prepared.body,
+                                                          prepared.headers["Content-Type"])
+
+    def test_scalar_fields(self):
+        data = {"id": 1, "ratio": 1.5, "automated": True, "folder": None, "labels": ["a", "b"]}
+        body = MultipartEncoder(form_fields(data) + [("file", ("data.bin", b"content"))])
+        prepared = Request("POST", "https://test.com/", data=data,
+                           files={"file": ("data.bin", b"content")}).prepare()
+
+        assert form_fields(data) == [("id", "1"), ("ratio", "1.5"), ("automated", "True"),
+                                     ("labels", "a"), ("labels", "b")]
+        assert parse(body.read(), body.content_type) == parse(prepared.body,
+                                                              prepared.headers["Content-Type"])
+        scalar = MultipartEncoder({"id": 7})
+        assert parse(scalar.read(), scalar.content_type) == {"id": (None, b"7")}
+
+    def test_unknown_size_and_rewind(self):
+        body = MultipartEncoder({"file": ("data.bin", iter([b"a" * 10, b"b" * 10]))})
+
+        assert not hasattr(body, "len")
+        assert parse(body.read(), body.content_type) == {"file": ("data.bin", b"a" * 10 + b"b" * 10)}
+        with pytest.raises(io.UnsupportedOperation):
+            body.seek(0)
+
+    def test_seek_and_progress(self):
+        progress = []
+        body = MultipartEncoder({"file": ("data.bin", io.BytesIO(b"x" * 100))}, chunk_size=16,
+                                callback=lambda read, total: progress.append((read, total)))
+
+        first = body.read()
+        assert body.tell() == body.len == len(first)
+        assert body.seek(0) == 0
+        assert body.read(10) + body.read() == first
+        assert progress[-2:] == [(10, body.len), (body.len, body.len)]
+
+
+@pytest.mark.unit
+class TestPostFile:
+    def test_post_file_streams_body(self, tmp_path):
+        file_path = tmp_path / "junit.xml"
+        file_path.write_bytes(b"<testsuite/>" * 10000)
+        received = []
+
+        def responder(method, path, body):
+            received.append(body)
+            return 201, {"testCycle": {"key": "TEST-R1"}}, {}
+
+        progress = []
+        with StubServer(responder) as server:
+            zsession = ZephyrSession(server.url, token="token_test")
+            result = zsession.post_file("automations/executions/junit", str(file_path),
+                                        to_files={"testCycle": (None, '{"name": "cycle"}',
+                                                                "application/json")},
+                                        data={"projectKey": "TEST"},
+                                        progress=lambda read, total: progress.append(read))
+
+        assert result == {"testCycle": {"key": "TEST-R1"}}
+        assert len(received) == 1
+        assert progress[-1] == len(received[0])
+
+    def test_retry_resends_whole_body(self, tmp_path):
+        file_path = tmp_path / "junit.xml"
+        file_path.write_bytes(b"<testsuite/>" * 1000)
+        received = []
+
+        def responder(method, path, body):
+            received.append(body)
+            if len(received) == 1:
+                return 429, {}, {"Retry-After": "0"}
+            return 201, {}, {}
+
+        with StubServer(responder) as server:
+            zsession = ZephyrSession(server.url, token="token_test",
+                                     retry=RetryPolicy(total=2, backoff_factor=0))
+            zsession.post_file("automations/executions/junit", str(file_path))
+
+        assert len(received) == 2
+        assert received[0] == received[1]
+        assert received[0].count(b"<testsuite/>") == 1000
@@ -0,0 +1,88 @@
+import pytest
+
+from zephyr.scale.pagination import FileCheckpoint, PaginationCursor
+from zephyr.scale.scale import DEFAULT_BASE_URL, ZephyrSession
+
+ITEMS = list(range(23))
+
+
+def param(params, name, default):
+    value = params.get(name, default)
+    return int(value[0] if isinstance(value, list) else value)
+
+
+def pages(fail_at=None):
+    def get_page(endpoint, params=None):
+        start_at = param(params, "startAt", 0)
+        max_results = param(params, "maxResults", 5)
+        if start_at == fail_at:
+            raise ConnectionError("network is down")
+        is_last = start_at + max_results >= len(ITEMS)
+        return {"startAt": start_at, "maxResults": max_results, "isLast": is_last,
+                "next": f"https://test.com/?maxResults={max_results}&startAt={start_at + max_results}",
+                "values": ITEMS[start_at:start_at + max_results]}
+    return get_page
+
+
+@pytest.fixture
+def zsession():
+    return ZephyrSession(DEFAULT_BASE_URL, token="token_test")
+
+
+@pytest.mark.unit
+class TestPagination:
+    def test_cursor_serialization(self):
+        cursor = PaginationCursor("testexecutions", {"projectKey": "TEST", "startAt": 5}, 10, 2)
+
+        restored = PaginationCursor.from_json(cursor.to_json())
+
+        assert restored.to_dict() == {"endpoint": "testexecutions", "params": {"projectKey": "TEST"},
+                                      "start_at": 10, "pages": 2, "done": False}
+
+    @pytest.mark.parametrize("prefetch", [0, 3])
+    def test_cursor_moves_after_page_is_consumed(self, zsession, prefetch, mocker):
+        mocker.patch.object(zsession, "get", side_effect=pages())
+        paginator = zsession.get_paginated("testcases", {"maxResults": 5}, prefetch=prefetch)
+
+        offsets = []
+        for item in paginator:
+            offsets.append((item, paginator.cursor.start_at))
+
+        assert offsets[:6] == [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (5, 5)]
+        assert (paginator.cursor.pages, paginator.cursor.done) == (5, True)
+
+    @pytest.mark.parametrize("prefetch", [0, 3])
+    def test_resume_paginated(self, zsession, prefetch, mocker):
+        mocker.patch.object(zsession, "get", side_effect=pages(fail_at=15))
+        paginator = zsession.get_paginated("testcases", {"maxResults": 5}, prefetch=prefetch)
+        consumed = []
+        with pytest.raises(ConnectionError):
+            for item in paginator:
+                consumed.append(item)
+        cursor = PaginationCursor.from_json(paginator.cursor.to_json())
+
+        get_mock = mocker.patch.object(zsession, "get", side_effect=pages())
+        resumed = list(zsession.resume_paginated(cursor, prefetch=prefetch))
+
+        assert consumed == ITEMS[:15] and resumed == ITEMS[15:]
+        assert param(get_mock.call_args_list[0].kwargs["params"], "startAt", 0) == 15
+
+    def test_seek_other_request(self, zsession):
+        paginator = zsession.get_paginated("testcases", {"projectKey": "TEST"})
+
+        with pytest.raises(ValueError):
+            paginator.seek(PaginationCursor("testcases", {"projectKey": "OTHER"}, 10))
+
+    def test_file_checkpoint(self, zsession, tmp_path, mocker):
+        checkpoint = FileCheckpoint(str(tmp_path / "cursor.json"), every=2)
+        mocker.patch.object(zsession, "get", side_effect=pages(fail_at=15))
+
+        with pytest.raises(ConnectionError):
+            list(checkpoint.resume(zsession.get_paginated("testcases", {"maxResults": 5})))
+        assert checkpoint.load().start_at == 10
+
+        mocker.patch.object(zsession, "get", side_effect=pages())
+        resumed = list(checkpoint.resume(zsession.get_paginated("testcases", {"maxResults": 5})))
+
+        assert resumed == ITEMS[10:]
+        assert checkpoint.load() is None
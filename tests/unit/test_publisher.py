@@ -0,0 +1,112 @@
+from unittest.mock import Mock
+
+import pytest
+from requests import ReadTimeout
+
+from tests.unit.test_bulk import http_error
+from zephyr.scale.server.publisher import AdaptiveBatchSize, ResultPublisher
+
+
+def make_results(count, prefix="TEST-T"):
+    return [{"testCaseKey": f"{prefix}{i}", "status": "Pass"} for i in range(count)]
+
+
+@pytest.mark.unit
+class TestResultPublisher:
+    def test_adaptive_batch_size(self):
+        batch_size = AdaptiveBatchSize(100, minimum=10, maximum=140, target_latency=1.0, step=20)
+
+        for latency in (0.5, 0.5, 0.5):
+            batch_size.observe(latency)
+        assert batch_size.size == 140
+        batch_size.observe(2.0)
+        assert batch_size.size == 70
+        for _ in range(5):
+            batch_size.observe(0.1, ok=False)
+        assert batch_size.size == 10
+
+    @pytest.mark.parametrize("fake_zscale", [{"api": "server"}], indirect=True)
+    def test_publish_runs(self, fake_zscale, adapter):
+        api = fake_zscale.api
+        publisher = ResultPublisher(api.session, batch_size=AdaptiveBatchSize(50, step=0),
+                                    max_batch_bytes=2000)
+
+        report = publisher.publish({"TEST-C1": make_results(300), "TEST-C2": make_results(120)})
+
+        assert (len(report.succeeded), len(report.failed)) == (420, 0)
+        assert len({res.result["id"] for res in report.succeeded}) == 420
+        assert "id" in report.by_run["TEST-C1"]["TEST-T299"].result
+        assert len(api.test_runs.get_test_results("TEST-C2")) == 120
+        # 2000 bytes fit less than 50 results of this size, so the size bound takes over
+        assert adapter.calls[("POST", "RUN_TEST_RESULTS")] > 300 // 50 + 120 // 50 + 2
+
+    def test_failed_batch_does_not_affect_others(self):
+        session = Mock()
+
+        def post(endpoint, json, timeout=None):
+            if any(result["testCaseKey"] == "TEST-T55" for result in json):
+                raise http_error(400)
+            return [{"id": 1} for _ in json]
+        session.post.side_effect = post
+
+        report = ResultPublisher(session, batch_size=AdaptiveBatchSize(20, step=0)).publish(
+            [("TEST-C1", make_results(100))])
+
+        assert sorted(res.index for res in report.failed) == list(range(40, 60))
+        assert len(report.succeeded) == 80
+        assert not report.by_run["TEST-C1"]["TEST-T55"].ok
+
+    def test_too_large_batch_is_split(self):
+        session = Mock()
+        batches = []
+
+        def post(endpoint, json, timeout=None):
+            if len(json) > 30:
+                raise http_error(413)
+            batches.append(len(json))
+            return [{"id": 1} for _ in json]
+        session.post.side_effect = post
+
+        report = ResultPublisher(session, batch_size=AdaptiveBatchSize(100, minimum=10, step=0),
+                                 retries=0).publish({"TEST-C1": make_results(100)})
+
+        assert len(report.succeeded) == 100 and not report.failed
+        assert max(batches) <= 30 and sum(batches) == 100
+
+    def test_batch_bounded_by_bytes_is_split(self):
+        session = Mock()
+        batches = []
+
+        def post(endpoint, json, timeout=None):
+            if len(json) > 10:
+                raise http_error(413)
+            batches.append(len(json))
+            return [{"id": 1} for _ in json]
+        session.post.side_effect = post
+        results = [dict(result, comment="x" * 100000) for result in make_results(100)]
+
+        report = ResultPublisher(session, batch_size=AdaptiveBatchSize(100, minimum=50, step=0),
+                                 max_batch_bytes=4 * 1024 * 1024, retries=0).publish(
+            {"TEST-C1": results})
+
+        assert len(report.succeeded) == 100 and not report.failed
+        assert max(batches) <= 10 and sum(batches) == 100
+
+    def test_timed_out_batch_is_not_resent(self):
+        session = Mock()
+        posted = []
+
+        def post(endpoint, json, timeout=None):
+            posted.append(len(json))
+            if json[0]["testCaseKey"] == "TEST-T20":
+                raise ReadTimeout("Read timed out")
+            return [{"id": 1} for _ in json]
+        session.post.side_effect = post
+
+        report = ResultPublisher(session, batch_size=AdaptiveBatchSize(20, minimum=5, step=0),
+                                 retries=2, backoff=0).publish({"TEST-C1": make_results(60)})
+
+        assert sorted(res.index for res in report.failed) == list(range(20, 40))
+        assert all(isinstance(res.error, ReadTimeout) and res.attempts == 1
+                   for res in report.failed)
+        assert sum(posted) == 60
@@ -0,0 +1,75 @@
+import pytest
+
+from zephyr.scale.cloud.endpoints.paths import CloudPaths
+from zephyr.scale.cloud.resolver import NameNotFound, NameResolver
+
+
+PROJECT = {"id": 10000, "self": "https://fake.zephyr/v2/projects/10000"}
+
+
+@pytest.fixture
+def zscale(fake_zscale, adapter):
+    adapter.add(CloudPaths.PROJECTS, [{"id": 10000, "key": "TEST"}, {"id": 10001, "key": "OTHER"}])
+    adapter.add(CloudPaths.PRIORITIES, [
+        {"id": 1, "name": "High", "index": 0, "default": False, "project": PROJECT,
+         "projectKey": "TEST"},
+        {"id": 2, "name": "Normal", "index": 1, "default": True, "project": PROJECT,
+         "projectKey": "TEST"}])
+    adapter.add(CloudPaths.STATUSES, [
+        {"id": 3, "name": "Draft", "type": "TEST_CASE", "index": 0, "archived": True,
+         "default": False, "project": PROJECT, "projectKey": "TEST"},
+        {"id": 4, "name": "Draft", "type": "TEST_CASE", "index": 1, "archived": False,
+         "default": True, "color": "#cccccc", "project": PROJECT, "projectKey": "TEST"},
+        {"id": 5, "name": "Pass", "type": "TEST_EXECUTION", "index": 0, "archived": False,
+         "default": False, "project": PROJECT, "projectKey": "TEST"}])
+    adapter.add(CloudPaths.ENVIRONMENTS, [{"id": 6, "name": "Chrome", "projectKey": "TEST"}])
+    adapter.add(CloudPaths.CASES, [{"id": 7, "name": "Login", "projectKey": "TEST"}])
+    return fake_zscale
+
+
+@pytest.mark.unit
+class TestNameResolver:
+    def test_update_test_case(self, zscale, adapter):
+        resolver = NameResolver(zscale.api, "TEST").preload()
+        gets = sum(count for (method, _), count in adapter.calls.items() if method == "GET")
+
+        resolver.update_test_case("TEST-T7", 7, "Login", priority="High", status="Draft")
+
+        assert sum(count for (method, _), count in adapter.calls.items()
+                   if method == "GET") == gets == 7
+        assert adapter.calls[("PUT", "CASE_KEY")] == 1
+        test_case = adapter.entities(CloudPaths.CASES)[0]
+        assert (test_case["project"], test_case["priority"], test_case["status"]) == (
+            {"id": 10000}, {"id": 1}, {"id": 4})
+        assert (resolver.status_id("Pass", "TEST_EXECUTION"), resolver.environment_id("Chrome"),
+                resolver.project_id("OTHER"), resolver.priority_id(2)) == (5, 6, 10001, 2)
+
+    def test_refresh_on_miss(self, zscale, adapter):
+        resolver = NameResolver(zscale.api, "TEST")
+
+        assert resolver.priority_id("High") == 1
+        adapter.add(CloudPaths.PRIORITIES, [{"id": 8, "name": "Low", "projectKey": "TEST"}])
+        assert resolver.priority_id("Low") == 8
+        assert resolver.priority_id("High") == 1
+        assert adapter.calls[("GET", "PRIORITIES")] == 2
+        with pytest.raises(NameNotFound):
+            resolver.priority("Blocker")
+        assert adapter.calls[("GET", "PRIORITIES")] == 3
+
+        lazy = NameResolver(zscale.api, "TEST", refresh_interval=60)
+        lazy.priority("High")
+        with pytest.raises(NameNotFound):
+            lazy.priority("Blocker")
+        assert adapter.calls[("GET", "PRIORITIES")] == 4
+
+    def test_update_status(self, zscale, adapter):
+        resolver = NameResolver(zscale.api, "TEST")
+
+        resolver.update_status("Draft", name="New", index=2)
+
+        status = next(status for status in adapter.entities(CloudPaths.STATUSES)
+                      if status["id"] == 4)
+        assert (status["name"], status["index"], status["default"], status["color"]) == (
+            "New", 2, True, "#cccccc")
+        assert resolver.status_id("New") == 4
+        assert adapter.calls[("GET", "STATUSES")] == 1
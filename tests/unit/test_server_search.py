@@ -0,0 +1,43 @@
+from unittest.mock import Mock
+
+import pytest
+
+from zephyr.scale.server.endpoints.paths import ServerPaths
+from zephyr.scale.server.search import search_all
+
+
+@pytest.fixture
+def zscale(fake_zscale, adapter):
+    adapter.add(ServerPaths.CASE, [{"projectKey": "TEST" if i % 5 else "OTHER", "name": f"case {i}"}
+                                   for i in range(1, 501)])
+    return fake_zscale
+
+
+@pytest.mark.unit
+class TestServerSearch:
+    @pytest.mark.parametrize("fake_zscale", [{"api": "server"}], indirect=True)
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_search_all_cases(self, zscale, adapter, workers):
+        found = list(zscale.api.test_cases.search_all_cases('projectKey = "TEST"', fields="key,name",
+                                                            page_size=30, workers=workers))
+
+        assert [case["name"] for case in found] == [f"case {i}" for i in range(1, 501) if i % 5]
+        assert set(found[0]) == {"key", "name"}
+        assert adapter.calls[("GET", "CASE_SEARCH")] >= 400 // 30 + 1
+
+    @pytest.mark.parametrize("fake_zscale", [{"api": "server"}], indirect=True)
+    def test_single_page(self, zscale, adapter):
+        found = list(zscale.api.test_runs.search_all_runs('projectKey = "TEST"'))
+
+        assert found == []
+        assert adapter.calls[("GET", "RUN_SEARCH")] == 1
+
+    def test_dedupe_overlapping_pages(self):
+        # an item inserted at the beginning while paging shifts the next page by one
+        pages = {0: [{"key": "T-3"}, {"key": "T-2"}], 2: [{"key": "T-2"}, {"key": "T-1"}], 4: []}
+        session = Mock()
+        session.get.side_effect = lambda path, params: pages.get(params["startAt"], [])
+
+        found = list(search_all(session, "testcase/search", "query", page_size=2, workers=2))
+
+        assert found == [{"key": "T-3"}, {"key": "T-2"}, {"key": "T-1"}]
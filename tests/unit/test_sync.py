@@ -0,0 +1,104 @@
+import json
+
+import pytest
+from requests import HTTPError
+
+from zephyr.scale.cloud.endpoints.paths import CloudPaths
+from zephyr.scale.cloud.sync import TestCaseSync, fingerprint
+
+
+def remote_case(index, **fields):
+    test_case = {"id": index, "key": f"TEST-T{index}", "name": f"case {index}",
+                 "projectKey": "TEST", "objective": f"objective {index}", "labels": ["b", "a"],
+                 "project": {"id": 10000}, "priority": {"id": 1}, "status": {"id": 2},
+                 "folder": {"id": 5}, "links": {"self": "..."}}
+    test_case.update(fields)
+    return test_case
+
+
+def definition(index, **fields):
+    test_case = {"name": f"case {index}", "objective": f"objective {index}",
+                 "labels": ["a", "b"], "folderId": 5,
+                 "steps": [{"inline": {"description": f"step {n}"}} for n in range(index)]}
+    test_case.update(fields)
+    return test_case
+
+
+@pytest.fixture
+def zscale(fake_zscale, adapter):
+    adapter.add(CloudPaths.CASES, [remote_case(index) for index in range(1, 11)])
+    return fake_zscale
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("fake_zscale", [{"page_size": 3}], indirect=True)
+class TestTestCaseSync:
+    def test_dry_run(self, zscale, adapter, tmp_path):
+        state_path = tmp_path / "state.json"
+        state_path.write_text(json.dumps({f"TEST-T{index}": fingerprint(definition(index)["steps"])
+                                          for index in range(1, 11) if index != 4}))
+        definitions = [definition(index) for index in range(1, 11)]
+        definitions[1]["objective"] = "changed"
+        definitions[2]["folderId"] = 6
+        definitions.append(definition(11, key="TEST-T9", name="renamed"))
+        definitions.append(definition(12))
+
+        plan = TestCaseSync(zscale.api, "TEST", state_path=str(state_path)).sync(definitions,
+                                                                                  dry_run=True)
+
+        assert plan.summary() == {"create": 1, "update": 4, "steps": 3, "unchanged": 7}
+        assert [(operation.key, operation.fields, operation.steps)
+                for operation in plan.updates] == [("TEST-T2", ("objective",), False),
+                                                   ("TEST-T3", ("folderId",), False),
+                                                   ("TEST-T4", (), True),
+                                                   ("TEST-T9", ("name", "objective"), True)]
+        assert adapter.calls[("GET", "CASES")] == 1
+        assert sum(count for (method, _), count in adapter.calls.items() if method != "GET") == 0
+
+    def test_sync(self, zscale, adapter, tmp_path):
+        state_path = str(tmp_path / "state.json")
+        definitions = [definition(index) for index in range(1, 11)] + [definition(150)]
+        definitions[0]["objective"] = "changed"
+
+        plan = TestCaseSync(zscale.api, "TEST", state_path=state_path, workers=4).sync(definitions)
+
+        assert not plan.report.failed and len(plan.report.succeeded) == 11
+        assert plan.summary() == {"create": 1, "update": 10, "steps": 11, "unchanged": 0}
+        assert adapter.calls[("POST", "CASES")] == 1
+        assert adapter.calls[("PUT", "CASE_KEY")] == 1
+        assert adapter.calls[("POST", "CASE_STEPS")] == 10 + 2
+        first = next(case for case in adapter.entities(CloudPaths.CASES) if case["id"] == 1)
+        assert (first["objective"], first["folder"], first["priority"]) == ("changed", {"id": 5},
+                                                                            {"id": 1})
+
+        second = TestCaseSync(zscale.api, "TEST", state_path=state_path).sync(definitions)
+
+        assert second.summary() == {"create": 0, "update": 0, "steps": 0, "unchanged": 11}
+        assert adapter.calls[("POST", "CASES")] == 1
+
+    def test_custom_fields_merged(self, zscale, adapter):
+        adapter.entities(CloudPaths.CASES)[0]["customFields"] = {"Team": "core", "Risk": "low"}
+        adapter.entities(CloudPaths.CASES)[1]["customFields"] = {"Team": "core", "Risk": "low"}
+        definitions = [definition(1, customFields={"Team": "core"}, steps=None),
+                       definition(2, customFields={"Risk": "high"}, steps=None)]
+
+        plan = TestCaseSync(zscale.api, "TEST").sync(definitions)
+
+        assert [(operation.key, operation.fields) for operation in plan.updates] == [
+            ("TEST-T2", ("customFields",))]
+        assert adapter.entities(CloudPaths.CASES)[1]["customFields"] == {"Team": "core",
+                                                                        "Risk": "high"}
+
+    def test_ambiguous_create_is_not_retried(self, zscale, adapter, tmp_path, mocker):
+        error = HTTPError("Error 503", response=mocker.Mock(status_code=503))
+        create_test_case = mocker.patch(
+            "zephyr.scale.cloud.endpoints.endpoints.TestCaseEndpoints.create_test_case",
+            side_effect=error)
+        definitions = [definition(1, objective="changed"), definition(150)]
+
+        plan = TestCaseSync(zscale.api, "TEST", state_path=str(tmp_path / "state.json"),
+                            retries=2).sync(definitions)
+
+        assert [(outcome.index, outcome.error) for outcome in plan.report.failed] == [(0, error)]
+        assert [outcome.index for outcome in plan.report.succeeded] == [1]
+        assert create_test_case.call_count == 1
@@ -0,0 +1,104 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+from requests import (ConnectionError as RequestsConnectionError, ConnectTimeout, HTTPError,
+                      ReadTimeout)
+
+from zephyr.scale.scale import DEFAULT_BASE_URL, ZephyrSession
+from zephyr.scale.throttling import RetryPolicy, TokenBucket, parse_retry_after
+
+SLEEP_PATH = "zephyr.scale.zephyr_session.time.sleep"
+
+
+def response(status_code, headers=None, json=None):
+    return Mock(status_code=status_code, headers=headers or {}, text="{}" if json else "",
+                json=Mock(return_value=json))
+
+
+@pytest.mark.unit
+class TestThrottling:
+    @pytest.mark.parametrize("value, expected", [("3", 3.0), ("0.5", 0.5), (None, None),
+                                                 ("garbage", None),
+                                                 ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0)])
+    def test_parse_retry_after(self, value, expected):
+        assert parse_retry_after(value) == expected
+
+    def test_token_bucket_rate(self):
+        bucket = TokenBucket(rate=200, capacity=1)
+
+        started = time.monotonic()
+        for _ in range(21):
+            bucket.acquire()
+
+        assert time.monotonic() - started >= 0.09
+
+    def test_token_bucket_adapts_to_throttling(self):
+        bucket = TokenBucket(rate=100)
+
+        bucket.update(response(429, {"Retry-After": "0.1"}))
+        assert bucket.rate == 50
+        started = time.monotonic()
+        bucket.acquire()
+        assert time.monotonic() - started >= 0.09
+
+        bucket.update(response(200))
+        assert bucket.rate == 55
+
+    @pytest.mark.parametrize("method, status, attempt, retried", [("GET", 503, 0, True),
+                                                                  ("POST", 503, 0, False),
+                                                                  ("POST", 429, 0, True),
+                                                                  ("GET", 404, 0, False),
+                                                                  ("GET", 503, 3, False)])
+    def test_retry_policy(self, method, status, attempt, retried):
+        delay = RetryPolicy(total=3).get_delay(method, attempt, response(status))
+
+        assert (delay is not None) is retried
+
+    def test_retry_policy_retry_after(self):
+        assert RetryPolicy().get_delay("POST", 0, response(429, {"Retry-After": "7"})) == 7.0
+
+    def test_session_retries_throttled_request(self, mocker):
+        sleep_mock = mocker.patch(SLEEP_PATH)
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", retry=2)
+        request_mock = mocker.patch.object(zsession._session, "request",
+                                           side_effect=[response(429, {"Retry-After": "2"}),
+                                                        RequestsConnectionError(),
+                                                        response(200, json={"id": 1})])
+
+        assert zsession.get("testcases/TEST-T1") == {"id": 1}
+        assert request_mock.call_count == 3
+        assert sleep_mock.call_args_list[0].args == (2.0,)
+
+    def test_session_gives_up(self, mocker):
+        mocker.patch(SLEEP_PATH)
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", retry=2)
+        request_mock = mocker.patch.object(zsession._session, "request", return_value=response(503))
+
+        with pytest.raises(HTTPError):
+            zsession.post("testcases", json={})
+        assert request_mock.call_count == 1
+
+        with pytest.raises(HTTPError):
+            zsession.get("testcases")
+        assert request_mock.call_count == 4
+
+    def test_session_retries_not_sent_post(self, mocker):
+        mocker.patch(SLEEP_PATH)
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", retry=2)
+        request_mock = mocker.patch.object(zsession._session, "request",
+                                           side_effect=[ConnectTimeout(), ReadTimeout(),
+                                                        response(200, json={"id": 1})])
+
+        with pytest.raises(ReadTimeout):
+            zsession.post("testcases", json={})
+        assert request_mock.call_count == 2
+
+    def test_session_without_retry(self, mocker):
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", rate_limit=100)
+        request_mock = mocker.patch.object(zsession._session, "request", return_value=response(429))
+
+        with pytest.raises(HTTPError):
+            zsession.get("testcases")
+        assert request_mock.call_count == 1
+        assert zsession.rate_limiter.rate == 50
@@ -1,8 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from requests import Session
+from requests.adapters import HTTPAdapter
 
 from zephyr.scale.scale import DEFAULT_BASE_URL, ZephyrSession
 from zephyr.scale.zephyr_session import INIT_SESSION_MSG, InvalidAuthData
+from tests.stub_server import StubServer
 
 REQUESTS_SESSION_PATH = "requests.sessions.Session"
 GETLOGGER_PATH = "logging.getLogger"
@@ -93,3 +97,54 @@ class TestZephyrSession:
     def test_post_file(self):
         """Test Post file wrapper"""
         pass
+
+    @pytest.mark.parametrize("prefetch", [0, 1, 4])
+    def test_get_paginated_prefetch(self, prefetch, mocker):
+        """Test prefetched pages are yielded in the server order"""
+        items = list(range(23))
+
+        def param(params, name, default):
+            value = params.get(name, default)
+            return int(value[0] if isinstance(value, list) else value)
+
+        def get_page(endpoint, params=None):
+            start_at = param(params, "startAt", 0)
+            max_results = param(params, "maxResults", 5)
+            values = items[start_at:start_at + max_results]
+            is_last = start_at + max_results >= len(items)
+            return {"startAt": start_at, "maxResults": max_results, "isLast": is_last,
+                    "next": f"https://test.com/?startAt={start_at + max_results}", "values": values}
+
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", prefetch_pages=prefetch)
+        get_mock = mocker.patch.object(zsession, "get", side_effect=get_page)
+
+        result = list(zsession.get_paginated("testcases", params={"maxResults": 5}))
+
+        assert result == items
+        assert get_mock.call_count >= 5
+
+    def test_pool_settings(self):
+        """Test connection pool settings and per-host adapters are mounted"""
+        host_adapter = HTTPAdapter(pool_maxsize=2)
+        zsession = ZephyrSession(DEFAULT_BASE_URL, token="token_test", pool_maxsize=32,
+                                 pool_block=True, adapters={"https://jira.test.com/": host_adapter})
+
+        adapter = zsession._session.get_adapter(DEFAULT_BASE_URL)
+        assert (adapter._pool_maxsize, adapter._pool_block) == (32, True)
+        assert zsession._session.get_adapter("https://jira.test.com/rest") is host_adapter
+
+    @pytest.mark.parametrize("pool_kwargs, max_connections", [({"pool_maxsize": 32}, 32),
+                                                              ({"pool_maxsize": 4,
+                                                                "pool_block": True}, 4)])
+    def test_connection_reuse_under_concurrency(self, pool_kwargs, max_connections):
+        """Test a session shared by a thread pool reuses its connections"""
+        with StubServer() as server:
+            zsession = ZephyrSession(server.url, token="token_test", **pool_kwargs)
+
+            with ThreadPoolExecutor(max_workers=32) as executor:
+                results = list(executor.map(lambda i: zsession.get(f"testcases/TEST-T{i}"),
+                                            range(256)))
+
+        assert [result["path"] for result in results] == [f"/testcases/TEST-T{i}" for i in range(256)]
+        assert server.requests == 256
+        assert len(server.connections) <= max_connections
@@ -0,0 +1,102 @@
+import io
+import threading
+import zipfile
+from email.parser import BytesParser
+
+import pytest
+
+from zephyr.scale.fake_backend import FakeZephyrAdapter
+from zephyr.scale.scale import ZephyrScale
+from zephyr.utils.zip_stream import ZipStream
+
+
+class RecordingAdapter(FakeZephyrAdapter):
+    """Fake backend consuming and keeping streamed request bodies"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bodies = []
+
+    def send(self, request, **kwargs):
+        body = request.body
+        if body is not None and not isinstance(body, bytes):
+            body = b"".join(body)
+        self.bodies.append((request.headers, body))
+        return super().send(request, **kwargs)
+
+
+@pytest.fixture
+def reports(tmp_path):
+    directory = tmp_path / "reports"
+    (directory / "nested").mkdir(parents=True)
+    (directory / "TEST-a.xml").write_text("<testsuite name='a'/>" * 1000)
+    (directory / "nested" / "TEST-b.xml").write_text("<testsuite name='b'/>")
+    return directory
+
+
+def read_archive(data: bytes) -> dict:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+@pytest.mark.unit
+class TestZipStream:
+    def test_directory(self, reports):
+        stream = ZipStream(reports, chunk_size=1024)
+
+        data = b"".join(stream)
+
+        assert stream.filename == "reports.zip"
+        assert read_archive(data) == {"TEST-a.xml": b"<testsuite name='a'/>" * 1000,
+                                      "nested/TEST-b.xml": b"<testsuite name='b'/>"}
+        assert b"".join(stream) == data
+
+    def test_iterable(self, reports, tmp_path):
+        extra = tmp_path / "extra.json"
+        extra.write_text("[]")
+
+        stream = ZipStream(iter([str(extra), ("renamed.xml", reports / "TEST-a.xml"),
+                                 reports / "nested"]))
+
+        assert sorted(read_archive(b"".join(stream))) == ["extra.json", "nested/TEST-b.xml",
+                                                          "renamed.xml"]
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            b"".join(ZipStream([tmp_path / "missing.xml"]))
+
+    def test_stop_reading(self, reports):
+        threads = threading.active_count()
+        chunks = iter(ZipStream(reports, chunk_size=16, queue_size=1))
+
+        next(chunks)
+        chunks.close()
+
+        assert threading.active_count() == threads
+
+    def test_post_reports_directory(self, reports):
+        adapter = RecordingAdapter()
+        zscale = ZephyrScale(base_url="https://fake.zephyr/v2/", token="token_test",
+                             adapters={"https://fake.zephyr/": adapter})
+
+        result = zscale.api.automations.post_junit_xml_format("TEST", reports,
+                                                              test_cycle={"name": "cycle"})
+
+        assert result["testCycle"]["key"]
+        headers, body = adapter.bodies[-1]
+        assert headers["Transfer-Encoding"] == "chunked"
+        message = BytesParser().parsebytes(
+            f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode() + body)
+        file_part, cycle_part = message.get_payload()
+        assert file_part.get_filename() == "reports.zip"
+        assert sorted(read_archive(file_part.get_payload(decode=True))) == ["TEST-a.xml",
+                                                                           "nested/TEST-b.xml"]
+        assert cycle_part.get_payload(decode=True) == b'{"name": "cycle"}'
+
+    def test_post_reports_missing_path(self, tmp_path):
+        adapter = RecordingAdapter()
+        zscale = ZephyrScale(base_url="https://fake.zephyr/v2/", token="token_test",
+                             adapters={"https://fake.zephyr/": adapter})
+
+        with pytest.raises(FileNotFoundError):
+            zscale.api.automations.post_junit_xml_format("TEST", tmp_path / "missing")
+        assert not adapter.bodies
@@ -1,2 +1,2 @@
-from zephyr.scale import API_V1, API_V2, ZephyrScale
+from zephyr.scale import API_V1, API_V2, AsyncZephyrScale, ZephyrScale
 from zephyr.utils.common import cookie_str_to_dict
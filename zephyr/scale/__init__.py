@@ -1 +1 @@
-from zephyr.scale.scale import API_V1, API_V2, ZephyrScale
+from zephyr.scale.scale import API_V1, API_V2, AsyncZephyrScale, ZephyrScale
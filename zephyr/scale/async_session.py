@@ -0,0 +1,304 @@
+"""
+A module for Zephyr Scale asyncio session object.
+"""
+import asyncio
+import json
+import logging
+import os
+from urllib.parse import urlparse, parse_qs
+
+from requests import HTTPError
+
+from zephyr.scale.zephyr_session import INIT_SESSION_MSG, InvalidAuthData
+from zephyr.utils.multipart import form_fields
+from zephyr.utils.zip_stream import ZipStream
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class AsyncZephyrSession:
+    """
+    Zephyr Scale asyncio session object. It has the same surface as ZephyrSession, but all
+    the request wrappers are coroutines and get_paginated is an async generator, so the same
+    endpoint wrappers could be used to run lots of calls concurrently on one event loop.
+
+    The underlying aiohttp.ClientSession is created on the first request and should be
+    closed with close() or by using the object as an async context manager.
+
+    NOTE: requires aiohttp to be installed (pip install zephyr-python-api[async]).
+
+    :param base_url: url to make requests to
+    :param token: auth token
+    :param username: username
+    :param password: password
+    :param cookies: cookie dict
+
+    :param keyword session_attrs: a dict with aiohttp.ClientSession arguments
+    :param keyword connection_limit: total number of simultaneous connections, 100 by default
+    """
+    def __init__(self, base_url, token=None, username=None, password=None, cookies=None, **kwargs):
+        if aiohttp is None:
+            raise ImportError("AsyncZephyrSession requires aiohttp. "
+                              "Install it with 'pip install zephyr-python-api[async]'")
+        self.base_url = base_url
+        self._session = None
+        self._session_attrs = dict(kwargs.get("session_attrs") or {})
+
+        self.logger = logging.getLogger(__name__)
+
+        if token:
+            self.logger.debug(INIT_SESSION_MSG.format("token"))
+            self._session_attrs["headers"] = dict(self._session_attrs.get("headers") or {},
+                                                  Authorization=f"Bearer {token}")
+        elif username and password:
+            self.logger.debug(INIT_SESSION_MSG.format("username and password"))
+            self._session_attrs["auth"] = aiohttp.BasicAuth(username, password)
+        elif cookies:
+            self.logger.debug(INIT_SESSION_MSG.format("cookies"))
+            self._session_attrs["cookies"] = cookies
+        else:
+            raise InvalidAuthData("Insufficient auth data")
+
+        self.connection_limit = kwargs.get("connection_limit", 100)
+
+    @property
+    def session(self):
+        """aiohttp.ClientSession object, created on the first access"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.connection_limit)
+            self._session = aiohttp.ClientSession(connector=connector, **self._session_attrs)
+        return self._session
+
+    async def close(self):
+        """Close the underlying aiohttp session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _create_url(self, *args):
+        """Helper for URL creation"""
+        return self.base_url + "/".join(args)
+
+    @staticmethod
+    def _prepare_params(params):
+        """Convert requests-style params to the ones accepted by aiohttp"""
+        if not params:
+            return None
+        prepared = []
+        for name, value in params.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for item in values:
+                if item is None:
+                    continue
+                if isinstance(item, bool):
+                    item = str(item).lower()
+                prepared.append((name, item))
+        return prepared
+
+    async def _request(self, method: str, endpoint: str, return_raw: bool = False, **kwargs):
+        """
+        General request wrapper with logging and handling response
+
+        :param method: request method
+        :param endpoint: endpoint to make request to
+        :param return_raw: whether to return raw response or not
+
+        :raises: HTTPError if response status code is 400 or higher
+
+        :return: response json, empty str or raw response with the body already read
+        """
+        self.logger.debug(f"{method.capitalize()} data: endpoint={endpoint} and {kwargs}")
+        url = self._create_url(endpoint)
+        kwargs["params"] = self._prepare_params(kwargs.get("params"))
+        async with self.session.request(method, url, **kwargs) as response:
+            body = await response.read()
+        if response.status < 400:
+            if return_raw:
+                return response
+            if body:
+                return json.loads(body)
+            return ""
+        raise HTTPError(f"Error {response.status}. Response: {body}")
+
+    async def get(self, endpoint: str, params: dict = None, **kwargs):
+        """
+        Get request wrapper.
+
+        :param endpoint: endpoint to make request to
+        :param params: dict with params to be passed to request
+
+        :return: response json, empty str or raw response
+        """
+        return await self._request("get", endpoint, params=params, **kwargs)
+
+    async def post(self, endpoint: str, json: dict = None, **kwargs):
+        """
+        Post request wrapper.
+
+        :param endpoint: endpoint to make request to
+        :param json: json to be passed to request
+
+        :return: response json, empty str or raw response
+        """
+        # pylint: disable=redefined-outer-name
+        return await self._request("post", endpoint, json=json, **kwargs)
+
+    async def put(self, endpoint: str, json: dict = None, **kwargs):
+        """
+        Put request wrapper
+
+        :param endpoint: endpoint to make request to
+        :param json: json to be passed to request
+
+        :return: response json, empty str or raw response
+        """
+        # pylint: disable=redefined-outer-name
+        return await self._request("put", endpoint, json=json, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs):
+        """
+        Delete request wrapper.
+
+        :param endpoint: endpoint to make request to
+
+        :return: response json, empty str or raw response
+        """
+        return await self._request("delete", endpoint, **kwargs)
+
+    async def get_paginated(self, endpoint, params=None):
+        """
+        Get request wrapper for getting paginated data. Yields values from multiple get requests
+        responses.
+
+        :param endpoint: endpoint to make request to
+        :param params: dict with params to be passed to request
+
+        :return: async generator with values from responses
+        """
+        self.logger.debug(f"Get paginated data from endpoint={endpoint} and params={params}")
+        params = dict(params or {})
+
+        while True:
+            response = await self.get(endpoint, params=params)
+            if "values" not in response:
+                return
+
+            for value in response.get("values", []):
+                yield value
+
+            if response.get("isLast") is True:
+                break
+
+            params_str = urlparse(response.get("next")).query
+            params.update(parse_qs(params_str))
+
+    async def post_file(self, endpoint: str, file_path: str, to_files=None, **kwargs):
+        """
+        Post wrapper to send a file. Handles single file opening, sending its content and closing.
+
+        :param endpoint: endpoint to make request to
+        :param file_path: path to file to be sent
+        :param to_files: dict with files to be sent along with the main file
+
+        :param keyword data: dict with form fields to be sent before the file
+        :param keyword progress: callable(sent_bytes, total_bytes) called while the file is sent
+
+        :return: response json, empty str or raw response
+        """
+        progress = kwargs.pop("progress", None)
+        with open(file_path, "rb") as file:
+            content = file
+            if progress:
+                content = _with_progress(_read_chunks(file), progress,
+                                         os.fstat(file.fileno()).st_size)
+            form = self._form(kwargs.pop("data", None),
+                              (content, os.path.basename(file_path), None), to_files)
+            return await self._request("post", endpoint, data=form, **kwargs)
+
+    async def post_reports(self, endpoint: str, reports, to_files=None, **kwargs):
+        """
+        Post wrapper to send automation reports as a zip archive file. A path to an existing
+        .zip archive is sent as is, a directory or an iterable with report files is zipped
+        on the fly in a background thread while the archive is streamed into the request.
+
+        :param endpoint: endpoint to make request to
+        :param reports: path to .zip archive, path to a directory with report files or
+            an iterable with report file paths
+        :param to_files: dict with files to be sent along with the archive
+
+        :param keyword data: dict with form fields to be sent before the archive
+        :param keyword progress: callable(sent_bytes, total_bytes) called while the archive
+            is sent, total_bytes is None for an archive zipped on the fly
+
+        :return: response json, empty str or raw response
+        :raises FileNotFoundError: if a reports path is neither a file nor a directory
+        """
+        if isinstance(reports, (str, os.PathLike)) and not os.path.isdir(reports):
+            if not os.path.isfile(reports):
+                raise FileNotFoundError(f"No such report file or directory: {reports!r}")
+            return await self.post_file(endpoint, reports, to_files, **kwargs)
+        archive = ZipStream(reports)
+        content = _iterate_in_thread(archive)
+        progress = kwargs.pop("progress", None)
+        if progress:
+            content = _with_progress(content, progress)
+        form = self._form(kwargs.pop("data", None),
+                          (content, archive.filename, "application/zip"), to_files)
+        return await self._request("post", endpoint, data=form, **kwargs)
+
+    @staticmethod
+    def _form(data, file_field: tuple, to_files):
+        """Form with data fields, the (content, filename, content_type) file and to_files"""
+        form = aiohttp.FormData()
+        for name, value in form_fields(data):
+            form.add_field(name, value)
+
+        content, filename, content_type = file_field
+        form.add_field("file", content, filename=filename, content_type=content_type)
+
+        for name, value in (to_files or {}).items():
+            if isinstance(value, tuple):
+                filename, content, *content_type = value
+                form.add_field(name, content, filename=filename,
+                               content_type=content_type[0] if content_type else None)
+            else:
+                form.add_field(name, value)
+        return form
+
+
+async def _iterate_in_thread(iterable):
+    """Async generator with the items of a blocking iterable, each one is got in a thread"""
+    loop = asyncio.get_event_loop()
+    iterator = iter(iterable)
+    try:
+        while True:
+            item = await loop.run_in_executor(None, next, iterator, None)
+            if item is None:
+                return
+            yield item
+    finally:
+        iterator.close()
+
+
+async def _read_chunks(file, chunk_size: int = 64 * 1024):
+    """Async generator with the chunks of a file object"""
+    for chunk in iter(lambda: file.read(chunk_size), b""):
+        yield chunk
+
+
+async def _with_progress(chunks, progress, total: int = None):
+    """Async generator passing the chunks through and reporting the number of bytes sent"""
+    sent = 0
+    async for chunk in chunks:
+        yield chunk
+        sent += len(chunk)
+        progress(sent, total)
@@ -0,0 +1,351 @@
+"""
+A module with helpers to run lots of API calls concurrently.
+"""
+import copy
+import inspect
+import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from requests import RequestException
+
+from zephyr.scale.throttling import RETRY_STATUSES, THROTTLED_STATUS, is_not_sent
+
+
+logger = logging.getLogger(__name__)
+
+ASYNC_SESSION_MSG = ("{} needs a synchronous session, run the coroutines of an "
+                     "AsyncZephyrScale object concurrently with asyncio.gather instead")
+
+
+def ensure_sync(session, name: str):
+    """
+    Check that the session is not an asyncio one, the bulk helpers call endpoint methods
+    from threads and would get coroutines instead of responses.
+
+    :param session: session the endpoint methods are built on
+    :param name: name of the helper for the error message
+    :raises TypeError: if the session methods are coroutines
+    """
+    if inspect.iscoroutinefunction(getattr(session, "get", None)):
+        raise TypeError(ASYNC_SESSION_MSG.format(name))
+
+
+def is_retryable(error: Exception, idempotent: bool = True) -> bool:
+    """
+    Checks whether a failed call is worth to be retried. Network errors, throttling
+    and server side errors are, client errors (like 400 or 404) are not.
+
+    A non-idempotent call (like a POST creating an entity) could have been processed
+    by the server even if it has failed on the client side, e.g. with a read timeout
+    or a 5xx from a proxy, so it is retried only if it has been throttled (429)
+    or has not been sent at all, the same way RetryPolicy does for session requests.
+
+    :param error: exception raised by the call
+    :param idempotent: whether the call could be safely repeated
+    :return: True if the call could be retried
+    """
+    if not isinstance(error, RequestException):
+        return False
+    response = getattr(error, "response", None)
+    if response is None:
+        return idempotent or is_not_sent(error)
+    if not idempotent:
+        return response.status_code == THROTTLED_STATUS
+    return response.status_code in RETRY_STATUSES
+
+
+class ChunkError(Exception):
+    """
+    Raised when a chunk of an item sent in several ordered requests fails.
+
+    :param message: error message
+    :param completed: number of sub-items sent successfully before the failure
+    """
+    def __init__(self, message, completed=0):
+        super().__init__(message)
+        self.completed = completed
+
+
+def chunked(items: list, size: int) -> list:
+    """
+    Split a list into consecutive chunks.
+
+    :param items: list to split
+    :param size: max chunk size
+    :return: list with chunks
+    """
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class BulkItemResult:
+    """
+    Outcome of a single item processed by run_bulk.
+
+    :param index: position of the item in the input iterable
+    :param item: the input item (kept for failed items or if requested)
+    :param result: value returned by the call
+    :param error: exception raised by the last attempt
+    :param attempts: number of attempts made
+    """
+    def __init__(self, index, item=None, result=None, error=None, attempts=1):
+        self.index = index
+        self.item = item
+        self.result = result
+        self.error = error
+        self.attempts = attempts
+
+    @property
+    def ok(self):
+        """Whether the item has been processed successfully"""
+        return self.error is None
+
+    def __repr__(self):
+        outcome = "ok" if self.ok else f"error={self.error!r}"
+        return f"{self.__class__.__name__}(index={self.index}, {outcome}, attempts={self.attempts})"
+
+
+class BulkReport:
+    """
+    Structured report of a bulk operation with succeeded and failed items.
+
+    :param keep_results: whether to keep outcomes of succeeded items, if False they are only
+        counted and the succeeded list stays empty
+    """
+    def __init__(self, keep_results: bool = True):
+        self.succeeded = []
+        self.failed = []
+        self.elapsed = 0.0
+        self._keep_results = keep_results
+        self._succeeded_count = 0
+        self._started = time.monotonic()
+
+    def add(self, item_result: BulkItemResult):
+        """Add an item outcome to the report"""
+        if not item_result.ok:
+            self.failed.append(item_result)
+        elif self._keep_results:
+            self.succeeded.append(item_result)
+        self._succeeded_count += item_result.ok
+        self.elapsed = time.monotonic() - self._started
+
+    @property
+    def succeeded_count(self):
+        """Number of succeeded items, kept or not"""
+        return self._succeeded_count
+
+    @property
+    def total(self):
+        """Number of processed items"""
+        return self._succeeded_count + len(self.failed)
+
+    @property
+    def throughput(self):
+        """Processed items per second"""
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(succeeded={self.succeeded_count}, "
+                f"failed={len(self.failed)}, elapsed={self.elapsed:.2f}s)")
+
+
+def call_with_retries(func, item, retries=2, backoff=0.5, idempotent=True):
+    """
+    Call func(item) retrying retryable errors with jittered exponential backoff.
+
+    :param func: callable to call
+    :param item: argument to call the callable with
+    :param retries: max number of retries
+    :param backoff: base backoff delay in seconds
+    :param idempotent: whether the call could be safely repeated, see is_retryable
+
+    :return: tuple with result, error and number of attempts made
+    :raises TypeError: if func returns an awaitable, e.g. an endpoint method of AsyncZephyrScale
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            result = func(item)
+        except Exception as error:  # pylint: disable=broad-except
+            if attempt > retries or not is_retryable(error, idempotent):
+                return None, error, attempt
+            delay = random.uniform(0, backoff * 2 ** (attempt - 1))
+            logger.debug(f"Retry attempt {attempt} in {delay:.2f}s after error: {error}")
+            time.sleep(delay)
+            continue
+        if inspect.isawaitable(result):
+            if inspect.iscoroutine(result):
+                result.close()
+            raise TypeError(ASYNC_SESSION_MSG.format("Bulk operation"))
+        return result, None, attempt
+
+
+def run_bulk(func, items, workers=8, retries=2, backoff=0.5, **kwargs):
+    """
+    Process items with func on a bounded thread pool, retrying every item individually.
+
+    The iterable is consumed lazily and no more than 2 * workers items are held at once,
+    so memory does not depend on the size of the input. Succeeded items are stored without
+    their input unless keep_items is set, failed items always keep it to allow resubmitting.
+    With keep_results=False succeeded items are only counted, so the report size depends
+    on the number of failures only, use on_result to consume the results as they come.
+
+    :param func: callable to be called with each item
+    :param items: iterable with items
+    :param workers: number of concurrent workers
+    :param retries: max number of retries for an item
+    :param backoff: base backoff delay in seconds
+
+    :param keyword idempotent: whether func could be safely repeated, False for calls creating
+        entities (e.g. POSTs), which are retried only if throttled or not sent, True by default
+    :param keyword keep_items: whether to keep input items of succeeded calls in the report
+    :param keyword keep_results: whether to keep outcomes of succeeded calls in the report,
+        True by default
+    :param keyword on_result: callable to be called with every BulkItemResult
+
+    :return: BulkReport object
+    :raises TypeError: if func returns an awaitable, bulk helpers need a synchronous session
+    """
+    idempotent = kwargs.pop("idempotent", True)
+    report = BulkReport(kwargs.pop("keep_results", True))
+    iterator = enumerate(items)
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def fill():
+            for index, item in iterator:
+                future = executor.submit(call_with_retries, func, item, retries, backoff,
+                                         idempotent)
+                pending[future] = (index, item)
+                if len(pending) >= workers * 2:
+                    return
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                _collect(report, pending.pop(future), future.result(), **kwargs)
+            fill()
+
+    logger.debug(f"Bulk operation finished: {report}")
+    return report
+
+
+def _collect(report, index_item, outcome, keep_items=False, on_result=None):
+    """Add a call outcome to the report"""
+    index, item = index_item
+    result, error, attempts = outcome
+    keep = keep_items or error is not None
+    item_result = BulkItemResult(index, item if keep else None, result, error, attempts)
+    report.add(item_result)
+    if on_result:
+        on_result(item_result)
+
+
+class KeyedResults(dict):
+    """
+    Results of get_many: a dict with keys and entities of the succeeded lookups,
+    errors of the failed ones are in the errors dict.
+    """
+    def __init__(self):
+        super().__init__()
+        self.errors = {}
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(found={len(self)}, errors={len(self.errors)}, "
+                f"elapsed={self.elapsed:.2f}s)")
+
+
+def get_many(func, keys, workers=8, retries=2, backoff=0.5):
+    """
+    Look up entities by keys concurrently on a bounded thread pool. Repeated keys are looked up
+    once, and a failed lookup (like a 404 of a missing key) does not stop the others.
+
+    :param func: callable to be called with each key, e.g. an endpoint get method
+    :param keys: iterable with keys
+    :param workers: number of concurrent lookups
+    :param retries: max number of retries for a lookup
+    :param backoff: base backoff delay in seconds
+
+    :return: KeyedResults dict with keys and entities in the input order and the errors dict
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    report = run_bulk(func, unique_keys, workers=workers, retries=retries, backoff=backoff)
+    outcomes = {outcome.index: outcome for outcome in report.succeeded + report.failed}
+
+    results = KeyedResults()
+    for index, key in enumerate(unique_keys):
+        outcome = outcomes[index]
+        if outcome.ok:
+            results[key] = outcome.result
+        else:
+            results.errors[key] = outcome.error
+    results.elapsed = report.elapsed
+    return results
+
+
+class PatchResults(KeyedResults):
+    """
+    Results of patch_many: a dict with keys and patched entities, keys of the entities
+    which have not been changed by the transform (and have not been written) are in
+    the unchanged list, errors of the failed keys are in the errors dict.
+    """
+    def __init__(self):
+        super().__init__()
+        self.unchanged = []
+
+    @property
+    def updated(self) -> list:
+        """Keys of the written entities"""
+        unchanged = set(self.unchanged)
+        return [key for key in self if key not in unchanged]
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(updated={len(self) - len(self.unchanged)}, "
+                f"unchanged={len(self.unchanged)}, errors={len(self.errors)}, "
+                f"elapsed={self.elapsed:.2f}s)")
+
+
+def patch_many(get, put, keys, transform, **kwargs):
+    """
+    Partially update entities with fetch-modify-write on a bounded thread pool: every entity
+    is got, transformed and put back in one call, so GETs and PUTs of different entities
+    are pipelined. An entity which the transform does not change is not put. A failed call
+    is retried as a whole, starting with a fresh GET.
+
+    :param get: callable to be called with a key, returning the entity dict
+    :param put: callable to be called with a key and the transformed entity dict
+    :param keys: iterable with keys, repeated keys are patched once
+    :param transform: callable to be called with a copy of the entity, modifying it in place
+        or returning the new entity
+
+    :param keyword workers: number of concurrent entities
+    :param keyword retries: max number of retries for an entity
+    :param keyword backoff: base backoff delay in seconds
+
+    :return: PatchResults dict with keys and patched entities
+    """
+    def patch(key):
+        entity = get(key)
+        patched = copy.deepcopy(entity)
+        returned = transform(patched)
+        if returned is not None:
+            patched = returned
+        if patched == entity:
+            return patched, False
+        put(key, patched)
+        return patched, True
+
+    found = get_many(patch, keys, **kwargs)
+    results = PatchResults()
+    for key, (entity, changed) in found.items():
+        results[key] = entity
+        if not changed:
+            results.unchanged.append(key)
+    results.errors = found.errors
+    results.elapsed = found.elapsed
+    logger.debug(f"Bulk patch finished: {results}")
+    return results
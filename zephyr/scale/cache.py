@@ -0,0 +1,276 @@
+"""
+A module with response cache backends for Zephyr Scale session GET requests.
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from fnmatch import fnmatch
+
+
+class CacheEntry:
+    """
+    Cached response.
+
+    :param body: response text
+    :param etag: response ETag header value
+    :param expires: timestamp the entry is considered fresh until
+    """
+    __slots__ = ("body", "etag", "expires")
+
+    def __init__(self, body: str, etag: str = None, expires: float = 0.0):
+        self.body = body
+        self.etag = etag
+        self.expires = expires
+
+    def to_dict(self):
+        """Serialize the entry"""
+        return {"body": self.body, "etag": self.etag, "expires": self.expires}
+
+
+class _Flight:
+    """A call in flight and its outcome"""
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller makes the call,
+    the ones coming while it is in flight wait for it and get (a deep copy of) its result
+    or its error. Nothing is kept after the call is done.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.coalesced = 0
+
+    def do(self, key, func):
+        """
+        Call func or wait for the call with the same key in flight.
+
+        :param key: hashable call key
+        :param func: callable without arguments
+        :return: func result
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            flight.result = func()
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        # The result is shared with the waiters, nobody gets the original to modify
+        return copy.deepcopy(flight.result) if flight.waiters else flight.result
+
+
+class ResponseCache:
+    """
+    Base class for response cache backends. Entries are grouped by collections
+    (the first segment of an endpoint path, e.g. "statuses" for "statuses/1"),
+    so a mutating request could invalidate all the related entries.
+
+    Only responses of the endpoints matching ttls patterns are returned without a request
+    by default, the rest are stored to be revalidated with their ETag every time.
+
+    :param default_ttl: time in seconds responses of the other endpoints are considered fresh
+    :param ttls: dict with endpoint patterns (fnmatch style, e.g. "statuses*")
+        and their ttls, the first matching pattern is used
+    """
+    def __init__(self, default_ttl: float = 0, ttls: dict = None):
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self._lock = threading.RLock()
+
+    def ttl_for(self, endpoint: str) -> float:
+        """
+        Get ttl for an endpoint.
+
+        :param endpoint: endpoint path
+        :return: ttl in seconds
+        """
+        for pattern, ttl in self.ttls.items():
+            if fnmatch(endpoint, pattern):
+                return ttl
+        return self.default_ttl
+
+    def get(self, collection: str, key: str):
+        """
+        Get a cached entry.
+
+        :param collection: collection the entry belongs to
+        :param key: entry key
+        :return: CacheEntry object or None
+        """
+        raise NotImplementedError
+
+    def set(self, collection: str, key: str, entry: CacheEntry):
+        """
+        Put an entry to the cache.
+
+        :param collection: collection the entry belongs to
+        :param key: entry key
+        :param entry: CacheEntry object
+        """
+        raise NotImplementedError
+
+    def invalidate(self, collection: str):
+        """
+        Remove all entries of the collection.
+
+        :param collection: collection name
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove all entries"""
+        raise NotImplementedError
+
+
+class MemoryCache(ResponseCache):
+    """
+    In-memory LRU response cache.
+
+    :param max_entries: max number of entries to keep
+    :param default_ttl: time in seconds responses of endpoints not matching ttls are
+        considered fresh
+    :param ttls: dict with endpoint patterns and their ttls
+    """
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 0, ttls: dict = None):
+        super().__init__(default_ttl=default_ttl, ttls=ttls)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, collection, key):
+        with self._lock:
+            entry = self._entries.get((collection, key))
+            if entry is not None:
+                self._entries.move_to_end((collection, key))
+            return entry
+
+    def set(self, collection, key, entry):
+        with self._lock:
+            self._entries[(collection, key)] = entry
+            self._entries.move_to_end((collection, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection):
+        with self._lock:
+            for entry_key in [entry_key for entry_key in self._entries
+                              if entry_key[0] == collection]:
+                del self._entries[entry_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache(ResponseCache):
+    """
+    On-disk response cache, which could be shared between runs. Every entry is stored in
+    a separate json file. When the total size exceeds max_bytes the least recently used
+    entries are evicted.
+
+    :param directory: directory to store entries in, created if it does not exist
+    :param max_bytes: max total size of the entries
+    :param default_ttl: time in seconds responses of endpoints not matching ttls are
+        considered fresh
+    :param ttls: dict with endpoint patterns and their ttls
+    """
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024,
+                 default_ttl: float = 0, ttls: dict = None):
+        super().__init__(default_ttl=default_ttl, ttls=ttls)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(directory)
+                         if entry.name.endswith(".json"))
+
+    def _path(self, collection, key):
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{collection}-{digest}.json")
+
+    def get(self, collection, key):
+        path = self._path(collection, key)
+        with self._lock:
+            try:
+                with open(path, encoding="utf-8") as file:
+                    data = json.load(file)
+                os.utime(path)
+            except (OSError, ValueError):
+                return None
+        if data.get("key") != key:
+            return None
+        return CacheEntry(data["body"], data.get("etag"), data.get("expires", 0.0))
+
+    def set(self, collection, key, entry):
+        path = self._path(collection, key)
+        content = json.dumps(dict(entry.to_dict(), key=key))
+        with self._lock:
+            self._size -= self._file_size(path)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(content)
+            os.replace(tmp_path, path)
+            self._size += self._file_size(path)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def invalidate(self, collection):
+        self._remove(lambda name: name.startswith(f"{collection}-"))
+
+    def clear(self):
+        self._remove(lambda name: True)
+
+    @staticmethod
+    def _file_size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _remove(self, condition):
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json") and condition(entry.name):
+                    self._size -= entry.stat().st_size
+                    os.remove(entry.path)
+
+    def _evict(self):
+        """Remove least recently used entries to fit into max_bytes"""
+        entries = sorted((entry for entry in os.scandir(self.directory)
+                          if entry.name.endswith(".json")),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if self._size <= self.max_bytes:
+                break
+            self._size -= entry.stat().st_size
+            os.remove(entry.path)
@@ -0,0 +1,82 @@
+"""
+A module with bulk operations on Zephyr Scale Cloud entities.
+"""
+from zephyr.scale.bulk import ChunkError, call_with_retries, chunked, patch_many, run_bulk
+
+
+MAX_STEPS_PER_REQUEST = 100
+
+
+def post_test_steps_bulk(test_cases, test_case_steps, mode: str = "OVERWRITE", workers: int = 8,
+                         retries: int = 2, **kwargs):
+    """
+    Post test steps of many test cases. Steps of a test case are split to chunks of
+    100 steps sent one by one in the input order: the first chunk with the given mode
+    and the rest with APPEND. Test cases are processed concurrently on a worker pool.
+
+    Every chunk is retried individually. An OVERWRITE chunk is retried on network,
+    throttling or server errors, an APPEND one only if it is throttled or has not been sent,
+    so a retry never duplicates appended steps. If a chunk still fails the test case is
+    reported as failed with a ChunkError, its completed attribute tells how many steps
+    have been posted for sure: after an ambiguous failure (e.g. a read timeout) the failed
+    chunk could have been appended as well.
+
+    :param test_cases: TestCaseEndpoints object
+    :param test_case_steps: dict or iterable of (test_case_key, steps) pairs
+    :param mode: OVERWRITE or APPEND for the first chunk of a test case
+    :param workers: number of test cases processed concurrently
+    :param retries: max number of retries for a chunk
+
+    :param keyword backoff: base backoff delay in seconds between chunk retries
+    :param keyword keep_items: whether to keep succeeded (test_case_key, steps) pairs
+        in the report
+    :param keyword on_result: callable to be called with every test case result
+
+    :return: BulkReport object, its throughput is in test cases per second and results
+        of succeeded items are numbers of posted steps
+    """
+    if isinstance(test_case_steps, dict):
+        test_case_steps = test_case_steps.items()
+    backoff = kwargs.pop("backoff", 0.5)
+
+    def post_chunk(args):
+        return test_cases.post_test_steps(*args)
+
+    def post_case(case_steps):
+        test_case_key, steps = case_steps
+        posted = 0
+        for chunk in chunked(list(steps), MAX_STEPS_PER_REQUEST):
+            chunk_mode = mode if posted == 0 else "APPEND"
+            _, error, _ = call_with_retries(post_chunk, (test_case_key, chunk_mode, chunk),
+                                            retries, backoff, chunk_mode == "OVERWRITE")
+            if error is not None:
+                raise ChunkError(f"Posting steps {posted + 1}-{posted + len(chunk)} "
+                                 f"of {test_case_key} failed: {error}", posted) from error
+            posted += len(chunk)
+        return posted
+
+    return run_bulk(post_case, test_case_steps, workers=workers, retries=0, **kwargs)
+
+
+def patch_entities(session, path: str, keys, transform, **kwargs):
+    """
+    Partially update entities concurrently with fetch-modify-write: every entity is got,
+    changed by the transform and put back as a whole, unless the transform has not changed it.
+    Updates of Cloud entities replace them, so entities are got bypassing the response cache
+    and the transform works on the current entity.
+
+    :param session: ZephyrSession object
+    :param path: entity path with a placeholder for the key, e.g. CloudPaths.CASE_KEY
+    :param keys: iterable with entity IDs or keys, repeated keys are patched once
+    :param transform: callable to be called with an entity dict, modifying it in place
+        or returning the new dict
+
+    :param keyword workers: number of concurrent entities
+    :param keyword retries: max number of retries for an entity
+    :param keyword backoff: base backoff delay in seconds
+
+    :return: PatchResults dict with keys and patched entities
+    """
+    return patch_many(lambda key: session.get(path.format(key), use_cache=False),
+                      lambda key, entity: session.put(path.format(key), json=entity),
+                      keys, transform, **kwargs)
@@ -1,10 +1,19 @@
 from json import dumps
 from typing import Union
 
+from ...bulk import get_many, run_bulk
 from ...zephyr_session import EndpointTemplate
+from .. import models
+from ..bulk import patch_entities, post_test_steps_bulk
+from ..sharded_upload import post_junit_xml_sharded
 from .paths import CloudPaths as Paths
 
 
+def _decode(result, model):
+    """Decode the result into models if a model class is given"""
+    return models.decode(result, model) if model else result
+
+
 class TestCaseEndpoints(EndpointTemplate):
     """
     Api wrapper for "Test Case" endpoints
@@ -20,9 +29,12 @@ class TestCaseEndpoints(EndpointTemplate):
         :keyword folderId: Folder ID filter
         :keyword maxResults: A hint as to the maximum number of results to return in each call
         :keyword startAt: Zero-indexed starting position. Should be a multiple of maxResults
+        :keyword as_model: whether to return TestCase models instead of dicts
         :return: dict with response body
         """
-        return self.session.get_paginated(Paths.CASES, params=kwargs)
+        as_model = kwargs.pop("as_model", False)
+        return _decode(self.session.get_paginated(Paths.CASES, params=kwargs),
+                       models.TestCase if as_model else None)
 
     def create_test_case(self, project_key: str, name: str, **kwargs):
         """Creates a test case. Fields priorityName and statusName will be set to
@@ -50,13 +62,33 @@ class TestCaseEndpoints(EndpointTemplate):
         json.update(kwargs)
         return self.session.post(Paths.CASES, json=json)
 
-    def get_test_case(self, test_case_key: str):
+    def get_test_case(self, test_case_key: str, as_model: bool = False):
         """Returns a test case for the given key
 
         :param test_case_key: The key of the test case
+        :param as_model: whether to return a TestCase model instead of a dict
         :return: dict with response body
         """
-        return self.session.get(Paths.CASE_KEY.format(test_case_key))
+        return _decode(self.session.get(Paths.CASE_KEY.format(test_case_key)),
+                       models.TestCase if as_model else None)
+
+    def get_many_test_cases(self, test_case_keys, **kwargs):
+        """
+        Returns test cases for the given keys. Test cases are requested concurrently and
+        repeated keys are requested once.
+
+        :param test_case_keys: iterable with test case keys
+
+        Keyword arguments:
+        :keyword workers: number of concurrent requests
+        :keyword retries: max number of retries for a request
+        :keyword as_model: whether to return TestCase models instead of dicts
+        :return: KeyedResults dict with keys and test cases, errors of failed lookups
+            (e.g. 404 of missing ones) are in its errors dict
+        """
+        as_model = kwargs.pop("as_model", False)
+        return get_many(lambda key: self.get_test_case(key, as_model=as_model), test_case_keys,
+                        **kwargs)
 
     def update_test_case(self,
                          test_case_key: str,
@@ -87,6 +119,23 @@ class TestCaseEndpoints(EndpointTemplate):
         return self.session.put(Paths.CASE_KEY.format(test_case_key),
                                 json=json)
 
+    def patch_test_cases(self, test_case_keys, transform, **kwargs):
+        """
+        Partially updates test cases concurrently: every test case is got, changed by
+        the transform and put back, unless the transform has not changed it.
+
+        :param test_case_keys: iterable with test case keys
+        :param transform: callable to be called with a test case dict, modifying it in place
+            or returning the new dict, e.g. a function adding a label if the test case
+            does not have it yet, so patching it again leaves the test case unchanged
+
+        Keyword arguments:
+        :keyword workers: number of concurrent test cases
+        :keyword retries: max number of retries for a test case
+        :return: PatchResults dict with keys and patched test cases
+        """
+        return patch_entities(self.session, Paths.CASE_KEY, test_case_keys, transform, **kwargs)
+
     def get_links(self, test_case_key: str):
         """Returns links for a test case with specified key"""
         return self.session.get(Paths.CASE_LINKS.format(test_case_key))
@@ -151,6 +200,25 @@ class TestCaseEndpoints(EndpointTemplate):
         return self.session.post(Paths.CASE_STEPS.format(test_case_key),
                                  json=json)
 
+    def post_test_steps_bulk(self, test_case_steps, mode: str = "OVERWRITE", workers: int = 8,
+                             retries: int = 2, **kwargs):
+        """
+        Posts test steps of many test cases concurrently, 100 steps per request, every request
+        is retried individually. See zephyr.scale.cloud.bulk.post_test_steps_bulk for details.
+
+        :param test_case_steps: dict or iterable of (test_case_key, steps) pairs
+        :param mode: OVERWRITE or APPEND for the first chunk of a test case
+        :param workers: number of test cases processed concurrently
+        :param retries: max number of retries for a chunk
+
+        Keyword arguments:
+        :keyword backoff: base backoff delay in seconds between chunk retries
+        :keyword keep_items: whether to keep succeeded (test_case_key, steps) pairs in the report
+        :keyword on_result: callable to be called with every test case result
+        :return: BulkReport object, results of succeeded items are numbers of posted steps
+        """
+        return post_test_steps_bulk(self, test_case_steps, mode, workers, retries, **kwargs)
+
 
 class TestCycleEndpoints(EndpointTemplate):
     """
@@ -167,9 +235,12 @@ class TestCycleEndpoints(EndpointTemplate):
         :keyword folderId: Folder ID filter
         :keyword maxResults: A hint as to the maximum number of results to return in each call
         :keyword startAt: Zero-indexed starting position. Should be a multiple of maxResults
+        :keyword as_model: whether to return TestCycle models instead of dicts
         :return: dict with response body
         """
-        return self.session.get_paginated(Paths.CYCLES, params=kwargs)
+        as_model = kwargs.pop("as_model", False)
+        return _decode(self.session.get_paginated(Paths.CYCLES, params=kwargs),
+                       models.TestCycle if as_model else None)
 
     def create_test_cycle(self, project_key: str, name: str, **kwargs):
         """Creates a test cycle. All required test cycle custom fields
@@ -184,14 +255,34 @@ class TestCycleEndpoints(EndpointTemplate):
         json.update(kwargs)
         return self.session.post(Paths.CYCLES, json=json)
 
-    def get_test_cycle(self, test_cycle_id_or_key: Union[str, int]):
+    def get_test_cycle(self, test_cycle_id_or_key: Union[str, int], as_model: bool = False):
         """
         Returns a test cycle for the given key
 
         :pqram test_cycle_id_or_key: The ID or key of the test cycle
+        :param as_model: whether to return a TestCycle model instead of a dict
         :return: dict with response body
         """
-        return self.session.get(Paths.CYCLE_KEY.format(test_cycle_id_or_key))
+        return _decode(self.session.get(Paths.CYCLE_KEY.format(test_cycle_id_or_key)),
+                       models.TestCycle if as_model else None)
+
+    def get_many_test_cycles(self, test_cycle_ids_or_keys, **kwargs):
+        """
+        Returns test cycles for the given IDs or keys. Test cycles are requested concurrently
+        and repeated keys are requested once.
+
+        :param test_cycle_ids_or_keys: iterable with test cycle IDs or keys
+
+        Keyword arguments:
+        :keyword workers: number of concurrent requests
+        :keyword retries: max number of retries for a request
+        :keyword as_model: whether to return TestCycle models instead of dicts
+        :return: KeyedResults dict with IDs or keys and test cycles, errors of failed lookups
+            (e.g. 404 of missing ones) are in its errors dict
+        """
+        as_model = kwargs.pop("as_model", False)
+        return get_many(lambda key: self.get_test_cycle(key, as_model=as_model),
+                        test_cycle_ids_or_keys, **kwargs)
 
     def update_test_cycle(self,
                           test_cycle_key: str,
@@ -221,6 +312,23 @@ class TestCycleEndpoints(EndpointTemplate):
         json.update(kwargs)
         return self.session.put(Paths.CYCLE_KEY.format(test_cycle_key), json=json)
 
+    def patch_test_cycles(self, test_cycle_ids_or_keys, transform, **kwargs):
+        """
+        Partially updates test cycles concurrently: every test cycle is got, changed by
+        the transform and put back, unless the transform has not changed it.
+
+        :param test_cycle_ids_or_keys: iterable with test cycle IDs or keys
+        :param transform: callable to be called with a test cycle dict, modifying it in place
+            or returning the new dict
+
+        Keyword arguments:
+        :keyword workers: number of concurrent test cycles
+        :keyword retries: max number of retries for a test cycle
+        :return: PatchResults dict with IDs or keys and patched test cycles
+        """
+        return patch_entities(self.session, Paths.CYCLE_KEY, test_cycle_ids_or_keys, transform,
+                              **kwargs)
+
     def get_links(self, test_cycle_id_or_key: Union[str, int]):
         """
         Returns links for a test cycle with specified key
@@ -334,8 +442,12 @@ class TestExecutionEndpoints(EndpointTemplate):
         """
         Returns all test executions. Query parameters can be used to filter
         by project and folder
+
+        :keyword as_model: whether to return TestExecution models instead of dicts
         """
-        return self.session.get_paginated(Paths.EXECUTIONS, params=kwargs)
+        as_model = kwargs.pop("as_model", False)
+        return _decode(self.session.get_paginated(Paths.EXECUTIONS, params=kwargs),
+                       models.TestExecution if as_model else None)
 
     def create_test_execution(self,
                               project_key: str,
@@ -354,15 +466,56 @@ class TestExecutionEndpoints(EndpointTemplate):
         json.update(kwargs)
         return self.session.post(Paths.EXECUTIONS, json=json)
 
+    def create_test_executions(self, executions, workers: int = 8, retries: int = 2, **kwargs):
+        """
+        Creates test executions in bulk. Executions are sent concurrently, each one is retried
+        individually only if it is throttled or could not be sent, so a retry never creates
+        a duplicate. The iterable is consumed lazily, so it could be a generator of any size.
+
+        :param executions: iterable with test execution dicts, each one is a request body
+            with projectKey, testCaseKey, testCycleKey, statusName and optional fields
+        :param workers: number of concurrent requests
+        :param retries: max number of retries for an execution
+
+        Keyword arguments:
+        :keyword keep_items: whether to keep succeeded execution dicts in the report
+        :keyword keep_results: False to only count succeeded executions, e.g. with on_result
+        :keyword on_result: callable to be called with every item result
+        :return: BulkReport object with succeeded and failed items
+        """
+        return run_bulk(lambda json: self.session.post(Paths.EXECUTIONS, json=json), executions,
+                        workers=workers, retries=retries, idempotent=False, **kwargs)
+
     def get_test_execution(self, test_execution_id_or_key: Union[str, int], **kwargs):
         """
         Returns a test execution for the given ID
 
         :param test_execution_id_or_key: The ID or key of the test execution
+        :keyword as_model: whether to return a TestExecution model instead of a dict
         :return: dict with response body
         """
-        return self.session.get(Paths.EXECUTIONS_KEY.format(test_execution_id_or_key),
-                                params=kwargs)
+        as_model = kwargs.pop("as_model", False)
+        return _decode(self.session.get(Paths.EXECUTIONS_KEY.format(test_execution_id_or_key),
+                                        params=kwargs),
+                       models.TestExecution if as_model else None)
+
+    def get_many_test_executions(self, test_execution_ids_or_keys, **kwargs):
+        """
+        Returns test executions for the given IDs or keys. Test executions are requested
+        concurrently and repeated keys are requested once.
+
+        :param test_execution_ids_or_keys: iterable with test execution IDs or keys
+
+        Keyword arguments:
+        :keyword workers: number of concurrent requests
+        :keyword retries: max number of retries for a request
+        :keyword as_model: whether to return TestExecution models instead of dicts
+        :return: KeyedResults dict with IDs or keys and test executions, errors of failed lookups
+            (e.g. 404 of missing ones) are in its errors dict
+        """
+        as_model = kwargs.pop("as_model", False)
+        return get_many(lambda key: self.get_test_execution(key, as_model=as_model),
+                        test_execution_ids_or_keys, **kwargs)
 
     def update_test_execution(self, test_execution_id_or_key: Union[str, int], **kwargs):
         """
@@ -410,8 +563,12 @@ class FolderEndpoints(EndpointTemplate):
     def get_folders(self, **kwargs):
         """
         Returns all folders.
+
+        :keyword as_model: whether to return Folder models instead of dicts
         """
-        return self.session.get_paginated(Paths.FOLDERS, params=kwargs)
+        as_model = kwargs.pop("as_model", False)
+        return _decode(self.session.get_paginated(Paths.FOLDERS, params=kwargs),
+                       models.Folder if as_model else None)
 
     def create_folder(self, name: str, project_key: str, folder_type: str, **kwargs):
         """
@@ -428,22 +585,30 @@ class FolderEndpoints(EndpointTemplate):
         json.update(kwargs)
         return self.session.post(Paths.FOLDERS, json=json)
 
-    def get_folder(self, folder_id: int):
+    def get_folder(self, folder_id: int, as_model: bool = False):
         """
         Returns a folder for the given ID.
 
         :param folder_id: Folder ID
+        :param as_model: whether to return a Folder model instead of a dict
         :return: dict with response body
         """
-        return self.session.get(Paths.FOLDER_KEY.format(folder_id))
+        return _decode(self.session.get(Paths.FOLDER_KEY.format(folder_id)),
+                       models.Folder if as_model else None)
 
 
 class StatusEndpoints(EndpointTemplate):
     """Api wrapper for "Status" endpoints"""
 
     def get_statuses(self, **kwargs):
-        """Returns all statuses"""
-        return self.session.get_paginated(Paths.STATUSES, params=kwargs)
+        """
+        Returns all statuses
+
+        :keyword as_model: whether to return Status models instead of dicts
+        """
+        as_model = kwargs.pop("as_model", False)
+        return _decode(self.session.get_paginated(Paths.STATUSES, params=kwargs),
+                       models.Status if as_model else None)
 
     def create_status(self, project_key: str, status_name: str, status_type: str, **kwargs):
         """
@@ -461,14 +626,16 @@ class StatusEndpoints(EndpointTemplate):
         json.update(kwargs)
         return self.session.post(Paths.STATUSES, json=json)
 
-    def get_status(self, status_id: int):
+    def get_status(self, status_id: int, as_model: bool = False):
         """
         Returns a status for the given ID
 
         :param status_id: Status ID
+        :param as_model: whether to return a Status model instead of a dict
         :return: dict with response body
         """
-        return self.session.get(Paths.STATUSES_ID.format(status_id))
+        return _decode(self.session.get(Paths.STATUSES_ID.format(status_id)),
+                       models.Status if as_model else None)
 
     def update_status(self, status_id: int, project_id: int, status_name: str,
                       index: int, archived: bool, default: bool, **kwargs):
@@ -653,7 +820,8 @@ class AutomationEndpoints(EndpointTemplate):
 
         :param path: str with resource path
         :param project_key: str with project key
-        :param file_path: str with path to .zip archive with report files
+        :param file_path: str with path to .zip archive with report files, path to a directory
+            with report files or an iterable with report file paths, which are zipped on the fly
         :param auto_create: indicate if test cases should be created if non existent
         :param test_cycle: dict with test cycle description data
         """
@@ -666,11 +834,11 @@ class AutomationEndpoints(EndpointTemplate):
         if test_cycle:
             to_files = {'testCycle': (None, dumps(test_cycle), 'application/json')}
 
-        return self.session.post_file(path,
-                                      file_path,
-                                      to_files=to_files,
-                                      params=params,
-                                      **kwargs)
+        return self.session.post_reports(path,
+                                         file_path,
+                                         to_files=to_files,
+                                         params=params,
+                                         **kwargs)
 
     def post_custom_format(self,
                            project_key,
@@ -682,7 +850,8 @@ class AutomationEndpoints(EndpointTemplate):
         Create results using Zephyr Scale's custom results format.
 
         :param project_key: str with project key
-        :param file_path: str with path to .zip archive with report files
+        :param file_path: str with path to .zip archive with report files, path to a directory
+            with report files or an iterable with report file paths, which are zipped on the fly
         :param auto_create: indicate if test cases should be created if non existent
         :param test_cycle: dict with test cycle description data
         """
@@ -703,7 +872,8 @@ class AutomationEndpoints(EndpointTemplate):
         Create results using the Cucumber results format.
 
         :param project_key: str with project key
-        :param file_path: str with path to .zip archive with report files
+        :param file_path: str with path to .zip archive with report files, path to a directory
+            with report files or an iterable with report file paths, which are zipped on the fly
         :param auto_create: indicate if test cases should be created if non existent
         :param test_cycle: dict with test cycle description data
         """
@@ -724,7 +894,8 @@ class AutomationEndpoints(EndpointTemplate):
         Create results using the JUnit XML results format.
 
         :param project_key: str with project key
-        :param file_path: str with path to .zip archive with report files
+        :param file_path: str with path to .zip archive with report files, path to a directory
+            with report files or an iterable with report file paths, which are zipped on the fly
         :param auto_create: indicate if test cases should be created if non existent
         :param test_cycle: dict with test cycle description data
         """
@@ -735,6 +906,34 @@ class AutomationEndpoints(EndpointTemplate):
                                   test_cycle=test_cycle,
                                   **kwargs)
 
+    def post_junit_xml_sharded(self,
+                               project_key,
+                               file_path,
+                               auto_create=False,
+                               test_cycle=None,
+                               **kwargs):
+        """
+        Create results from large JUnit XML reports, converted to Zephyr Scale's custom results
+        format and uploaded in shards of a bounded size concurrently, every shard creates its
+        own test cycle. See zephyr.scale.cloud.sharded_upload.post_junit_xml_sharded for details.
+
+        :param project_key: str with project key
+        :param file_path: str with path to a JUnit XML report, path to a directory with reports
+            or an iterable with report file paths
+        :param auto_create: indicate if test cases should be created if non existent
+        :param test_cycle: dict with test cycle description data
+
+        :param keyword max_shard_bytes: max json size of a shard, 16 MB by default
+        :param keyword max_output: max number of characters kept from each failure, system-out
+            and system-err block of a test case, 0 to drop the output
+        :param keyword workers: number of concurrent uploads
+        :param keyword retries: max number of retries of a throttled or not sent shard upload
+
+        :return: BulkReport object with upload responses as results
+        """
+        return post_junit_xml_sharded(self, project_key, file_path, auto_create, test_cycle,
+                                      **kwargs)
+
     def get_testcases_zip(self, project_key: str):
         """
         Retrieve a zip file containing Cucumber Feature Files that matches
@@ -0,0 +1,195 @@
+"""
+A module with an index of Zephyr Scale Cloud folder trees.
+"""
+import logging
+import threading
+
+from zephyr.scale.bulk import KeyedResults, ensure_sync, run_bulk
+
+
+logger = logging.getLogger(__name__)
+SEPARATOR = "/"
+
+
+def split_path(path) -> tuple:
+    """
+    Split a folder path into folder names, empty names are dropped.
+
+    :param path: str like "Regression/API/Auth" or a sequence with folder names
+    :return: tuple with folder names
+    """
+    parts = path.split(SEPARATOR) if isinstance(path, str) else path
+    return tuple(part for part in parts if part)
+
+
+class FolderTree:
+    """
+    Index of a project folder tree of one folder type, resolving folder paths
+    (like "Regression/API/Auth") to folder ids and back without requests.
+
+    The index is built from a single paginated sweep of the project folders and is updated
+    incrementally when folders are created with ensure_paths or add, so it could be used
+    for the whole run without reloading.
+
+    :param api: CloudApiWrapper object (ZephyrScale(...).api)
+    :param project_key: Jira project key
+    :param folder_type: "TEST_CASE", "TEST_PLAN" or "TEST_CYCLE"
+    """
+    def __init__(self, api, project_key: str, folder_type: str = "TEST_CASE"):
+        ensure_sync(api.session, self.__class__.__name__)
+        self.api = api
+        self.project_key = project_key
+        self.folder_type = folder_type
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        self._ids = {}
+        self._paths = {}
+
+    def load(self, page_size: int = 1000):
+        """
+        (Re)build the index from the project folders.
+
+        :param page_size: number of folders to request per page
+        :return: the FolderTree object
+        """
+        folders = {folder["id"]: folder
+                   for folder in self.api.folders.get_folders(projectKey=self.project_key,
+                                                              folderType=self.folder_type,
+                                                              maxResults=page_size)
+                   if folder.get("folderType", self.folder_type) == self.folder_type}
+        paths = {}
+        for folder_id in folders:
+            chain = []
+            current = folder_id
+            while current is not None and current not in paths:
+                if current not in folders or current in chain:
+                    break
+                chain.append(current)
+                current = folders[current].get("parentId")
+            if current is not None and current not in paths:
+                logger.warning(f"Folder {folder_id} has unknown parent {current}, skipped")
+                continue
+            parent_path = paths[current] if current is not None else ()
+            for chain_id in reversed(chain):
+                parent_path = parent_path + (folders[chain_id]["name"],)
+                paths[chain_id] = parent_path
+
+        with self._lock:
+            self._paths = paths
+            self._ids = {}
+            for folder_id, path in paths.items():
+                self._ids.setdefault(path, folder_id)
+        logger.debug(f"Loaded {len(paths)} {self.folder_type} folders of {self.project_key}")
+        return self
+
+    def id_of(self, path):
+        """
+        Get id of a folder.
+
+        :param path: folder path, str or a sequence with folder names
+        :return: folder id or None if there is no such folder
+        """
+        with self._lock:
+            return self._ids.get(split_path(path))
+
+    def path_of(self, folder_id: int):
+        """
+        Get path of a folder.
+
+        :param folder_id: folder id
+        :return: str with folder path or None if there is no such folder
+        """
+        with self._lock:
+            path = self._paths.get(folder_id)
+        return SEPARATOR.join(path) if path is not None else None
+
+    def add(self, folder: dict):
+        """
+        Add a folder created elsewhere to the index, its parent should be indexed.
+
+        :param folder: folder dict with id, name and parentId
+        """
+        with self._lock:
+            parent_id = folder.get("parentId")
+            if parent_id is None:
+                path = (folder["name"],)
+            elif parent_id in self._paths:
+                path = self._paths[parent_id] + (folder["name"],)
+            else:
+                raise KeyError(f"Parent folder {parent_id} is not indexed")
+            self._paths[folder["id"]] = path
+            self._ids.setdefault(path, folder["id"])
+
+    def ensure_paths(self, paths, workers: int = 8, retries: int = 2) -> KeyedResults:
+        """
+        Get ids of folders creating the missing ones. Only the missing folders are created,
+        level by level: the missing folders of the same depth are created concurrently,
+        so sibling branches are created in parallel.
+
+        :param paths: iterable with folder paths
+        :param workers: number of concurrent requests
+        :param retries: max number of retries for a request, a creation is retried only
+            if it is throttled or not sent, so a timed out one is not duplicated
+
+        :return: KeyedResults dict with paths and folder ids, errors of the paths which could
+            not be created are in its errors dict
+        """
+        requested = list(dict.fromkeys(SEPARATOR.join(split_path(path)) for path in paths))
+        with self._create_lock:
+            failed = {}
+            levels = {}
+            for path in requested:
+                parts = split_path(path)
+                for depth in range(1, len(parts) + 1):
+                    if self.id_of(parts[:depth]) is None:
+                        levels.setdefault(depth, {})[parts[:depth]] = None
+
+            for depth in sorted(levels):
+                missing = [parts for parts in levels[depth]
+                           if not any(parts[:index] in failed for index in range(1, depth))]
+                report = run_bulk(self._create, missing, workers=workers, retries=retries,
+                                  idempotent=False)
+                for outcome in report.failed:
+                    failed[outcome.item] = outcome.error
+
+        results = KeyedResults()
+        for path in requested:
+            parts = split_path(path)
+            error = next((failed[parts[:depth]] for depth in range(1, len(parts) + 1)
+                          if parts[:depth] in failed), None)
+            if error is None:
+                results[path] = self.id_of(parts)
+            else:
+                results.errors[path] = error
+        return results
+
+    def ensure_path(self, path) -> int:
+        """
+        Get id of a folder creating the missing folders of the path.
+
+        :param path: folder path, str or a sequence with folder names
+        :return: folder id
+        """
+        results = self.ensure_paths([path], workers=1)
+        if results.errors:
+            raise next(iter(results.errors.values()))
+        return next(iter(results.values()))
+
+    def _create(self, parts: tuple):
+        parent_id = self.id_of(parts[:-1]) if len(parts) > 1 else None
+        kwargs = {"parentId": parent_id} if parent_id is not None else {}
+        response = self.api.folders.create_folder(parts[-1], self.project_key, self.folder_type,
+                                                  **kwargs)
+        self.add({"id": response["id"], "name": parts[-1], "parentId": parent_id})
+        return response["id"]
+
+    def __contains__(self, path):
+        return self.id_of(path) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._paths)
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(project_key={self.project_key!r}, "
+                f"folder_type={self.folder_type!r}, folders={len(self)})")
@@ -0,0 +1,272 @@
+"""
+A module with a local SQLite mirror of Zephyr Scale Cloud project entities.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from zephyr.scale.bulk import ensure_sync
+
+
+class EntitySpec:
+    """
+    Description of a mirrored entity.
+
+    :param group: name of the CloudApiWrapper property with endpoints, also used as table name
+    :param method: name of the paginated endpoint method
+    :param status_field: name of the entity field with status reference
+    :param updated_fields: entity fields with update timestamp, the first present is used
+    :param updated_filter: query param to fetch only entities updated after a timestamp
+    """
+    def __init__(self, group, method, status_field, updated_fields, updated_filter=None):
+        self.table = group
+        self.group = group
+        self.method = method
+        self.status_field = status_field
+        self.updated_fields = updated_fields
+        self.updated_filter = updated_filter
+
+
+ENTITIES = {
+    "test_cases": EntitySpec("test_cases", "get_test_cases", "status",
+                             ("updatedOn", "createdOn")),
+    "test_cycles": EntitySpec("test_cycles", "get_test_cycles", "status",
+                              ("updatedOn", "createdOn")),
+    "test_executions": EntitySpec("test_executions", "get_test_executions",
+                                  "testExecutionStatus", ("updatedOn", "actualEndDate"),
+                                  updated_filter="actualEndDateAfter"),
+}
+
+
+def _ref_id(item, field):
+    """Get id of a referenced entity, e.g. {"folder": {"id": 1, "self": "..."}}"""
+    ref = item.get(field)
+    return ref.get("id") if isinstance(ref, dict) else None
+
+
+class SyncStats:
+    """
+    Results of an entity sync.
+
+    :param entity: entity name
+    """
+    def __init__(self, entity):
+        self.entity = entity
+        self.fetched = 0
+        self.changed = 0
+        self.deleted = 0
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(entity={self.entity!r}, fetched={self.fetched}, "
+                f"changed={self.changed}, deleted={self.deleted}, elapsed={self.elapsed:.2f}s)")
+
+
+class ProjectMirror:
+    """
+    Local SQLite mirror of a Zephyr Scale Cloud project: test cases, test cycles and test
+    executions. Entities are stored as json with indexed key, folder, status and update
+    timestamp columns, so dashboards could query them locally.
+
+    Syncs are incremental: only changed entities are written, test executions are fetched
+    only if they ended after the last synced one, and the pagination offset is checkpointed
+    every page, so an interrupted sync continues from the last completed page.
+
+    Entities deleted remotely are deleted locally after a complete sweep of all the entities,
+    i.e. a sync of test cases or test cycles which is not resumed from a checkpoint.
+    Test executions are fetched by actualEndDate, so deleted ones are kept and ones updated
+    without a change of actualEndDate are never refreshed.
+
+    :param api: CloudApiWrapper object (ZephyrScale(...).api)
+    :param project_key: Jira project key
+    :param db_path: path to SQLite database file
+    :param page_size: number of entities to request per page
+    """
+    def __init__(self, api, project_key: str, db_path: str, page_size: int = 1000):
+        ensure_sync(api.session, self.__class__.__name__)
+        self.api = api
+        self.project_key = project_key
+        self.page_size = page_size
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._db:
+            for spec in ENTITIES.values():
+                self._db.execute(f"CREATE TABLE IF NOT EXISTS {spec.table} ("
+                                 "id INTEGER PRIMARY KEY, project_key TEXT NOT NULL, key TEXT, "
+                                 "folder_id INTEGER, status_id INTEGER, updated_on TEXT, "
+                                 "hash TEXT NOT NULL, data TEXT NOT NULL)")
+                for column in ("key", "folder_id", "status_id", "updated_on"):
+                    self._db.execute(f"CREATE INDEX IF NOT EXISTS {spec.table}_{column} "
+                                     f"ON {spec.table} (project_key, {column})")
+            self._db.execute("CREATE TABLE IF NOT EXISTS sync_state ("
+                             "project_key TEXT NOT NULL, entity TEXT NOT NULL, "
+                             "checkpoint INTEGER NOT NULL DEFAULT 0, high_water TEXT, "
+                             "synced_at REAL, PRIMARY KEY (project_key, entity))")
+
+    def close(self):
+        """Close the database connection"""
+        self._db.close()
+
+    def get_state(self, entity: str) -> dict:
+        """
+        Get sync state of an entity.
+
+        :param entity: entity name, one of ENTITIES keys
+        :return: dict with checkpoint, high_water and synced_at
+        """
+        with self._lock:
+            row = self._db.execute("SELECT checkpoint, high_water, synced_at FROM sync_state "
+                                   "WHERE project_key = ? AND entity = ?",
+                                   (self.project_key, entity)).fetchone()
+        if row is None:
+            return {"checkpoint": 0, "high_water": None, "synced_at": None}
+        return dict(row)
+
+    def _save_state(self, entity, checkpoint, high_water, synced_at=None):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO sync_state "
+                             "(project_key, entity, checkpoint, high_water, synced_at) "
+                             "VALUES (?, ?, ?, ?, ?)",
+                             (self.project_key, entity, checkpoint, high_water, synced_at))
+
+    @staticmethod
+    def _updated_on(spec, item):
+        """Get entity update timestamp"""
+        return next((item[field] for field in spec.updated_fields if item.get(field)), None)
+
+    def _write_page(self, spec, items, stats):
+        """Write a page of entities in one transaction"""
+        with self._lock, self._db:
+            for item in items:
+                stats.fetched += 1
+                stats.changed += self._upsert(spec, item)
+
+    def _delete_missing(self, spec, seen, stats):
+        """Delete entities of the project which have not been seen during a complete sweep"""
+        with self._lock, self._db:
+            rows = self._db.execute(f"SELECT id FROM {spec.table} WHERE project_key = ?",
+                                    (self.project_key,)).fetchall()
+            missing = [(row["id"],) for row in rows if row["id"] not in seen]
+            self._db.executemany(f"DELETE FROM {spec.table} WHERE id = ?", missing)
+        stats.deleted = len(missing)
+
+    def _upsert(self, spec, item) -> bool:
+        """Write an entity if it has changed, returns whether it has"""
+        data = json.dumps(item, sort_keys=True)
+        digest = hashlib.sha1(data.encode()).hexdigest()
+        row = self._db.execute(f"SELECT hash FROM {spec.table} WHERE id = ?",
+                               (item["id"],)).fetchone()
+        if row is not None and row["hash"] == digest:
+            return False
+        self._db.execute(f"INSERT OR REPLACE INTO {spec.table} "
+                         "(id, project_key, key, folder_id, status_id, updated_on, hash, data) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (item["id"], self.project_key, item.get("key"),
+                          _ref_id(item, "folder"), _ref_id(item, spec.status_field),
+                          self._updated_on(spec, item), digest, data))
+        return True
+
+    def sync(self, entity: str) -> SyncStats:
+        """
+        Sync an entity from the API to the local database.
+
+        :param entity: entity name, one of ENTITIES keys
+        :return: SyncStats object
+        """
+        spec = ENTITIES[entity]
+        stats = SyncStats(entity)
+        started = time.monotonic()
+        state = self.get_state(entity)
+        high_water = state["high_water"]
+
+        params = {"projectKey": self.project_key,
+                  "maxResults": self.page_size,
+                  "startAt": state["checkpoint"]}
+        if spec.updated_filter and high_water:
+            params[spec.updated_filter] = high_water
+        # Only a sweep of all the entities tells which ones have been deleted
+        seen = set() if not state["checkpoint"] and spec.updated_filter not in params else None
+        self.logger.debug(f"Sync {entity} of {self.project_key} with {params}")
+
+        fetch = getattr(getattr(self.api, spec.group), spec.method)
+        new_high_water = high_water
+        page = []
+        for item in fetch(**params):
+            page.append(item)
+            if seen is not None:
+                seen.add(item["id"])
+            updated_on = self._updated_on(spec, item)
+            if updated_on and (new_high_water is None or updated_on > new_high_water):
+                new_high_water = updated_on
+            if len(page) == self.page_size:
+                self._write_page(spec, page, stats)
+                self._save_state(entity, params["startAt"] + stats.fetched, high_water)
+                page = []
+        self._write_page(spec, page, stats)
+        if seen is not None:
+            self._delete_missing(spec, seen, stats)
+        self._save_state(entity, 0, new_high_water, time.time())
+
+        stats.elapsed = time.monotonic() - started
+        self.logger.debug(f"Synced {stats}")
+        return stats
+
+    def sync_all(self) -> list:
+        """
+        Sync all the mirrored entities.
+
+        :return: list with SyncStats objects
+        """
+        return [self.sync(entity) for entity in ENTITIES]
+
+    def query(self, entity: str, *, key: str = None, folder_id: int = None,
+              status_id: int = None, updated_after: str = None, limit: int = None) -> list:
+        """
+        Query mirrored entities.
+
+        :param entity: entity name, one of ENTITIES keys
+        :param key: entity key filter
+        :param folder_id: folder id filter
+        :param status_id: status id filter
+        :param updated_after: return entities updated after the timestamp (ISO format)
+        :param limit: max number of entities to return
+
+        :return: list with entity dicts
+        """
+        spec = ENTITIES[entity]
+        conditions = ["project_key = ?"]
+        args = [self.project_key]
+        for column, value in (("key", key), ("folder_id", folder_id), ("status_id", status_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                args.append(value)
+        if updated_after is not None:
+            conditions.append("updated_on > ?")
+            args.append(updated_after)
+
+        sql = f"SELECT data FROM {spec.table} WHERE {' AND '.join(conditions)} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def get(self, entity: str, key: str):
+        """
+        Get a mirrored entity by its key.
+
+        :param entity: entity name, one of ENTITIES keys
+        :param key: entity key
+        :return: entity dict or None
+        """
+        found = self.query(entity, key=key, limit=1)
+        return found[0] if found else None
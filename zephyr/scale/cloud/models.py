@@ -0,0 +1,253 @@
+"""
+A module with compact models of Zephyr Scale Cloud entities.
+
+Models keep fields in __slots__ instead of per-object dicts, entity references
+(project, status, priority, folder, etc.) are interned, so equal references share one object,
+and rarely used nested fields (custom fields, links, test script) are kept as compact json
+and decoded on access. It makes large data sets, like hundreds of thousands of test executions,
+take several times less memory than the plain response dicts.
+"""
+import inspect
+import json
+import sys
+import threading
+import weakref
+
+from zephyr.scale.pagination import Paginator
+
+
+_LAZY_SEPARATORS = (",", ":")
+
+
+class Ref:
+    """
+    Reference to another entity, {"id": 1, "self": "https://..."} in responses.
+    References are interned: equal references returned by Ref.of are the same object.
+
+    :param ref_id: referenced entity id
+    :param self_url: referenced entity url
+    """
+    __slots__ = ("id", "self_url", "__weakref__")
+    ID_FIELD = "id"
+    _interned = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __init__(self, ref_id, self_url: str = None):
+        self.id = ref_id
+        self.self_url = self_url
+
+    @classmethod
+    def of(cls, value):
+        """
+        Get an interned reference from a response value.
+
+        :param value: dict with the reference, None or a Ref
+        :return: Ref object or None
+        """
+        if value is None or isinstance(value, Ref):
+            return value
+        key = (cls, value.get(cls.ID_FIELD), value.get("self"))
+        with cls._lock:
+            ref = cls._interned.get(key)
+            if ref is None:
+                ref = cls(key[1], key[2])
+                cls._interned[key] = ref
+        return ref
+
+    def to_dict(self) -> dict:
+        """Get the reference as it is in responses"""
+        return {self.ID_FIELD: self.id, "self": self.self_url}
+
+    def __eq__(self, other):
+        return (isinstance(other, Ref) and type(self) is type(other)
+                and (self.id, self.self_url) == (other.id, other.self_url))
+
+    def __hash__(self):
+        return hash((type(self), self.id, self.self_url))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.id!r})"
+
+
+class AccountRef(Ref):
+    """Reference to a Jira user, {"accountId": "...", "self": "https://..."} in responses"""
+    __slots__ = ()
+    ID_FIELD = "accountId"
+
+
+def _interned_str(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _tuple(value):
+    return tuple(value) if value is not None else None
+
+
+class Model:
+    """
+    Base class of the compact models. FIELDS are (attribute, response field, decoder) tuples
+    of the fields stored in slots. The rest of the response fields are kept encoded
+    as compact json, rarely used ones are exposed by lazy properties decoding them on every
+    access, so to_dict returns all the fields of the response.
+    """
+    __slots__ = ("_encoded",)
+    __test__ = False
+    FIELDS = ()
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Create a model from a response dict.
+
+        :param data: dict with the entity
+        :return: model object
+        """
+        model = cls.__new__(cls)
+        for attribute, field, decoder in cls.FIELDS:
+            value = data.get(field)
+            setattr(model, attribute, decoder(value) if decoder and value is not None else value)
+        known = {field for _, field, _ in cls.FIELDS}
+        encoded = {field: value for field, value in data.items() if field not in known}
+        # pylint: disable=attribute-defined-outside-init
+        model._encoded = (json.dumps(encoded, separators=_LAZY_SEPARATORS)
+                          if encoded else None)
+        return model
+
+    def to_dict(self) -> dict:
+        """
+        Get the entity as a response dict.
+
+        :return: dict with the entity
+        """
+        data = {}
+        for attribute, field, _ in self.FIELDS:
+            value = getattr(self, attribute)
+            if isinstance(value, Ref):
+                value = value.to_dict()
+            elif isinstance(value, tuple):
+                value = list(value)
+            data[field] = value
+        data.update(self._decode())
+        return data
+
+    def _decode(self) -> dict:
+        return json.loads(self._encoded) if self._encoded else {}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash((type(self), getattr(self, "id", None)))
+
+    def __repr__(self):
+        identity = getattr(self, "key", None) or getattr(self, "id", None)
+        return f"{self.__class__.__name__}({identity!r})"
+
+
+def _lazy(field: str, doc: str):
+    """Property decoding a lazy field"""
+    def getter(model):
+        return model._decode().get(field)  # pylint: disable=protected-access
+    return property(getter, doc=doc)
+
+
+class Status(Model):
+    """Test case, test cycle, test plan or test execution status"""
+    __slots__ = ("id", "project", "name", "description", "index", "color", "archived",
+                 "default")
+    FIELDS = (("id", "id", None), ("project", "project", Ref.of),
+              ("name", "name", _interned_str), ("description", "description", None),
+              ("index", "index", None), ("color", "color", _interned_str),
+              ("archived", "archived", None), ("default", "default", None))
+
+
+class Folder(Model):
+    """Test case, test plan or test cycle folder"""
+    __slots__ = ("id", "parent_id", "name", "index", "folder_type", "project")
+    FIELDS = (("id", "id", None), ("parent_id", "parentId", None), ("name", "name", None),
+              ("index", "index", None), ("folder_type", "folderType", _interned_str),
+              ("project", "project", Ref.of))
+
+
+class TestCase(Model):
+    """Test case, custom_fields, links and test_script are decoded on access"""
+    __slots__ = ("id", "key", "name", "project", "created_on", "objective", "precondition",
+                 "estimated_time", "labels", "component", "priority", "status", "folder",
+                 "owner")
+    FIELDS = (("id", "id", None), ("key", "key", None), ("name", "name", None),
+              ("project", "project", Ref.of), ("created_on", "createdOn", None),
+              ("objective", "objective", None), ("precondition", "precondition", None),
+              ("estimated_time", "estimatedTime", None), ("labels", "labels", _tuple),
+              ("component", "component", Ref.of), ("priority", "priority", Ref.of),
+              ("status", "status", Ref.of), ("folder", "folder", Ref.of),
+              ("owner", "owner", AccountRef.of))
+    custom_fields = _lazy("customFields", "dict with custom fields")
+    links = _lazy("links", "dict with issue and web links")
+    test_script = _lazy("testScript", "dict with test script reference")
+
+
+class TestCycle(Model):
+    """Test cycle, custom_fields and links are decoded on access"""
+    __slots__ = ("id", "key", "name", "project", "jira_project_version", "status", "folder",
+                 "description", "planned_start_date", "planned_end_date", "owner")
+    FIELDS = (("id", "id", None), ("key", "key", None), ("name", "name", None),
+              ("project", "project", Ref.of),
+              ("jira_project_version", "jiraProjectVersion", Ref.of),
+              ("status", "status", Ref.of), ("folder", "folder", Ref.of),
+              ("description", "description", None),
+              ("planned_start_date", "plannedStartDate", None),
+              ("planned_end_date", "plannedEndDate", None), ("owner", "owner", AccountRef.of))
+    custom_fields = _lazy("customFields", "dict with custom fields")
+    links = _lazy("links", "dict with issue, web and test plan links")
+
+
+class TestExecution(Model):
+    """Test execution, custom_fields and links are decoded on access"""
+    __slots__ = ("id", "key", "project", "test_case", "environment", "jira_project_version",
+                 "test_execution_status", "actual_end_date", "estimated_time",
+                 "execution_time", "executed_by_id", "assigned_to_id", "comment", "automated",
+                 "test_cycle")
+    FIELDS = (("id", "id", None), ("key", "key", None), ("project", "project", Ref.of),
+              ("test_case", "testCase", Ref.of), ("environment", "environment", Ref.of),
+              ("jira_project_version", "jiraProjectVersion", Ref.of),
+              ("test_execution_status", "testExecutionStatus", Ref.of),
+              ("actual_end_date", "actualEndDate", None),
+              ("estimated_time", "estimatedTime", None),
+              ("execution_time", "executionTime", None),
+              ("executed_by_id", "executedById", _interned_str),
+              ("assigned_to_id", "assignedToId", _interned_str), ("comment", "comment", None),
+              ("automated", "automated", None), ("test_cycle", "testCycle", Ref.of))
+    custom_fields = _lazy("customFields", "dict with custom fields")
+    links = _lazy("links", "dict with issue links")
+
+
+async def _decode_awaitable(awaitable, model):
+    return decode(await awaitable, model)
+
+
+async def _decode_async_iterable(iterable, model):
+    async for value in iterable:
+        yield model.from_dict(value)
+
+
+def decode(result, model):
+    """
+    Decode an endpoint result into models. Works with results of both ZephyrSession
+    and AsyncZephyrSession: a dict, a list, a Paginator (which keeps its cursor API),
+    a generator, a coroutine or an async generator.
+
+    :param result: endpoint result
+    :param model: model class
+    :return: the result with models instead of dicts
+    """
+    if isinstance(result, dict):
+        return model.from_dict(result)
+    if isinstance(result, list):
+        return [model.from_dict(value) for value in result]
+    if isinstance(result, Paginator):
+        return result.map(model.from_dict)
+    if inspect.isawaitable(result):
+        return _decode_awaitable(result, model)
+    if hasattr(result, "__aiter__"):
+        return _decode_async_iterable(result, model)
+    return map(model.from_dict, result)
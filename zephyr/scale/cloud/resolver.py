@@ -0,0 +1,236 @@
+"""
+A module with a resolver of Zephyr Scale Cloud entity names to ids.
+"""
+import logging
+import threading
+import time
+
+from zephyr.scale.bulk import ensure_sync
+from zephyr.scale.cache import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+STATUS_TYPES = ("TEST_CASE", "TEST_PLAN", "TEST_CYCLE", "TEST_EXECUTION")
+PROJECTS = ("projects",)
+PRIORITIES = ("priorities",)
+ENVIRONMENTS = ("environments",)
+KINDS = (PROJECTS, PRIORITIES, ENVIRONMENTS) + tuple(("statuses", status_type)
+                                                     for status_type in STATUS_TYPES)
+
+
+def _label(kind: tuple) -> str:
+    """Kind name for messages, e.g. 'TEST_CASE statuses'"""
+    return " ".join(reversed(kind))
+
+
+class NameNotFound(LookupError):
+    """Raised when there is no entity with the given name even after refreshing the index."""
+
+
+class NameResolver:
+    """
+    Resolver of project, status, priority and environment names to ids and entities.
+
+    Entities are loaded with one paginated sweep per kind (statuses per status type)
+    into name indexes, the first time a kind is needed or by preload. An unknown name makes
+    the resolver reload its kind before giving up, so entities created after loading are
+    found too. Concurrent reloads of the same kind are collapsed into one.
+
+    The update helpers accept names, resolve them locally and send a single request.
+
+    :param api: CloudApiWrapper object (ZephyrScale(...).api)
+    :param project_key: Jira project key
+
+    :param keyword refresh_interval: min number of seconds between reloads of a kind
+        caused by unknown names, 0 (default) reloads on every miss
+    :param keyword page_size: number of entities to request per page
+    """
+    def __init__(self, api, project_key: str, **kwargs):
+        ensure_sync(api.session, self.__class__.__name__)
+        self.api = api
+        self.project_key = project_key
+        self.refresh_interval = kwargs.get("refresh_interval", 0)
+        self.page_size = kwargs.get("page_size", 1000)
+        self._lock = threading.Lock()
+        self._indexes = {}
+        self._loads = SingleFlight()
+
+    def preload(self):
+        """
+        Load projects, priorities, environments and statuses of all types.
+
+        :return: the NameResolver object
+        """
+        for kind in KINDS:
+            self._load(kind)
+        return self
+
+    def refresh(self):
+        """Drop the loaded indexes, they are loaded again when needed"""
+        with self._lock:
+            self._indexes = {}
+
+    def _fetch(self, kind: tuple):
+        """Get entities of a kind and the field they are indexed by"""
+        params = {"projectKey": self.project_key, "maxResults": self.page_size}
+        if kind == PROJECTS:
+            return self.api.projects.get_projects(), "key"
+        if kind == PRIORITIES:
+            return self.api.priorities.get_priorities(**params), "name"
+        if kind == ENVIRONMENTS:
+            return self.api.environments.get_environments(**params), "name"
+        status_type = kind[1]
+        statuses = self.api.statuses.get_statuses(statusType=status_type, **params)
+        return (status for status in statuses
+                if status.get("type", status_type) == status_type), "name"
+
+    def _load(self, kind: tuple):
+        entities, field = self._fetch(kind)
+        index = {}
+        # Archived entities are indexed first, so active ones win name clashes
+        for entity in sorted(entities, key=lambda item: not item.get("archived")):
+            index[entity[field]] = entity
+        with self._lock:
+            self._indexes[kind] = (index, time.monotonic())
+        logger.debug(f"Loaded {len(index)} {_label(kind)} of {self.project_key}")
+
+    def _entity(self, kind: tuple, name: str) -> dict:
+        with self._lock:
+            index, loaded_at = self._indexes.get(kind, ({}, None))
+        entity = index.get(name)
+        if entity is None and (loaded_at is None
+                               or time.monotonic() - loaded_at >= self.refresh_interval):
+            self._loads.do(kind, lambda: self._load(kind))
+            with self._lock:
+                entity = self._indexes[kind][0].get(name)
+        if entity is None:
+            raise NameNotFound(f"{name!r} is not found in {_label(kind)} of {self.project_key}")
+        return entity
+
+    def _update_index(self, kind: tuple, old_name: str, entity: dict):
+        with self._lock:
+            index, loaded_at = self._indexes[kind]
+            index = {name: value for name, value in index.items() if name != old_name}
+            index[entity["name"]] = entity
+            self._indexes[kind] = (index, loaded_at)
+
+    def project(self, project_key: str = None) -> dict:
+        """
+        Get a project.
+
+        :param project_key: Jira project key, the resolver project by default
+        :return: dict with the project
+        """
+        return self._entity(PROJECTS, project_key or self.project_key)
+
+    def status(self, name: str, status_type: str = "TEST_CASE") -> dict:
+        """
+        Get a status of the project.
+
+        :param name: status name
+        :param status_type: "TEST_CASE", "TEST_PLAN", "TEST_CYCLE" or "TEST_EXECUTION"
+        :return: dict with the status
+        """
+        return self._entity(("statuses", status_type), name)
+
+    def priority(self, name: str) -> dict:
+        """
+        Get a priority of the project.
+
+        :param name: priority name
+        :return: dict with the priority
+        """
+        return self._entity(PRIORITIES, name)
+
+    def environment(self, name: str) -> dict:
+        """
+        Get an environment of the project.
+
+        :param name: environment name
+        :return: dict with the environment
+        """
+        return self._entity(ENVIRONMENTS, name)
+
+    def project_id(self, project_key: str = None) -> int:
+        """Get id of a project, the resolver project by default"""
+        return self.project(project_key)["id"]
+
+    def status_id(self, name, status_type: str = "TEST_CASE") -> int:
+        """Get id of a status, ids are returned as they are"""
+        return name if isinstance(name, int) else self.status(name, status_type)["id"]
+
+    def priority_id(self, name) -> int:
+        """Get id of a priority, ids are returned as they are"""
+        return name if isinstance(name, int) else self.priority(name)["id"]
+
+    def environment_id(self, name) -> int:
+        """Get id of an environment, ids are returned as they are"""
+        return name if isinstance(name, int) else self.environment(name)["id"]
+
+    def update_test_case(self, test_case_key: str, test_case_id: int, name: str, *,
+                         priority, status, **kwargs):
+        """
+        Update an existing test case of the project with priority and status given by names.
+
+        :param test_case_key: The key of the test case
+        :param test_case_id: integer id of the test
+        :param name: test case name
+        :param priority: priority name or id
+        :param status: test case status name or id
+        :return: dict with response body
+        """
+        return self.api.test_cases.update_test_case(test_case_key, test_case_id, name,
+                                                    self.project_id(),
+                                                    self.priority_id(priority),
+                                                    self.status_id(status), **kwargs)
+
+    def update_status(self, status_name: str, status_type: str = "TEST_CASE", **kwargs):
+        """
+        Update a status given by name. Fields which are not given keep their current values.
+
+        :param status_name: status name
+        :param status_type: "TEST_CASE", "TEST_PLAN", "TEST_CYCLE" or "TEST_EXECUTION"
+
+        :param keyword name: new status name
+        :param keyword index: new status index
+        :param keyword archived: new archived flag
+        :param keyword default: new default flag
+        :param keyword description: new description
+        :param keyword color: new color
+        :return: dict with response body
+        """
+        status = dict(self.status(status_name, status_type), **kwargs)
+        extra = {field: status[field] for field in ("description", "color") if field in status}
+        result = self.api.statuses.update_status(status["id"], status["project"]["id"],
+                                                 status["name"], status.get("index"),
+                                                 status.get("archived", False),
+                                                 status.get("default", False), **extra)
+        self._update_index(("statuses", status_type), status_name, status)
+        return result
+
+    def update_priority(self, priority_name: str, **kwargs):
+        """
+        Update a priority given by name. Fields which are not given keep their current values.
+
+        :param priority_name: priority name
+
+        :param keyword name: new priority name
+        :param keyword index: new priority index
+        :param keyword default: new default flag
+        :param keyword description: new description
+        :param keyword color: new color
+        :return: dict with response body
+        """
+        priority = dict(self.priority(priority_name), **kwargs)
+        extra = {field: priority[field] for field in ("description", "color")
+                 if field in priority}
+        result = self.api.priorities.update_priority(priority["id"], priority["project"]["id"],
+                                                     priority["name"], priority.get("index"),
+                                                     priority.get("default", False), **extra)
+        self._update_index(PRIORITIES, priority_name, priority)
+        return result
+
+    def __repr__(self):
+        with self._lock:
+            loaded = sum(len(index) for index, _ in self._indexes.values())
+        return f"{self.__class__.__name__}(project_key={self.project_key!r}, loaded={loaded})"
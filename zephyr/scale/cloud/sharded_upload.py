@@ -0,0 +1,53 @@
+"""
+A module with sharded uploads of large JUnit XML reports to Zephyr Scale Cloud.
+"""
+from zephyr.scale.bulk import run_bulk
+from zephyr.utils.junit import (MAX_OUTPUT, MAX_SHARD_BYTES, iter_junit_executions, junit_files,
+                                shard_executions)
+
+
+def post_junit_xml_sharded(automations, project_key, file_path, auto_create=False,
+                           test_cycle=None, **kwargs):
+    """
+    Create results from large JUnit XML reports. The reports are parsed incrementally,
+    converted to Zephyr Scale's custom results format with failure messages and test output
+    truncated, and split into shards of a bounded size, which are uploaded concurrently
+    as custom format results files.
+
+    Every automation upload creates a test cycle, so every shard gets its own test cycle
+    created with the same test_cycle data. For the same reason a failed upload is retried
+    only if it is throttled or has not been sent.
+
+    :param automations: AutomationEndpoints object
+    :param project_key: str with project key
+    :param file_path: str with path to a JUnit XML report, path to a directory with reports
+        or an iterable with report file paths
+    :param auto_create: indicate if test cases should be created if non existent
+    :param test_cycle: dict with test cycle description data
+
+    :param keyword max_shard_bytes: max json size of a shard, 16 MB by default
+    :param keyword max_output: max number of characters kept from each failure, system-out
+        and system-err block of a test case, 0 to drop the output
+    :param keyword workers: number of concurrent uploads
+    :param keyword retries: max number of retries of a throttled or not sent shard upload
+
+    :return: BulkReport object with upload responses as results
+    """
+    max_shard_bytes = kwargs.pop("max_shard_bytes", MAX_SHARD_BYTES)
+    max_output = kwargs.pop("max_output", MAX_OUTPUT)
+    workers = kwargs.pop("workers", 4)
+    retries = kwargs.pop("retries", 2)
+
+    executions = (execution for path in junit_files(file_path)
+                  for execution in iter_junit_executions(path, max_output))
+
+    def upload(shard):
+        number, content = shard
+        return automations.post_custom_format(project_key,
+                                              [(f"executions-{number}.json", content)],
+                                              auto_create=auto_create,
+                                              test_cycle=test_cycle,
+                                              **kwargs)
+
+    return run_bulk(upload, enumerate(shard_executions(executions, max_shard_bytes), 1),
+                    workers=workers, retries=retries, idempotent=False)
@@ -0,0 +1,263 @@
+"""
+A module with a sync of test cases defined in code to Zephyr Scale Cloud.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from zephyr.scale.bulk import BulkReport, chunked, ensure_sync, run_bulk
+from zephyr.scale.cloud.bulk import MAX_STEPS_PER_REQUEST
+
+
+logger = logging.getLogger(__name__)
+# Fields compared with the remote test cases, the rest is only sent on creation
+SYNC_FIELDS = ("name", "objective", "precondition", "estimatedTime", "labels", "folderId",
+               "componentId", "customFields")
+# Request fields with ids of entities which are references in responses
+REFS = {"folderId": "folder", "componentId": "component"}
+READ_ONLY_FIELDS = ("links", "testScript", "createdOn")
+
+
+def fingerprint(value) -> str:
+    """
+    Get a content fingerprint of a json serializable value.
+
+    :param value: value to fingerprint
+    :return: str with SHA-256 hex digest of the value json with sorted keys
+    """
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _local_value(definition: dict, field: str):
+    value = definition.get(field)
+    return sorted(value) if field == "labels" and value else value
+
+
+def _remote_value(test_case: dict, field: str):
+    if field in REFS:
+        ref = test_case.get(REFS[field])
+        return ref.get("id") if isinstance(ref, dict) else test_case.get(field)
+    return _local_value(test_case, field)
+
+
+def _is_changed(definition: dict, test_case: dict, field: str) -> bool:
+    if field == "customFields":
+        remote = test_case.get(field) or {}
+        return any(remote.get(name) != value
+                   for name, value in (definition.get(field) or {}).items())
+    return _local_value(definition, field) != _remote_value(test_case, field)
+
+
+class SyncOperation:
+    """
+    Planned change of a test case.
+
+    :param action: "create" or "update"
+    :param definition: local test case definition
+    :param remote: remote test case dict, None for creation
+    :param fields: names of the fields to be sent
+    :param steps: whether the test steps are to be posted
+    """
+    def __init__(self, action: str, definition: dict, remote: dict = None, fields=(),
+                 steps: bool = False):
+        self.action = action
+        self.definition = definition
+        self.remote = remote
+        self.fields = tuple(fields)
+        self.steps = steps
+        self.key = remote["key"] if remote else None
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}({self.action}, {self.key or self.definition['name']!r}"
+                f", fields={list(self.fields)}, steps={self.steps})")
+
+
+class SyncPlan:
+    """
+    Test case sync plan: operations to be made, number of unchanged test cases
+    and, once the plan is applied, the BulkReport with SyncOperation items.
+    """
+    def __init__(self):
+        self.creates = []
+        self.updates = []
+        self.unchanged = 0
+        self.report = None
+
+    @property
+    def operations(self) -> list:
+        """Creations and updates"""
+        return self.creates + self.updates
+
+    def summary(self) -> dict:
+        """
+        Get numbers of planned operations.
+
+        :return: dict with numbers of creations, updates, test cases with steps to be posted
+            and unchanged test cases
+        """
+        return {"create": len(self.creates),
+                "update": len(self.updates),
+                "steps": sum(1 for operation in self.operations if operation.steps),
+                "unchanged": self.unchanged}
+
+    def __repr__(self):
+        summary = ", ".join(f"{name}={count}" for name, count in self.summary().items())
+        return f"{self.__class__.__name__}({summary})"
+
+
+class TestCaseSync:
+    """
+    Upsert sync of test cases defined in code. Remote test cases are fetched once with
+    a paginated sweep and compared with the local definitions by content fingerprints,
+    only test cases which differ are created or updated, concurrently.
+
+    Definitions are dicts with create_test_case fields (name, objective, labels, folderId,
+    etc.), optional key and optional steps list with post_test_steps items. A definition
+    is matched with a remote test case by key, or by name if there is no key. Only the
+    SYNC_FIELDS present in a definition are compared and updated, the other remote fields
+    are kept. The same goes for custom fields: only the ones in a definition are compared and
+    updated, the other remote custom fields are kept.
+
+    Test steps are not returned with test cases, so fingerprints of the posted steps are kept
+    in the state file. Steps of a test case without a saved fingerprint are posted once.
+
+    :param api: CloudApiWrapper object (ZephyrScale(...).api)
+    :param project_key: Jira project key
+
+    :param keyword state_path: path to json file with fingerprints of the posted steps,
+        they are kept in memory only if not set
+    :param keyword workers: number of test cases synced concurrently
+    :param keyword retries: max number of retries for a test case
+    """
+    __test__ = False
+
+    def __init__(self, api, project_key: str, **kwargs):
+        ensure_sync(api.session, self.__class__.__name__)
+        self.api = api
+        self.project_key = project_key
+        self.state_path = kwargs.get("state_path")
+        self.workers = kwargs.get("workers", 8)
+        self.retries = kwargs.get("retries", 2)
+        self._lock = threading.Lock()
+        self._steps = {}
+        if self.state_path and os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as file:
+                self._steps = json.load(file)
+
+    def plan(self, definitions, page_size: int = 1000) -> SyncPlan:
+        """
+        Compare the local definitions with the remote test cases.
+
+        :param definitions: iterable with test case definitions
+        :param page_size: number of test cases to request per page
+        :return: SyncPlan object
+        """
+        by_key, by_name = {}, {}
+        for test_case in self.api.test_cases.get_test_cases(projectKey=self.project_key,
+                                                            maxResults=page_size):
+            by_key[test_case["key"]] = test_case
+            by_name.setdefault(test_case["name"], test_case)
+
+        plan = SyncPlan()
+        for definition in definitions:
+            remote = (by_key.get(definition["key"]) if definition.get("key")
+                      else by_name.get(definition["name"]))
+            steps = definition.get("steps")
+            if remote is None:
+                plan.creates.append(SyncOperation("create", definition, steps=bool(steps)))
+                continue
+            fields = [field for field in SYNC_FIELDS if field in definition
+                      and _is_changed(definition, remote, field)]
+            steps_changed = (steps is not None
+                             and self._steps.get(remote["key"]) != fingerprint(steps))
+            if fields or steps_changed:
+                plan.updates.append(SyncOperation("update", definition, remote, fields,
+                                                  steps_changed))
+            else:
+                plan.unchanged += 1
+        logger.debug(f"Planned sync of {self.project_key}: {plan}")
+        return plan
+
+    def apply(self, plan: SyncPlan) -> SyncPlan:
+        """
+        Make the planned creations and updates concurrently. Creations are retried only
+        if they are throttled or not sent, since a retry after a timeout could create
+        a duplicate test case.
+
+        :param plan: SyncPlan object
+        :return: the plan with BulkReport of the operations
+        """
+        report = BulkReport()
+        for offset, operations, idempotent in ((0, plan.creates, False),
+                                               (len(plan.creates), plan.updates, True)):
+            outcomes = run_bulk(self._apply, operations, workers=self.workers,
+                                retries=self.retries, keep_items=True, idempotent=idempotent)
+            for outcome in outcomes.succeeded + outcomes.failed:
+                outcome.index += offset
+                report.add(outcome)
+        plan.report = report
+        self._save_state()
+        logger.debug(f"Synced {self.project_key}: {plan.report}")
+        return plan
+
+    def sync(self, definitions, dry_run: bool = False) -> SyncPlan:
+        """
+        Plan the sync and apply it.
+
+        :param definitions: iterable with test case definitions
+        :param dry_run: whether to only plan the sync without making any changes
+        :return: SyncPlan object, with the BulkReport unless it is a dry run
+        """
+        plan = self.plan(definitions)
+        return plan if dry_run else self.apply(plan)
+
+    def _apply(self, operation: SyncOperation):
+        definition = operation.definition
+        if operation.key is None:
+            fields = {field: value for field, value in definition.items()
+                      if field not in ("key", "name", "steps")}
+            created = self.api.test_cases.create_test_case(self.project_key, definition["name"],
+                                                           **fields)
+            # A retry of the operation must not create the test case again
+            operation.key = created["key"]
+        elif operation.fields:
+            self._update(operation)
+        if operation.steps:
+            self._post_steps(operation.key, definition["steps"])
+        return operation.key
+
+    def _update(self, operation: SyncOperation):
+        body = {field: value for field, value in operation.remote.items()
+                if field not in READ_ONLY_FIELDS}
+        for field in operation.fields:
+            value = operation.definition[field]
+            if field in REFS:
+                body[REFS[field]] = {"id": value} if value is not None else None
+            elif field == "customFields":
+                body[field] = dict(body.get(field) or {}, **value)
+            else:
+                body[field] = value
+        self.api.test_cases.update_test_case(body.pop("key"), body.pop("id"), body.pop("name"),
+                                             body.pop("project")["id"],
+                                             body.pop("priority")["id"],
+                                             body.pop("status")["id"], **body)
+
+    def _post_steps(self, test_case_key: str, steps: list):
+        for index, chunk in enumerate(chunked(steps, MAX_STEPS_PER_REQUEST) or [[]]):
+            self.api.test_cases.post_test_steps(test_case_key,
+                                                "APPEND" if index else "OVERWRITE", chunk)
+        with self._lock:
+            self._steps[test_case_key] = fingerprint(steps)
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        with self._lock:
+            state = dict(self._steps)
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(temp_path, self.state_path)
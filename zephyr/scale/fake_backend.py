@@ -0,0 +1,262 @@
+"""
+A module with an in-process fake of Zephyr Scale Cloud and Server APIs for offline
+load and concurrency testing.
+"""
+import io
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.client import responses
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from zephyr.scale.cloud.endpoints.paths import CloudPaths
+from zephyr.scale.server.endpoints.paths import ServerPaths
+from zephyr.utils.common import path_patterns
+
+
+CLOUD = "cloud"
+SERVER = "server"
+MAX_RESULTS_LIMIT = 1000
+KEY_PREFIXES = {"testcases": "T", "testcase": "T",
+                "testcycles": "R", "testrun": "C",
+                "testplans": "P", "testplan": "P",
+                "testexecutions": "E"}
+
+
+class FakeZephyrAdapter(BaseAdapter):  # pylint: disable=too-many-instance-attributes
+    """
+    Transport adapter emulating Zephyr Scale API in memory. Mount it on a session to send
+    requests to it instead of the network:
+
+        adapter = FakeZephyrAdapter(latency=0.05, jitter=0.01, throttle_rate=0.1)
+        zscale = ZephyrScale(base_url="https://fake.zephyr/v2/", token="token",
+                             adapters={"https://fake.zephyr/": adapter})
+
+    Routes are built from CloudPaths or ServerPaths. Entities are kept per collection:
+    POST to a collection path creates an entity with generated id and key, GET, PUT and
+    DELETE of the entity path read, update and delete it, and sub-resources (like test steps)
+    are kept as lists. Cloud list responses follow the values/isLast/next pagination contract,
+    Server search routes support query projectKey filter, startAt, maxResults and fields.
+
+    Latency, errors and throttling are driven by a seeded random generator, so a run could
+    be reproduced.
+
+    :param api: "cloud" or "server"
+    :param keyword latency: response delay in seconds
+    :param keyword jitter: max random deviation of the delay in seconds
+    :param keyword throttle_rate: share of requests responded with 429
+    :param keyword error_rate: share of requests responded with 500
+    :param keyword retry_after: Retry-After header value of 429 responses in seconds
+    :param keyword page_size: default maxResults of paginated responses
+    :param keyword seed: seed of the random generator
+    """
+    def __init__(self, api: str = CLOUD, **kwargs):
+        super().__init__()
+        if api not in (CLOUD, SERVER):
+            raise ValueError(f"Unknown api {api}, should be {CLOUD} or {SERVER}")
+        self.api = api
+        self.latency = kwargs.get("latency", 0.0)
+        self.jitter = kwargs.get("jitter", 0.0)
+        self.throttle_rate = kwargs.get("throttle_rate", 0.0)
+        self.error_rate = kwargs.get("error_rate", 0.0)
+        self.retry_after = kwargs.get("retry_after", 0)
+        self.page_size = kwargs.get("page_size", 10)
+        self.calls = Counter()
+        self._random = random.Random(kwargs.get("seed", 0))
+        self._routes = path_patterns(CloudPaths if api == CLOUD else ServerPaths)
+        self._lock = threading.Lock()
+        self._entities = {}
+        self._sub_resources = {}
+        self._ids = Counter()
+
+    def add(self, collection: str, entities: list) -> list:
+        """
+        Add entities to a collection, ids and keys are generated if missing.
+
+        :param collection: collection path, e.g. CloudPaths.CASES
+        :param entities: list with entity dicts
+        :return: list with added entities
+        """
+        with self._lock:
+            return [self._create(collection, entity) for entity in entities]
+
+    def entities(self, collection: str) -> list:
+        """
+        Get entities of a collection.
+
+        :param collection: collection path, e.g. CloudPaths.CASES
+        :return: list with entity dicts
+        """
+        with self._lock:
+            return list(self._entities.get(collection, {}).values())
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ,unused-argument
+        url = urlparse(request.url)
+        route = self._match(url.path)
+        with self._lock:
+            self.calls[(request.method, route[0])] += 1
+            roll = self._random.random()
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if roll < self.throttle_rate:
+            return self._response(request, 429, {"errorCode": 429, "message": "Too many requests"},
+                                  {"Retry-After": str(self.retry_after)})
+        if roll < self.throttle_rate + self.error_rate:
+            return self._response(request, 500, {"errorCode": 500, "message": "Injected error"})
+        if route[0] is None:
+            return self._response(request, 404, {"errorCode": 404,
+                                                 "message": f"No route for {url.path}"})
+
+        params = dict(parse_qsl(url.query))
+        with self._lock:
+            status, content = self._dispatch(request.method, route, params,
+                                             self._parse_body(request))
+        if isinstance(content, dict) and "values" in content and not content["isLast"]:
+            query = urlencode(dict(params, startAt=content["startAt"] + content["maxResults"],
+                                   maxResults=content["maxResults"]))
+            content["next"] = urlunparse(url._replace(query=query))
+        return self._response(request, status, content)
+
+    def close(self):
+        pass
+
+    def _match(self, path):
+        for name, template, regex in self._routes:
+            match = regex.search(path)
+            if match:
+                return name, template, match.groups()
+        return None, None, ()
+
+    @staticmethod
+    def _parse_body(request):
+        body = request.body
+        if not body or "json" not in request.headers.get("Content-Type", ""):
+            return None
+        return json.loads(body)
+
+    @staticmethod
+    def _response(request, status, content, headers=None):
+        body = b"" if content is None else json.dumps(content).encode()
+        response = Response()
+        response.status_code = status
+        response.reason = responses.get(status, "")
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json",
+                                                "Content-Length": str(len(body))})
+        response.headers.update(headers or {})
+        response.encoding = "utf-8"
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def _create(self, collection, entity):
+        """Store an entity generating its id and key, should be called under the lock"""
+        self._ids[collection] += 1
+        entity = dict(entity or {})
+        entity.setdefault("id", self._ids[collection])
+        if collection in KEY_PREFIXES:
+            project_key = entity.get("projectKey") or "TEST"
+            entity.setdefault("key", f"{project_key}-{KEY_PREFIXES[collection]}{entity['id']}")
+        self._entities.setdefault(collection, {})[str(entity.get("key", entity["id"]))] = entity
+        return entity
+
+    def _find(self, collection, key):
+        """Find an entity by its key or id, should be called under the lock"""
+        entities = self._entities.get(collection, {})
+        if key in entities:
+            return entities[key]
+        return next((entity for entity in entities.values() if str(entity["id"]) == key), None)
+
+    def _dispatch(self, method, route, params, body):
+        """Process a request, should be called under the lock"""
+        name, template, args = route
+        if name.endswith("SEARCH"):
+            return 200, self._search(template.split("/")[0], params)
+        if name in ("AUT_CUSTOM", "AUT_CUCUMBER", "AUT_JUNIT", "ATM_PRJ_KEY", "ATM_CUCUMBER"):
+            return self._automation(args, params)
+        if name == "RUN_TEST_RESULTS":
+            return self._test_results(method, args[0], body)
+        if not args:
+            return self._collection(method, template, params, body)
+        if template.endswith("/{}") and template.count("{}") == 1:
+            return self._entity(method, template[:-3], args[0], body)
+        return self._sub_resource(method, (template, args), params, body)
+
+    def _collection(self, method, collection, params, body):
+        if method == "POST":
+            entity = self._create(collection, body)
+            return 201, {"id": entity["id"], "key": entity.get("key")}
+        return 200, self._list(list(self._entities.get(collection, {}).values()), params)
+
+    def _automation(self, args, params):
+        """Automation uploads create a test cycle (test run on Server) each"""
+        collection = CloudPaths.CYCLES if self.api == CLOUD else ServerPaths.RUN
+        project_key = args[0] if args else params.get("projectKey")
+        cycle = self._create(collection, {"projectKey": project_key})
+        return 200, {"testCycle": {"id": cycle["id"], "key": cycle["key"]}}
+
+    def _test_results(self, method, test_run_key, body):
+        if method == "GET":
+            return 200, [result for result in self._entities.get(ServerPaths.RES, {}).values()
+                         if result["testRunKey"] == test_run_key]
+        results = [self._create(ServerPaths.RES, dict(result, testRunKey=test_run_key))
+                   for result in body or []]
+        return 201, [{"id": result["id"]} for result in results]
+
+    def _entity(self, method, collection, key, body):
+        entity = self._find(collection, key)
+        if entity is None:
+            return 404, {"errorCode": 404, "message": f"{key} was not found"}
+        if method == "PUT":
+            entity.update(body or {})
+            return 200, None
+        if method == "DELETE":
+            del self._entities[collection][str(entity.get("key", entity["id"]))]
+            return 204, None
+        return 200, entity
+
+    def _sub_resource(self, method, resource, params, body):
+        items = self._sub_resources.setdefault(resource, [])
+        if method == "GET":
+            return 200, self._list(items, params)
+        if isinstance(body, dict) and isinstance(body.get("items"), list):
+            if body.get("mode") == "OVERWRITE":
+                del items[:]
+            items.extend(body["items"])
+        elif body is not None:
+            items.append(body)
+        return 201, {"id": len(items)}
+
+    def _list(self, items, params):
+        """Filter entities and paginate them for Cloud"""
+        if params.get("projectKey"):
+            items = [item for item in items if item.get("projectKey") == params["projectKey"]]
+        if self.api == SERVER:
+            return items
+        start_at = int(params.get("startAt", 0))
+        max_results = min(int(params.get("maxResults", self.page_size)), MAX_RESULTS_LIMIT)
+        return {"next": None, "startAt": start_at, "maxResults": max_results,
+                "total": len(items), "isLast": start_at + max_results >= len(items),
+                "values": items[start_at:start_at + max_results]}
+
+    def _search(self, collection, params):
+        """Server search with projectKey query filter, offset, limit and fields"""
+        items = list(self._entities.get(collection, {}).values())
+        project = re.search(r'projectKey\s*=\s*"?([\w-]+)"?', params.get("query", ""))
+        if project:
+            items = [item for item in items if item.get("projectKey") == project.group(1)]
+        start_at = int(params.get("startAt", 0))
+        items = items[start_at:start_at + int(params.get("maxResults", 200))]
+        if params.get("fields"):
+            fields = params["fields"].split(",")
+            items = [{field: item[field] for field in fields if field in item} for item in items]
+        return items
@@ -0,0 +1,291 @@
+"""
+A module with request instrumentation hooks: per-endpoint latency histograms, byte counts
+and tracing spans.
+"""
+import logging
+import threading
+from functools import lru_cache
+
+from zephyr.utils.common import path_patterns
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover
+    trace = None
+
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets: values below 2 * SUB_BUCKETS microseconds are exact, bigger ones are
+# split to SUB_BUCKETS buckets per power of two, i.e. the relative error is below 1/32
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+
+@lru_cache(maxsize=1)
+def _api_path_patterns():
+    # The endpoints packages import the session module, which imports this one
+    # pylint: disable=import-outside-toplevel
+    from zephyr.scale.cloud.endpoints.paths import CloudPaths
+    from zephyr.scale.server.endpoints.paths import ServerPaths
+    return path_patterns(CloudPaths, ServerPaths)
+
+
+@lru_cache(maxsize=4096)
+def endpoint_template(endpoint: str) -> str:
+    """
+    Get the API path template of an endpoint, e.g. testcases/{} for testcases/PRJ-T1.
+
+    :param endpoint: endpoint relative to the base url
+    :return: path template or the endpoint itself if it is not a known API path
+    """
+    path = endpoint.split("?", 1)[0]
+    for _, template, regex in _api_path_patterns():
+        if regex.search(path):
+            return template
+    return path
+
+
+class RequestInfo:  # pylint: disable=too-many-instance-attributes
+    """
+    Details of a request passed to hooks. before_request gets it with method, endpoint
+    and template, after_request gets it complete.
+
+    :param method: request method in upper case
+    :param endpoint: endpoint relative to the base url
+    """
+    __slots__ = ("method", "endpoint", "template", "status", "latency", "request_bytes",
+                 "response_bytes", "retries", "error", "context")
+
+    def __init__(self, method: str, endpoint: str):
+        self.method = method
+        self.endpoint = endpoint
+        self.template = endpoint_template(endpoint)
+        self.status = None
+        self.latency = 0.0
+        self.request_bytes = None
+        self.response_bytes = None
+        self.retries = 0
+        self.error = None
+        self.context = {}
+
+    def set_response(self, response, stream: bool = False):
+        """
+        Fill the status and byte counts from a response.
+
+        :param response: requests.Response object
+        :param stream: whether the response body is streamed, so it should not be read
+        """
+        self.status = response.status_code
+        body = response.request.body if response.request is not None else None
+        if isinstance(body, str):
+            body = body.encode()
+        if isinstance(body, bytes):
+            self.request_bytes = len(body)
+        elif body is not None and response.request.headers.get("Content-Length"):
+            self.request_bytes = int(response.request.headers["Content-Length"])
+        length = response.headers.get("Content-Length")
+        if length:
+            self.response_bytes = int(length)
+        elif not stream:
+            self.response_bytes = len(response.content)
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}({self.method} {self.template}, status={self.status}, "
+                f"latency={self.latency:.3f}s, retries={self.retries})")
+
+
+class RequestHook:
+    """
+    Base class of request hooks. Hooks are passed to ZephyrSession with the hooks keyword
+    or added with ZephyrSession.add_hook and called around every sent request, retries
+    included. Exceptions raised by hooks are logged and do not break requests.
+    """
+    def before_request(self, info: RequestInfo):
+        """
+        Called before a request is sent.
+
+        :param info: RequestInfo object, its context dict could be used to keep state
+        """
+
+    def after_request(self, info: RequestInfo):
+        """
+        Called after a request is complete, with a response or a network error.
+
+        :param info: RequestInfo object
+        """
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram with microsecond resolution and bounded relative error,
+    keeping a counter per bucket instead of the values.
+    """
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < 2 * SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        return shift * SUB_BUCKETS + (value >> shift)
+
+    @staticmethod
+    def _highest_value(index: int) -> int:
+        """The highest value of a bucket"""
+        if index < 2 * SUB_BUCKETS:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        return ((index - shift * SUB_BUCKETS + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        """
+        Record a value.
+
+        :param seconds: latency in seconds
+        """
+        index = self._index(max(int(seconds * 1_000_000), 0))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get a percentile value.
+
+        :param percent: percentile, e.g. 99.9
+        :return: latency in seconds, the highest value of the bucket, 0 if there are no values
+        """
+        if not self.count:
+            return 0.0
+        rank = max(percent / 100 * self.count, 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._highest_value(index) / 1_000_000, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Get count, mean, min, max and p50, p90, p99 latencies in seconds"""
+        return {"count": self.count,
+                "mean": self.total / self.count if self.count else 0.0,
+                "min": self.min or 0.0,
+                "p50": self.percentile(50),
+                "p90": self.percentile(90),
+                "p99": self.percentile(99),
+                "max": self.max or 0.0}
+
+
+class EndpointStats:
+    """Statistics of an endpoint: latency histogram, byte counts, errors and retries"""
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.errors = 0
+        self.retries = 0
+
+    def summary(self) -> dict:
+        """Get the statistics as a dict"""
+        return dict(self.latency.summary(), request_bytes=self.request_bytes,
+                    response_bytes=self.response_bytes, errors=self.errors, retries=self.retries)
+
+
+class LatencyCollector(RequestHook):
+    """
+    Hook collecting in-memory statistics per method and templated endpoint, e.g.
+    "GET testcases/{}". Requests failed with a network error or a status of 400 or higher
+    are counted as errors.
+    """
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def after_request(self, info: RequestInfo):
+        key = f"{info.method} {info.template}"
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats()
+            stats.latency.record(info.latency)
+            stats.request_bytes += info.request_bytes or 0
+            stats.response_bytes += info.response_bytes or 0
+            stats.retries += info.retries
+            if info.error is not None or (info.status or 0) >= 400:
+                stats.errors += 1
+
+    def stats(self) -> dict:
+        """
+        Get collected statistics.
+
+        :return: dict with "METHOD template" keys and dicts with count, latency percentiles
+            in seconds, byte counts, errors and retries
+        """
+        with self._lock:
+            return {key: stats.summary() for key, stats in self._stats.items()}
+
+    def reset(self):
+        """Drop collected statistics"""
+        with self._lock:
+            self._stats.clear()
+
+
+class OpenTelemetryHook(RequestHook):
+    """
+    Hook emitting an OpenTelemetry client span per request, named like "GET testcases/{}".
+
+    NOTE: requires opentelemetry-api to be installed.
+
+    :param tracer: opentelemetry Tracer, the global tracer provider one by default
+    """
+    def __init__(self, tracer=None):
+        if trace is None:
+            raise ImportError("OpenTelemetryHook requires opentelemetry-api, "
+                              "install it with: pip install opentelemetry-api")
+        self.tracer = tracer or trace.get_tracer(__name__)
+
+    def before_request(self, info: RequestInfo):
+        info.context["span"] = self.tracer.start_span(
+            f"{info.method} {info.template}", kind=trace.SpanKind.CLIENT,
+            attributes={"http.request.method": info.method, "url.template": info.template,
+                        "zephyr.endpoint": info.endpoint})
+
+    def after_request(self, info: RequestInfo):
+        span = info.context.pop("span", None)
+        if span is None:
+            return
+        if info.status is not None:
+            span.set_attribute("http.response.status_code", info.status)
+        for name, value in (("http.request.body.size", info.request_bytes),
+                            ("http.response.body.size", info.response_bytes),
+                            ("http.request.resend_count", info.retries)):
+            if value:
+                span.set_attribute(name, value)
+        if info.error is not None:
+            span.record_exception(info.error)
+        if info.error is not None or (info.status or 0) >= 400:
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+        span.end()
+
+
+def call_hooks(hooks, stage: str, info: RequestInfo):
+    """
+    Call a stage method of hooks ignoring (but logging) their errors.
+
+    :param hooks: iterable with RequestHook objects
+    :param stage: before_request or after_request
+    :param info: RequestInfo object
+    """
+    for hook in hooks:
+        try:
+            getattr(hook, stage)(info)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception(f"Request hook {hook} failed on {stage}")
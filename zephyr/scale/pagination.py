@@ -0,0 +1,322 @@
+"""
+A module with resumable iteration over paginated endpoints.
+"""
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from urllib.parse import urlparse, parse_qs
+
+from zephyr.utils.json_stream import PageStream
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class PaginationCursor:
+    """
+    Serializable position of a paginated request: the endpoint, its params and the offset
+    (startAt) of the first page which has not been completely consumed yet.
+
+    :param endpoint: endpoint the pages are requested from
+    :param params: dict with request params, without startAt
+    :param start_at: offset of the next page
+    :param pages: number of pages consumed
+    :param done: whether the last page has been consumed
+    """
+    def __init__(self, endpoint: str, params: dict = None, start_at: int = 0,
+                 pages: int = 0, done: bool = False):
+        self.endpoint = endpoint
+        self.params = {key: value for key, value in (params or {}).items() if key != "startAt"}
+        self.start_at = start_at
+        self.pages = pages
+        self.done = done
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(endpoint={self.endpoint!r}, "
+                f"start_at={self.start_at}, pages={self.pages}, done={self.done})")
+
+    def to_dict(self) -> dict:
+        """Get the cursor as a json serializable dict"""
+        return {"endpoint": self.endpoint, "params": self.params, "start_at": self.start_at,
+                "pages": self.pages, "done": self.done}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Create a cursor from a dict made by to_dict"""
+        return cls(data["endpoint"], data.get("params"), data.get("start_at", 0),
+                   data.get("pages", 0), data.get("done", False))
+
+    def to_json(self) -> str:
+        """Get the cursor as a json string"""
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, data: str):
+        """Create a cursor from a json string made by to_json"""
+        return cls.from_dict(json.loads(data))
+
+
+def _first(value):
+    """Get a single param value, parse_qs returns lists"""
+    return value[0] if isinstance(value, list) else value
+
+
+class Paginator:  # pylint: disable=too-many-instance-attributes
+    """
+    Iterator with values from multiple paginated responses. It is returned by
+    ZephyrSession.get_paginated and could be used the same way as a generator.
+
+    The cursor attribute is moved forward only after all the values of a page have been
+    consumed, so a saved cursor could be passed to seek() (or ZephyrSession.resume_paginated)
+    to continue an interrupted iteration from the first incompletely consumed page.
+
+    :param session: ZephyrSession object
+    :param endpoint: endpoint to make requests to
+    :param params: dict with params to be passed to requests
+    :param prefetch: number of pages to keep in flight, 0 fetches pages sequentially
+    :param stream: whether to parse pages incrementally
+    :param cursor: PaginationCursor to start from
+    """
+    def __init__(self, session, endpoint: str, params: dict = None, *, prefetch: int = 0,
+                 stream: bool = False, cursor: PaginationCursor = None):
+        self.session = session
+        self.prefetch = prefetch
+        self.stream = stream
+        self.cursor = PaginationCursor(endpoint, params,
+                                       start_at=int(_first((params or {}).get("startAt", 0))))
+        self.logger = logging.getLogger(__name__)
+        self._callbacks = []
+        self._decoder = None
+        self._values = None
+        if cursor is not None:
+            self.seek(cursor)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._values is None:
+            self._values = self._iter_values()
+        value = next(self._values)
+        return self._decoder(value) if self._decoder else value
+
+    def close(self):
+        """Stop the iteration, pending prefetch requests are cancelled"""
+        if self._values is not None:
+            self._values.close()
+
+    def seek(self, cursor: PaginationCursor):
+        """
+        Continue from a saved cursor. Should be called before the iteration is started.
+
+        :param cursor: PaginationCursor of the same endpoint and params
+        :raises: ValueError if the cursor belongs to another request
+        """
+        if self._values is not None:
+            raise RuntimeError("Cannot seek a paginator which has been started")
+        if (cursor.endpoint, cursor.params) != (self.cursor.endpoint, self.cursor.params):
+            raise ValueError(f"{cursor} does not match {self.cursor.endpoint} "
+                             f"with params {self.cursor.params}")
+        self.cursor = PaginationCursor.from_dict(cursor.to_dict())
+
+    def on_page(self, callback):
+        """
+        Register a callable to be called with the cursor every time a page is consumed.
+
+        :param callback: callable(cursor)
+        :return: the paginator
+        """
+        self._callbacks.append(callback)
+        return self
+
+    def map(self, decoder):
+        """
+        Register a callable to convert every value with, e.g. a model class from_dict.
+
+        :param decoder: callable(value)
+        :return: the paginator
+        """
+        self._decoder = decoder
+        return self
+
+    def _page_done(self, next_offset: int, is_last: bool):
+        self.cursor.start_at = next_offset
+        self.cursor.pages += 1
+        self.cursor.done = is_last
+        for callback in self._callbacks:
+            callback(self.cursor)
+
+    def _next_offset(self, response, next_params, count):
+        """Get the offset of the page following the response"""
+        if "startAt" in next_params:
+            return int(_first(next_params["startAt"]))
+        return int(response.get("startAt", self.cursor.start_at)) + count
+
+    def _iter_values(self):
+        if not self.cursor.done:
+            yield from self._iter_pages()
+        if not self.cursor.done:
+            self.cursor.done = True
+            for callback in self._callbacks:
+                callback(self.cursor)
+
+    def _iter_pages(self):
+        endpoint = self.cursor.endpoint
+        params = dict(self.cursor.params)
+        if self.cursor.start_at:
+            params["startAt"] = self.cursor.start_at
+        self.logger.debug(f"Get paginated data from {self.cursor}")
+
+        while True:
+            if self.stream:
+                response, count = yield from self._get_streamed(endpoint, params)
+                if response is None:
+                    return
+            else:
+                response = self.session.get(endpoint, params=params)
+                if "values" not in response:
+                    return
+                values = response.get("values", [])
+                count = len(values)
+                yield from values
+
+            is_last = response.get("isLast") is True
+            next_params = parse_qs(urlparse(response.get("next") or "").query)
+            self._page_done(self._next_offset(response, next_params, count), is_last)
+            if is_last:
+                break
+
+            if self.prefetch and not self.stream and response.get("maxResults"):
+                yield from self._get_prefetched(endpoint, params, response)
+                break
+
+            params = dict(params, **next_params)
+
+    def _get_streamed(self, endpoint, params):
+        """
+        Yields values of a page parsed incrementally from the response stream.
+
+        :return: tuple with a dict with the rest of the page fields or None if the page
+            has no values, and the number of values
+        """
+        response = self.session._request(  # pylint: disable=protected-access
+            "get", endpoint, return_raw=True, params=params, stream=True)
+        count = 0
+        with closing(response):
+            page = PageStream(response.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+                              encoding=response.encoding or "utf-8")
+            for value in page.values():
+                count += 1
+                yield value
+        return (page.fields if page.has_values else None), count
+
+    def _get_prefetched(self, endpoint, params, first_response):
+        """
+        Yields values from the pages following the first response, keeping `prefetch`
+        page requests in flight on a worker pool.
+        """
+        max_results = first_response["maxResults"]
+        next_offset = first_response.get("startAt", 0) + max_results
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self.prefetch) as executor:
+            def submit_next():
+                nonlocal next_offset
+                page_params = dict(params, startAt=next_offset, maxResults=max_results)
+                future = executor.submit(self.session.get, endpoint, params=page_params)
+                pending.append((next_offset, future))
+                next_offset += max_results
+
+            try:
+                for _ in range(self.prefetch):
+                    submit_next()
+
+                while pending:
+                    offset, future = pending.popleft()
+                    response = future.result()
+                    values = response.get("values", [])
+                    yield from values
+
+                    is_last = response.get("isLast") is True or len(values) < max_results
+                    self._page_done(offset + len(values), is_last)
+                    if is_last:
+                        break
+                    submit_next()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+
+class FileCheckpoint:
+    """
+    Persists the cursor of a paginator to a json file every N pages, so a failed export
+    could be resumed from the last checkpoint instead of the first page. The file is
+    removed when the iteration is complete.
+
+    Usage:
+        checkpoint = FileCheckpoint("executions.json", every=10)
+        for execution in checkpoint.resume(api.test_executions.get_test_executions()):
+            ...
+
+    :param path: path to the checkpoint file
+    :param every: number of pages between checkpoints
+    """
+    def __init__(self, path: str, every: int = 10):
+        self.path = path
+        self.every = every
+        self.logger = logging.getLogger(__name__)
+
+    def load(self):
+        """
+        Load the saved cursor.
+
+        :return: PaginationCursor or None if there is no checkpoint
+        """
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return PaginationCursor.from_json(file.read())
+        except FileNotFoundError:
+            return None
+
+    def save(self, cursor: PaginationCursor):
+        """
+        Save the cursor atomically, a crash while saving leaves the previous checkpoint.
+
+        :param cursor: PaginationCursor object
+        """
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(cursor.to_json())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Remove the checkpoint file"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _on_page(self, cursor):
+        if cursor.done:
+            self.clear()
+        elif cursor.pages % self.every == 0:
+            self.save(cursor)
+
+    def resume(self, paginator: Paginator) -> Paginator:
+        """
+        Continue the paginator from the saved checkpoint if there is one, and start saving
+        checkpoints for it.
+
+        :param paginator: Paginator object which has not been started
+        :return: the paginator
+        """
+        cursor = self.load()
+        if cursor is not None:
+            self.logger.info(f"Resume pagination from {cursor}")
+            paginator.seek(cursor)
+        return paginator.on_page(self._on_page)
@@ -4,6 +4,7 @@ A module with the Zephyr Scale base object.
 
 import logging
 
+from zephyr.scale.async_session import AsyncZephyrSession
 from zephyr.scale.zephyr_session import ZephyrSession
 from zephyr.scale.cloud.cloud_api import CloudApiWrapper
 from zephyr.scale.server.server_api import ServerApiWrapper
@@ -30,7 +31,7 @@ class ZephyrScale:
     """
     def __init__(self, base_url=None, api_version=API_V2, **kwargs):
         base_url = DEFAULT_BASE_URL if not base_url else base_url
-        session = ZephyrSession(base_url=base_url, **kwargs)
+        session = self._create_session(base_url=base_url, **kwargs)
 
         if api_version.lower() == API_V2:
             self.api = CloudApiWrapper(session)
@@ -40,6 +41,11 @@ class ZephyrScale:
             raise ValueError("API version should be either 'v1' (Server) or 'v2' (Cloud)")
         self.logger = logging.getLogger(__name__)
 
+    @staticmethod
+    def _create_session(base_url, **kwargs):
+        """Create a session object the api wrappers work with"""
+        return ZephyrSession(base_url=base_url, **kwargs)
+
     @classmethod
     def server_api(cls, base_url, **kwargs):
         """
@@ -48,3 +54,36 @@ class ZephyrScale:
         :param base_url: base API url to connect with
         """
         return cls(base_url=base_url, api_version=API_V1, **kwargs)
+
+
+class AsyncZephyrScale(ZephyrScale):
+    """
+    Asyncio flavour of the Zephyr Scale base object. It reuses the same Cloud and Server api
+    wrappers, but they are built on top of AsyncZephyrSession, so endpoint methods return
+    coroutines and paginated endpoints return async generators.
+
+    NOTE: requires aiohttp to be installed (pip install zephyr-python-api[async]).
+
+    Usage:
+        async with AsyncZephyrScale(token="<token>") as zscale:
+            test_case = await zscale.api.test_cases.get_test_case("<test_case_key>")
+
+    :param base_url: base API url to connect with
+    :param api_version: 'v2' for Cloud and 'v1' for Server
+
+    :raises ValueError: if api_version is not 'v1' or 'v2'
+    """
+    @staticmethod
+    def _create_session(base_url, **kwargs):
+        """Create an asyncio session object the api wrappers work with"""
+        return AsyncZephyrSession(base_url=base_url, **kwargs)
+
+    async def close(self):
+        """Close the underlying session"""
+        await self.api.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
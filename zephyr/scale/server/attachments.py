@@ -0,0 +1,203 @@
+"""
+A module with concurrent transfers of Zephyr Scale Server attachments.
+"""
+import hashlib
+import logging
+import os
+import threading
+
+from requests import HTTPError
+
+from zephyr.scale.bulk import BulkItemResult, BulkReport, run_bulk
+
+
+logger = logging.getLogger(__name__)
+HASH_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PARTIAL_CONTENT = 206
+RANGE_NOT_SATISFIABLE = 416
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Get SHA-256 hex digest of a file content, reading the file in chunks.
+
+    :param file_path: path to the file
+    :return: str with the digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TransferReport(BulkReport):
+    """
+    Report of attachment transfers. Besides succeeded and failed lists it has the skipped one:
+    uploads of files identical to the ones uploaded to the same entity before and downloads
+    of files existing already. Items are (endpoint, file_path) or (url, file_path) pairs.
+    """
+    def __init__(self):
+        super().__init__()
+        self.skipped = []
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(succeeded={self.succeeded_count}, "
+                f"failed={len(self.failed)}, skipped={len(self.skipped)}, "
+                f"elapsed={self.elapsed:.2f}s)")
+
+
+class AttachmentTransfer:
+    """
+    Transfer manager uploading and downloading lots of attachments concurrently on a bounded
+    thread pool, every transfer is retried individually.
+
+    Uploads are deduplicated by the file content hash: a file identical to one uploaded
+    to the same entity by this manager is not uploaded again. Every file is hashed once,
+    no matter how many entities it is attached to. Files which cannot be read are reported
+    as failed. An upload is retried only if it is throttled or the request is not sent,
+    since a retry after a timeout could attach the file twice.
+
+    Downloads are streamed to disk. A download is written to a .part file, which is renamed
+    on completion, and an interrupted download (in this or a previous run) is resumed from
+    the size of the .part file with a Range request.
+
+    :param session: ZephyrSession object
+    :param keyword workers: number of concurrent transfers
+    :param keyword retries: max number of retries for a transfer
+    :param keyword backoff: base backoff delay in seconds between retries
+    """
+    def __init__(self, session, **kwargs):
+        self.session = session
+        self.workers = kwargs.get("workers", 8)
+        self.retries = kwargs.get("retries", 2)
+        self.backoff = kwargs.get("backoff", 0.5)
+        self._digests = {}
+        self._uploaded = {}
+        self._lock = threading.Lock()
+
+    def digest(self, file_path: str) -> str:
+        """
+        Get the file content hash, cached while the file size and modification time
+        do not change.
+
+        :param file_path: path to the file
+        :return: str with SHA-256 hex digest
+        """
+        stat = os.stat(file_path)
+        key = (os.path.realpath(file_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is None:
+            digest = file_digest(file_path)
+            with self._lock:
+                self._digests[key] = digest
+        return digest
+
+    def upload(self, items) -> TransferReport:
+        """
+        Upload files concurrently.
+
+        :param items: iterable with (endpoint, file_path) pairs, the endpoint is an attachments
+            endpoint, e.g. ServerPaths.RES_ATTACH.format(test_result_id)
+        :return: TransferReport object with upload responses as results
+        """
+        report = TransferReport()
+        duplicates = []
+
+        def unique_items():
+            for index, (endpoint, file_path) in enumerate(items):
+                try:
+                    key = (endpoint, self.digest(file_path))
+                except OSError as error:
+                    report.add(BulkItemResult(index, (endpoint, file_path), error=error,
+                                              attempts=0))
+                    continue
+                with self._lock:
+                    if key in self._uploaded:
+                        duplicates.append((index, (endpoint, file_path), key))
+                        continue
+                    self._uploaded[key] = None
+                yield index, endpoint, file_path, key
+
+        uploads = run_bulk(self._upload, unique_items(), workers=self.workers,
+                           retries=self.retries, backoff=self.backoff, keep_items=True,
+                           idempotent=False)
+        errors = {}
+        for outcome in uploads.succeeded + uploads.failed:
+            index, endpoint, file_path, key = outcome.item
+            report.add(BulkItemResult(index, (endpoint, file_path), outcome.result,
+                                      outcome.error, outcome.attempts))
+            if not outcome.ok:
+                errors[key] = outcome.error
+                with self._lock:
+                    self._uploaded.pop(key, None)
+        for index, item, key in duplicates:
+            if key in errors:
+                report.add(BulkItemResult(index, item, error=errors[key], attempts=0))
+            else:
+                report.skipped.append(BulkItemResult(index, item, self._uploaded.get(key),
+                                                     attempts=0))
+        report.elapsed = uploads.elapsed
+        logger.debug(f"Uploaded attachments: {report}")
+        return report
+
+    def _upload(self, item):
+        _, endpoint, file_path, key = item
+        result = self.session.post_file(endpoint, file_path)
+        with self._lock:
+            self._uploaded[key] = result
+        return result
+
+    def download(self, items) -> TransferReport:
+        """
+        Download files concurrently, resuming interrupted downloads. Existing files are skipped.
+
+        :param items: iterable with (url, file_path) pairs, the url is an attachment link
+            or an endpoint relative to the base url
+        :return: TransferReport object with file paths as results
+        """
+        report = TransferReport()
+
+        def missing_items():
+            for index, (url, file_path) in enumerate(items):
+                if os.path.exists(file_path):
+                    report.skipped.append(BulkItemResult(index, (url, file_path), file_path,
+                                                         attempts=0))
+                else:
+                    yield index, url, file_path
+
+        downloads = run_bulk(self._download, missing_items(), workers=self.workers,
+                             retries=self.retries, backoff=self.backoff, keep_items=True)
+        for outcome in downloads.succeeded + downloads.failed:
+            index, url, file_path = outcome.item
+            report.add(BulkItemResult(index, (url, file_path), outcome.result, outcome.error,
+                                      outcome.attempts))
+        report.elapsed = downloads.elapsed
+        logger.debug(f"Downloaded attachments: {report}")
+        return report
+
+    def _download(self, item) -> str:
+        _, url, file_path = item
+        part_path = file_path + ".part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else None
+        try:
+            response = self.session.get(url, return_raw=True, stream=True, headers=headers)
+        except HTTPError as error:
+            if not offset or error.response.status_code != RANGE_NOT_SATISFIABLE:
+                raise
+            # The .part file is complete already
+            os.replace(part_path, file_path)
+            return file_path
+
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with response, open(part_path,
+                            "ab" if response.status_code == PARTIAL_CONTENT else "wb") as file:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+        os.replace(part_path, file_path)
+        return file_path
@@ -1,4 +1,7 @@
 from ...zephyr_session import EndpointTemplate
+from ..attachments import AttachmentTransfer
+from ..publisher import ResultPublisher
+from ..search import search_all
 from .paths import ServerPaths as Paths
 
 
@@ -45,14 +48,27 @@ class TestCaseEndpoints(EndpointTemplate):
 
     def create_step_attachment(self, test_case_key, step_index, file_path):
         """Create a new attachment on the specified Step of a Test Case"""
-        return self.session.post(Paths.CASE_STP_ATTACH.format(test_case_key, step_index),
-                                 file_path)
+        return self.session.post_file(Paths.CASE_STP_ATTACH.format(test_case_key, step_index),
+                                      file_path)
 
     def search_cases(self, query, **params):
         """Retrieve the Test Cases that matches the query passed as parameter"""
         params.update({"query": query})
         return self.session.get(Paths.CASE_SEARCH, params=params)
 
+    def search_all_cases(self, query, fields=None, page_size=200, workers=4, **params):
+        """
+        Generator with all the Test Cases matching the query, paged through automatically
+        with concurrent requests. See search_all for details.
+
+        :param query: TQL query
+        :param fields: comma separated fields to return, should include key to dedupe results
+        :param page_size: number of results per request
+        :param workers: max number of concurrent requests
+        """
+        return search_all(self.session, Paths.CASE_SEARCH, query, fields=fields,
+                          page_size=page_size, workers=workers, **params)
+
     def get_all_versions(self, test_case_key, **params):
         """Get all test case versions ids by its key name. Undocumented in API"""
         return self.session.get(Paths.CASE_VERS.format(test_case_key), params=params)
@@ -96,6 +112,19 @@ class TestPlanEndpoints(EndpointTemplate):
         params.update({"query": query})
         return self.session.get(Paths.PLAN_SEARCH, params=params)
 
+    def search_all_plans(self, query, fields=None, page_size=200, workers=4, **params):
+        """
+        Generator with all the Test Plans matching the query, paged through automatically
+        with concurrent requests. See search_all for details.
+
+        :param query: TQL query
+        :param fields: comma separated fields to return, should include key to dedupe results
+        :param page_size: number of results per request
+        :param workers: max number of concurrent requests
+        """
+        return search_all(self.session, Paths.PLAN_SEARCH, query, fields=fields,
+                          page_size=page_size, workers=workers, **params)
+
 
 class TestRunEndpoints(EndpointTemplate):
     """Api wrapper for "Test Run" endpoints"""
@@ -153,11 +182,35 @@ class TestRunEndpoints(EndpointTemplate):
         return self.session.post(Paths.RUN_TEST_RESULTS.format(test_run_key),
                                  json=results)
 
+    def create_test_results_batched(self, test_run_key, results, **kwargs):
+        """
+        Create new Test Results on the specified Test Run in batches of adaptive size,
+        retrying every batch individually. See ResultPublisher for the keyword arguments.
+
+        :param test_run_key: test run key
+        :param results: list with test result dicts
+        :return: PublishReport object with outcomes per test case
+        """
+        return ResultPublisher(self.session, **kwargs).publish({test_run_key: results})
+
     def search_runs(self, query, **params):
         """Retrieve the Test Runs that matches the query passed as parameter"""
         params.update({"query": query})
         return self.session.get(Paths.RUN_SEARCH, params=params)
 
+    def search_all_runs(self, query, fields=None, page_size=200, workers=4, **params):
+        """
+        Generator with all the Test Runs matching the query, paged through automatically
+        with concurrent requests. See search_all for details.
+
+        :param query: TQL query
+        :param fields: comma separated fields to return, should include key to dedupe results
+        :param page_size: number of results per request
+        :param workers: max number of concurrent requests
+        """
+        return search_all(self.session, Paths.RUN_SEARCH, query, fields=fields,
+                          page_size=page_size, workers=workers, **params)
+
 
 class TestResultEndpoints(EndpointTemplate):
     """Api wrapper for "Test Result" endpoints"""
@@ -232,6 +285,27 @@ class AttachmentEndpoints(EndpointTemplate):
         """Delete an Attachment given an id"""
         return self.session.delete(Paths.ATTACH.format(attachment_id))
 
+    def upload_attachments(self, items, **kwargs):
+        """
+        Upload lots of attachments concurrently, identical files are uploaded to the same
+        entity once. See AttachmentTransfer for the keyword arguments.
+
+        :param items: iterable with (endpoint, file_path) pairs, e.g.
+            (ServerPaths.RES_ATTACH.format(test_result_id), "screenshot.png")
+        :return: TransferReport object
+        """
+        return AttachmentTransfer(self.session, **kwargs).upload(items)
+
+    def download_attachments(self, items, **kwargs):
+        """
+        Download lots of attachments concurrently to disk, resuming interrupted downloads.
+        See AttachmentTransfer for the keyword arguments.
+
+        :param items: iterable with (url, file_path) pairs
+        :return: TransferReport object
+        """
+        return AttachmentTransfer(self.session, **kwargs).download(items)
+
 
 class EnvironmentEndpoints(EndpointTemplate):
     """Api wrapper for "Environment" endpoints"""
@@ -272,10 +346,13 @@ class AutomationEndpoints(EndpointTemplate):
         (https://bitbucket.org/smartbeartm4j/tm4j-junit-integration) to learn how
         to generate this file. Optionally, you can send a testCycle part in your form data
         to customize the created Test Cycle.
+
+        file_path could also be a directory or an iterable with result files, which are zipped
+        on the fly while they are uploaded.
         """
-        return self.session.post_file(Paths.ATM_PRJ_KEY.format(project_key),
-                                      file_path=file_path,
-                                      data=cycle_data)
+        return self.session.post_reports(Paths.ATM_PRJ_KEY.format(project_key),
+                                         file_path,
+                                         data=cycle_data)
 
     def create_cycle_cucumber(self, project_key, file_path, cycle_data=None):
         """
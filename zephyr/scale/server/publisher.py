@@ -0,0 +1,175 @@
+"""
+A module with batched publishing of Zephyr Scale Server test results.
+"""
+import json
+import logging
+import threading
+import time
+
+from zephyr.scale.bulk import BulkItemResult, BulkReport, call_with_retries, run_bulk
+from zephyr.scale.server.endpoints.paths import ServerPaths as Paths
+
+
+logger = logging.getLogger(__name__)
+PAYLOAD_TOO_LARGE = 413
+
+
+class AdaptiveBatchSize:
+    """
+    Batch size controller with additive increase and multiplicative decrease: the size grows
+    by step after every batch responded faster than the target latency and halves after
+    a slower or a failed one. It is thread-safe and could be shared by several publishers.
+
+    :param initial: initial batch size
+    :param minimum: min batch size
+    :param maximum: max batch size
+    :param target_latency: batch response time in seconds to stay below
+    :param step: size increase after a fast batch
+    """
+    def __init__(self, initial: int = 200, minimum: int = 10, maximum: int = 1000,
+                 target_latency: float = 5.0, step: int = 20):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.step = step
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float, ok: bool = True):
+        """
+        Adjust the size after a batch.
+
+        :param latency: batch response time in seconds
+        :param ok: whether the batch succeeded
+        """
+        with self._lock:
+            if ok and latency <= self.target_latency:
+                self.size = min(self.size + self.step, self.maximum)
+            else:
+                self.size = max(self.size // 2, self.minimum)
+
+
+class PublishReport(BulkReport):
+    """
+    Report of published test results. Besides succeeded and failed lists it has the outcomes
+    merged per test run and test case: by_run[test_run_key][test_case_key] is a BulkItemResult
+    with the result dict as item and the created entity (e.g. {"id": 1}) as result.
+    """
+    def __init__(self):
+        super().__init__()
+        self.by_run = {}
+
+    def add_result(self, test_run_key: str, item_result: BulkItemResult):
+        """Add a test result outcome to the report"""
+        self.add(item_result)
+        test_case_key = item_result.item.get("testCaseKey") if item_result.item else None
+        self.by_run.setdefault(test_run_key, {})[test_case_key] = item_result
+
+
+class ResultPublisher:
+    """
+    Publisher of test results to Server test runs. Results of a test run are split to batches
+    bounded by count and json size, which are posted sequentially, while different test runs
+    are published concurrently. The batch size adapts to the observed response time, a batch
+    rejected as too large (413) is halved until it is accepted or has a single result, and
+    the rest of the test run is sent in batches no larger than the accepted one.
+
+    Every batch is retried individually, so a failed batch does not affect the rest. Posting
+    results creates them, so a batch is retried only if it is throttled or has not been sent:
+    a batch failed with a read timeout or a server error could have been created, its results
+    are reported as failed with that error and are not posted again.
+
+    :param session: ZephyrSession object
+    :param keyword workers: number of test runs published concurrently
+    :param keyword retries: max number of retries for a batch
+    :param keyword backoff: base backoff delay in seconds between retries
+    :param keyword max_batch_bytes: max json size of a batch
+    :param keyword timeout: request timeout in seconds
+    :param keyword batch_size: AdaptiveBatchSize object or initial batch size
+    """
+    def __init__(self, session, **kwargs):
+        self.session = session
+        self.workers = kwargs.get("workers", 4)
+        self.retries = kwargs.get("retries", 2)
+        self.backoff = kwargs.get("backoff", 0.5)
+        self.max_batch_bytes = kwargs.get("max_batch_bytes", 4 * 1024 * 1024)
+        self.timeout = kwargs.get("timeout")
+        batch_size = kwargs.get("batch_size", 200)
+        self.batch_size = (AdaptiveBatchSize(batch_size) if isinstance(batch_size, int)
+                           else batch_size)
+
+    def publish(self, results_by_run) -> PublishReport:
+        """
+        Publish test results.
+
+        :param results_by_run: dict or iterable of (test_run_key, results) pairs, results are
+            lists with test result dicts with testCaseKey, status and optional fields
+        :return: PublishReport object
+        """
+        if isinstance(results_by_run, dict):
+            results_by_run = results_by_run.items()
+        runs_report = run_bulk(self._publish_run, results_by_run, workers=self.workers,
+                               retries=0, keep_items=True)
+
+        report = PublishReport()
+        for run in runs_report.succeeded:
+            for item_result in run.result:
+                report.add_result(run.item[0], item_result)
+        for run in runs_report.failed:
+            test_run_key, results = run.item
+            for index, result in enumerate(results):
+                report.add_result(test_run_key, BulkItemResult(index, result, error=run.error))
+        report.elapsed = runs_report.elapsed
+        logger.debug(f"Published test results: {report}")
+        return report
+
+    def _next_batch(self, results: list, start: int, limit: int = None) -> list:
+        """Get the next batch bounded by the current batch size, limit and max json size"""
+        count = self.batch_size.size if limit is None else min(self.batch_size.size, limit)
+        batch = []
+        size = 0
+        for result in results[start:start + count]:
+            size += len(json.dumps(result)) + 1
+            if batch and size > self.max_batch_bytes:
+                break
+            batch.append(result)
+        return batch
+
+    def _post_batch(self, test_run_key, batch):
+        return self.session.post(Paths.RUN_TEST_RESULTS.format(test_run_key), json=batch,
+                                 timeout=self.timeout)
+
+    def _publish_run(self, run_results) -> list:
+        """Publish results of a test run batch by batch, returns a list with BulkItemResult"""
+        test_run_key, results = run_results
+        results = list(results)
+        outcomes = []
+        start = 0
+        # Count limit of the run batches, halved after every batch rejected as too large
+        limit = None
+        while start < len(results):
+            batch = self._next_batch(results, start, limit)
+            started = time.monotonic()
+            created, error, attempts = call_with_retries(
+                lambda items: self._post_batch(test_run_key, items), batch,
+                retries=self.retries, backoff=self.backoff, idempotent=False)
+            self.batch_size.observe(time.monotonic() - started, error is None)
+            if error is not None and _too_large(error) and len(batch) > 1:
+                limit = len(batch) // 2
+                logger.debug(f"Split a batch of {len(batch)} results of {test_run_key}: {error}")
+                continue
+
+            if not isinstance(created, list):
+                created = []
+            for offset, result in enumerate(batch):
+                outcomes.append(BulkItemResult(start + offset, result,
+                                               created[offset] if offset < len(created) else None,
+                                               error, attempts))
+            start += len(batch)
+        return outcomes
+
+
+def _too_large(error: Exception) -> bool:
+    """Whether a batch has been rejected because of its size"""
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code == PAYLOAD_TOO_LARGE
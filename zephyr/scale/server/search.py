@@ -0,0 +1,94 @@
+"""
+A module with auto-paginating search for Zephyr Scale Server search endpoints.
+"""
+import json
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+def _identity(item):
+    """Key to dedupe search results by"""
+    if not isinstance(item, dict):
+        return json.dumps(item, sort_keys=True)
+    if "key" in item:
+        return item["key"]
+    if "id" in item:
+        return item["id"]
+    return json.dumps(item, sort_keys=True)
+
+
+def _concurrent_pages(get_page, start_at: int, page_size: int, workers: int):
+    """
+    Generator with pages requested concurrently from the start offset, keeping `workers`
+    requests in flight, till the first short page.
+    """
+    next_offset = start_at
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit_next():
+            nonlocal next_offset
+            pending.append(executor.submit(get_page, next_offset))
+            next_offset += page_size
+
+        try:
+            for _ in range(workers):
+                submit_next()
+            while pending:
+                page = pending.popleft().result()
+                yield page
+                if len(page) < page_size:
+                    break
+                submit_next()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def search_all(session, path: str, query: str, *, fields: str = None, page_size: int = 200,
+               workers: int = 4, **params):
+    """
+    Generator with all the results of a Server search endpoint (testcase/search, testrun/search,
+    testplan/search), which returns a single page per request.
+
+    The first page is requested alone, if it is full the following offsets are requested
+    concurrently keeping `workers` requests in flight. Results are yielded in the server order,
+    the search stops on the first short page and results seen on a previous page (the result
+    set could shift while it is paged through) are skipped.
+
+    :param session: ZephyrSession object
+    :param path: search endpoint
+    :param query: TQL query
+    :param fields: comma separated fields to return, e.g. TestCaseDefaults.CASE_FIELDS
+    :param page_size: number of results per request (maxResults)
+    :param workers: max number of concurrent requests
+    :param params: extra query params
+
+    :return: generator with results
+    """
+    params.update({"query": query, "maxResults": page_size})
+    if fields:
+        params["fields"] = fields
+    seen = set()
+
+    def unique(page):
+        for item in page:
+            identity = _identity(item)
+            if identity not in seen:
+                seen.add(identity)
+                yield item
+
+    def get_page(offset):
+        return session.get(path, params=dict(params, startAt=offset)) or []
+
+    page = get_page(0)
+    yield from unique(page)
+    if len(page) < page_size:
+        return
+
+    for page in _concurrent_pages(get_page, page_size, page_size, workers):
+        yield from unique(page)
+    logger.debug(f"Search {path} with {query!r} found {len(seen)} results")
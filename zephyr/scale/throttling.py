@@ -0,0 +1,201 @@
+"""
+A module with client side rate limiting and retry policy for Zephyr Scale sessions.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from requests import ConnectionError as RequestsConnectionError, ConnectTimeout
+from urllib3.exceptions import ConnectTimeoutError
+
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+THROTTLED_STATUS = 429
+
+
+def parse_retry_after(value):
+    """
+    Parse Retry-After header value.
+
+    :param value: header value, either delay in seconds or HTTP date
+    :return: delay in seconds or None if the value could not be parsed
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def is_not_sent(error: Exception) -> bool:
+    """
+    Checks whether a request failed before it has been sent, i.e. the connection could not
+    be established, so the server has not seen it.
+
+    :param error: exception raised by the call
+    :return: True if the request has not been sent
+    """
+    if isinstance(error, ConnectTimeout):
+        return True
+    if not isinstance(error, RequestsConnectionError) or not error.args:
+        return False
+    # requests wraps urllib3 MaxRetryError, its reason is the connect phase error if any
+    return isinstance(getattr(error.args[0], "reason", error.args[0]), ConnectTimeoutError)
+
+
+def _header_float(headers, *names):
+    """Get the first header from names which could be converted to float"""
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
+
+
+class TokenBucket:  # pylint: disable=too-many-instance-attributes
+    """
+    Thread-safe token bucket rate limiter, which could be shared by workers using
+    one session. Every request takes a token, tokens are refilled with the current rate.
+
+    The rate adapts to the server feedback: it is halved (down to min_rate) on every
+    throttled response and slowly recovers to the configured rate on successful ones.
+    Retry-After and rate limit headers (X-RateLimit-Remaining/Reset) pause the bucket.
+
+    :param rate: max number of requests per second
+    :param capacity: max burst size, defaults to the rate
+    :param min_rate: min number of requests per second to slow down to
+    """
+    def __init__(self, rate: float, capacity: float = None, min_rate: float = None):
+        self.max_rate = float(rate)
+        self.rate = self.max_rate
+        self.min_rate = float(min_rate) if min_rate else self.max_rate / 10
+        self.capacity = float(capacity) if capacity else max(self.max_rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take a token, blocking until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._paused_until - now
+                if delay <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def pause(self, delay: float):
+        """
+        Stop handing out tokens for delay seconds.
+
+        :param delay: pause in seconds
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + delay)
+            self._tokens = 0.0
+            self._updated = now
+
+    def update(self, response):
+        """
+        Adapt the bucket to the response status and rate limit headers.
+
+        :param response: requests.Response object
+        """
+        headers = response.headers
+        if response.status_code == THROTTLED_STATUS:
+            with self._lock:
+                self.rate = max(self.rate / 2, self.min_rate)
+            self.pause(parse_retry_after(headers.get("Retry-After")) or 1 / self.rate)
+            return
+
+        with self._lock:
+            self.rate = min(self.rate + self.max_rate / 20, self.max_rate)
+            remaining = _header_float(headers, "X-RateLimit-Remaining", "RateLimit-Remaining")
+            if remaining is not None:
+                self._tokens = min(self._tokens, remaining)
+        if remaining == 0:
+            reset = _header_float(headers, "X-RateLimit-Reset", "RateLimit-Reset")
+            if reset is not None:
+                # Reset is either an epoch timestamp or a number of seconds to wait
+                self.pause(reset - time.time() if reset > 1e9 else reset)
+
+
+class RetryPolicy:
+    """
+    Retry policy for the session requests with jittered exponential backoff.
+
+    Throttled (429) requests and requests which have not been sent (the connection could not
+    be established) are retried for any method, since the server has not processed them.
+    Other statuses and connection errors are retried only for idempotent methods.
+
+    :param total: max number of retries
+    :param backoff_factor: base delay in seconds, the delay is randomly chosen from
+        [0, backoff_factor * 2 ** attempt]
+    :param max_backoff: max delay in seconds
+    :param statuses: response statuses to be retried
+    :param methods: idempotent methods allowed to be retried on errors
+    """
+    def __init__(self, total=3, backoff_factor=0.5, max_backoff=60.0,
+                 statuses=RETRY_STATUSES, methods=IDEMPOTENT_METHODS):
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Get jittered exponential backoff delay.
+
+        :param attempt: zero-based number of the retry
+        :return: delay in seconds
+        """
+        return random.uniform(0, min(self.backoff_factor * 2 ** attempt, self.max_backoff))
+
+    def get_delay(self, method: str, attempt: int, response=None, sent: bool = True):
+        """
+        Get delay before the next attempt of a failed request.
+
+        :param method: request method
+        :param attempt: zero-based number of the retry
+        :param response: failed response or None if the request raised a connection error
+        :param sent: whether a request failed with a connection error could have been sent,
+            see is_not_sent
+
+        :return: delay in seconds or None if the request should not be retried
+        """
+        if attempt >= self.total:
+            return None
+        idempotent = method.upper() in self.methods
+        if response is None:
+            return self.backoff(attempt) if idempotent or not sent else None
+
+        status = response.status_code
+        if status not in self.statuses or (status != THROTTLED_STATUS and not idempotent):
+            return None
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return self.backoff(attempt)
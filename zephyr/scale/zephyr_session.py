@@ -2,9 +2,20 @@
 A module for Zephyr Scale session object.
 """
 import logging
-from urllib.parse import urlparse, parse_qs
+import os
+import time
+from json import dumps, loads
+from urllib.parse import urlencode
 
-from requests import HTTPError, Session
+from requests import ConnectionError as RequestsConnectionError, HTTPError, Session, Timeout
+from requests.adapters import HTTPAdapter
+
+from zephyr.scale.cache import CacheEntry, SingleFlight
+from zephyr.scale.instrumentation import RequestInfo, call_hooks
+from zephyr.scale.pagination import PaginationCursor, Paginator
+from zephyr.scale.throttling import RetryPolicy, TokenBucket, is_not_sent
+from zephyr.utils.multipart import MultipartEncoder, form_fields
+from zephyr.utils.zip_stream import ZipStream
 
 
 INIT_SESSION_MSG = "Initialize session by {}"
@@ -14,11 +25,16 @@ class InvalidAuthData(Exception):
     """Raised when Invalid authentication data provided."""
 
 
-class ZephyrSession:
+class ZephyrSession:  # pylint: disable=too-many-instance-attributes
     """
     Zephyr Scale basic session object. The authentication and response handling logic
     is placed here.
 
+    The session is thread-safe and could be shared across a thread pool: the connection pool,
+    rate limiter and response cache are synchronized, and the rest of the state is not
+    modified after creation. Set pool_maxsize to the number of threads using the session,
+    otherwise connections beyond the pool size are opened and discarded on every request.
+
     :param base_url: url to make requests to
     :param token: auth token
     :param username: username
@@ -26,6 +42,26 @@ class ZephyrSession:
     :param cookies: cookie dict
 
     :param keyword session_attrs: a dict with session attrs to be set as keys and their values
+    :param keyword prefetch_pages: default number of pages kept in flight by get_paginated,
+        0 (default) fetches pages sequentially
+    :param keyword stream_pages: whether get_paginated parses pages incrementally by default
+    :param keyword retry: RetryPolicy object or max number of retries for failed requests,
+        requests are not retried by default
+    :param keyword rate_limit: TokenBucket object or max number of requests per second,
+        could be shared by several sessions, no limit by default
+    :param keyword pool_connections: number of connection pools (hosts) to cache, 10 by default
+    :param keyword pool_maxsize: max number of connections kept alive per host, 10 by default
+    :param keyword pool_block: whether to wait for a free connection instead of opening
+        an extra one when the pool is exhausted, False by default
+    :param keyword adapters: a dict with url prefixes and transport adapters to mount for them,
+        e.g. per-host HTTPAdapter objects with their own pool settings
+    :param keyword cache: ResponseCache object (e.g. MemoryCache or DiskCache) to cache GET
+        responses in, mutating requests invalidate the cached entries of the same collection
+    :param keyword hooks: list with RequestHook objects (e.g. LatencyCollector) to be called
+        around every sent request
+    :param keyword coalesce_gets: whether to collapse identical concurrent GET requests
+        into one: threads asking for the same endpoint and params while a request is in flight
+        wait for it and get copies of its result, False by default
     """
     def __init__(self, base_url, token=None, username=None, password=None, cookies=None, **kwargs):
         self.base_url = base_url
@@ -48,8 +84,40 @@ class ZephyrSession:
         if kwargs.get("session_attrs"):
             self._modify_session(**kwargs.get("session_attrs"))
 
+        self._mount_adapters(**kwargs)
+
+        self.prefetch_pages = kwargs.get("prefetch_pages", 0)
+        self.stream_pages = kwargs.get("stream_pages", False)
+
+        retry = kwargs.get("retry")
+        self.retry = RetryPolicy(total=retry) if isinstance(retry, int) else retry
+        rate_limit = kwargs.get("rate_limit")
+        self.rate_limiter = (TokenBucket(rate_limit) if isinstance(rate_limit, (int, float))
+                             else rate_limit)
+        self.cache = kwargs.get("cache")
+        self.hooks = list(kwargs.get("hooks") or [])
+        self.single_flight = SingleFlight() if kwargs.get("coalesce_gets") else None
+
+    def add_hook(self, hook):
+        """
+        Add a request hook.
+
+        :param hook: RequestHook object
+        """
+        self.hooks = self.hooks + [hook]
+
+    def remove_hook(self, hook):
+        """
+        Remove a request hook.
+
+        :param hook: RequestHook object
+        """
+        self.hooks = [added for added in self.hooks if added is not hook]
+
     def _create_url(self, *args):
-        """Helper for URL creation"""
+        """Helper for URL creation, absolute urls (e.g. attachment links) are kept as they are"""
+        if len(args) == 1 and args[0].startswith(("http://", "https://")):
+            return args[0]
         return self.base_url + "/".join(args)
 
     def _modify_session(self, **kwargs):
@@ -58,6 +126,20 @@ class ZephyrSession:
         for session_attr, value in kwargs.items():
             setattr(self._session, session_attr, value)
 
+    def _mount_adapters(self, **kwargs):
+        """Mount transport adapters with connection pool settings"""
+        pool_kwargs = {name: kwargs[name] for name in ("pool_connections", "pool_maxsize",
+                                                        "pool_block") if name in kwargs}
+        if pool_kwargs:
+            self.logger.debug(f"Mount HTTP adapters with {pool_kwargs}")
+            adapter = HTTPAdapter(**pool_kwargs)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+        for prefix, adapter in (kwargs.get("adapters") or {}).items():
+            self.logger.debug(f"Mount {adapter} for {prefix}")
+            self._session.mount(prefix, adapter)
+
     def _request(self, method: str, endpoint: str, return_raw: bool = False, **kwargs):
         """
         General request wrapper with logging and handling response
@@ -66,20 +148,151 @@ class ZephyrSession:
         :param endpoint: endpoint to make request to
         :param return_raw: whether to return raw response or not
 
-        :raises: HTTPError if response status code is 400 or higher
+        :raises: HTTPError if response status code is 400 or higher (after retries)
 
         :return: response json, empty str or raw response
         """
         self.logger.debug(f"{method.capitalize()} data: endpoint={endpoint} and {kwargs}")
+        if (self.single_flight is not None and method.lower() == "get" and not return_raw
+                and not kwargs.get("stream")):
+            key = (endpoint, dumps(kwargs, sort_keys=True, default=str))
+            return self.single_flight.do(key, lambda: self._perform(method, endpoint, **kwargs))
+        return self._perform(method, endpoint, return_raw, **kwargs)
+
+    def _perform(self, method: str, endpoint: str, return_raw: bool = False, **kwargs):
+        """Make the request through the response cache if there is one"""
         url = self._create_url(endpoint)
-        response = self._session.request(method=method, url=url, **kwargs)
+        use_cache = kwargs.pop("use_cache", True)
+        if self.cache is not None:
+            if method.lower() == "get" and not return_raw and not kwargs.get("stream"):
+                if use_cache:
+                    return self._cached_get(endpoint, url, **kwargs)
+                return self._handle_response(self._send(method, url, **kwargs))
+            if method.lower() != "get":
+                try:
+                    response = self._send(method, url, **kwargs)
+                finally:
+                    self.cache.invalidate(self._cache_collection(endpoint))
+                return self._handle_response(response, return_raw)
+
+        response = self._send(method, url, **kwargs)
+        return self._handle_response(response, return_raw)
+
+    @staticmethod
+    def _handle_response(response, return_raw=False):
+        """
+        Handle response status and content.
+
+        :raises: HTTPError if response status code is 400 or higher
+
+        :return: response json, empty str or raw response
+        """
         if response.status_code < 400:
             if return_raw:
                 return response
             if response.text:
                 return response.json()
             return ""
-        raise HTTPError(f"Error {response.status_code}. Response: {response.content}")
+        raise HTTPError(f"Error {response.status_code}. Response: {response.content}",
+                        response=response)
+
+    @staticmethod
+    def _cache_collection(endpoint):
+        """Cache collection of the endpoint, i.e. 'statuses' for 'statuses/1'"""
+        return endpoint.split("/", 1)[0]
+
+    def _cached_get(self, endpoint: str, url: str, params: dict = None, **kwargs):
+        """
+        Get request wrapper working with the response cache. Fresh entries are returned
+        without a request, stale ones are revalidated with If-None-Match if they have an ETag.
+        """
+        collection = self._cache_collection(endpoint)
+        key = url
+        if params:
+            key += "?" + urlencode(sorted(params.items()), doseq=True)
+
+        entry = self.cache.get(collection, key)
+        now = time.time()
+        if entry is not None and entry.expires > now:
+            return loads(entry.body) if entry.body else ""
+
+        if entry is not None and entry.etag:
+            kwargs["headers"] = dict(kwargs.get("headers") or {}, **{"If-None-Match": entry.etag})
+        response = self._send("get", url, params=params, **kwargs)
+        expires = now + self.cache.ttl_for(endpoint)
+
+        if response.status_code == 304 and entry is not None:
+            entry.expires = expires
+            self.cache.set(collection, key, entry)
+            return loads(entry.body) if entry.body else ""
+
+        result = self._handle_response(response)
+        self.cache.set(collection, key, CacheEntry(response.text,
+                                                   response.headers.get("ETag"),
+                                                   expires))
+        return result
+
+    def _send(self, method: str, url: str, **kwargs):
+        """
+        Send a request respecting the rate limiter and retrying it according to
+        the retry policy. Request hooks are called around it if there are any.
+
+        :param method: request method
+        :param url: url to make request to
+
+        :return: requests.Response object
+        """
+        hooks = self.hooks
+        if not hooks:
+            return self._send_with_retries(method, url, **kwargs)[0]
+
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        info = RequestInfo(method.upper(), path)
+        call_hooks(hooks, "before_request", info)
+        started = time.perf_counter()
+        try:
+            response, info.retries = self._send_with_retries(method, url, **kwargs)
+            info.set_response(response, stream=kwargs.get("stream", False))
+            return response
+        except Exception as error:
+            info.error = error
+            raise
+        finally:
+            info.latency = time.perf_counter() - started
+            call_hooks(hooks, "after_request", info)
+
+    def _send_with_retries(self, method: str, url: str, **kwargs):
+        """
+        Send a request retrying it according to the retry policy.
+
+        :return: tuple with requests.Response object and number of retries made
+        """
+        attempt = 0
+        while True:
+            if attempt and hasattr(kwargs.get("data"), "seek"):
+                # A streamed body has been consumed by the previous attempt
+                kwargs["data"].seek(0)
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                response = self._session.request(method=method, url=url, **kwargs)
+            except (RequestsConnectionError, Timeout) as error:
+                delay = (self.retry.get_delay(method, attempt, sent=not is_not_sent(error))
+                         if self.retry else None)
+                if delay is None:
+                    raise
+            else:
+                if self.rate_limiter:
+                    self.rate_limiter.update(response)
+                if response.status_code < 400 or not self.retry:
+                    return response, attempt
+                delay = self.retry.get_delay(method, attempt, response)
+                if delay is None:
+                    return response, attempt
+
+            attempt += 1
+            self.logger.debug(f"Retry {method.upper()} {url} in {delay:.2f}s, attempt {attempt}")
+            time.sleep(delay)
 
     def get(self, endpoint: str, params: dict = None, **kwargs):
         """
@@ -88,6 +301,9 @@ class ZephyrSession:
         :param endpoint: endpoint to make request to
         :param params: dict with params to be passed to request
 
+        :param keyword use_cache: whether a cached response could be returned, False to always
+            make the request, e.g. before a read-modify-write
+
         :return: response json, empty str or raw response
         """
         return self._request("get", endpoint, params=params, **kwargs)
@@ -124,52 +340,106 @@ class ZephyrSession:
         """
         return self._request("delete", endpoint, **kwargs)
 
-    def get_paginated(self, endpoint, params=None):
+    def get_paginated(self, endpoint, params=None, prefetch=None, stream=None):
         """
         Get request wrapper for getting paginated data. Yields values from multiple get requests
         responses.
 
+        With prefetch enabled the first response is used to figure out the page size
+        (maxResults) and the offset (startAt), and the following pages are requested
+        concurrently, keeping up to `prefetch` requests in flight. Values are still yielded
+        in the server order.
+
+        With stream enabled the "values" array of every page is parsed incrementally from
+        the response stream and values are yielded as soon as they are decoded, so a whole
+        page is never loaded into memory. Pages are fetched sequentially in this mode.
+
+        The returned Paginator exposes a serializable cursor, which could be passed to
+        resume_paginated to continue an interrupted iteration.
+
         :param endpoint: endpoint to make request to
         :param params: dict with params to be passed to request
+        :param prefetch: number of pages to keep in flight, defaults to session prefetch_pages
+        :param stream: whether to parse pages incrementally, defaults to session stream_pages
 
-        :return: generator with values from responses
+        :return: Paginator with values from responses
         """
-        self.logger.debug(f"Get paginated data from endpoint={endpoint} and params={params}")
-        if params is None:
-            params = {}
+        return Paginator(self, endpoint, params,
+                         prefetch=self.prefetch_pages if prefetch is None else prefetch,
+                         stream=self.stream_pages if stream is None else stream)
 
-        while True:
-            response = self.get(endpoint, params=params)
-            if "values" not in response:
-                return
-
-            yield from response.get("values", [])
-
-            if response.get("isLast") is True:
-                break
+    def resume_paginated(self, cursor: PaginationCursor, prefetch=None, stream=None):
+        """
+        Continue getting paginated data from a saved cursor, starting with the first page
+        which has not been completely consumed.
 
-            params_str = urlparse(response.get("next")).query
-            params.update(parse_qs(params_str))
+        :param cursor: PaginationCursor object, e.g. Paginator.cursor or loaded from json
+        :param prefetch: number of pages to keep in flight, defaults to session prefetch_pages
+        :param stream: whether to parse pages incrementally, defaults to session stream_pages
 
-        return
+        :return: Paginator with values from responses
+        """
+        return Paginator(self, cursor.endpoint, cursor.params,
+                         prefetch=self.prefetch_pages if prefetch is None else prefetch,
+                         stream=self.stream_pages if stream is None else stream,
+                         cursor=cursor)
 
     def post_file(self, endpoint: str, file_path: str, to_files=None, **kwargs):
         """
         Post wrapper to send a file. Handles single file opening, sending its content and closing.
+        The multipart body is streamed: the file is read in chunks while it is sent, so memory
+        does not depend on the file size.
 
         :param endpoint: endpoint to make request to
         :param file_path: path to file to be sent
-        :param to_files: dict with files to be sent along with the main file
+        :param to_files: dict with files to be sent along with the main file, values are
+            file objects or tuples (filename, content[, content_type]) like requests files
+
+        :param keyword data: dict with form fields to be sent before the file
+        :param keyword progress: callable(sent_bytes, total_bytes) called while the body is sent
 
         :return: response json, empty str or raw response
         """
         with open(file_path, "rb") as file:
-            files = {"file": file}
+            return self._post_multipart(endpoint, ("file", (os.path.basename(file_path), file)),
+                                        to_files, **kwargs)
 
-            if to_files:
-                files.update(to_files)
+    def post_reports(self, endpoint: str, reports, to_files=None, **kwargs):
+        """
+        Post wrapper to send automation reports as a zip archive file. A path to an existing
+        .zip archive is sent as is, a directory or an iterable with report files is zipped
+        on the fly: it is compressed in a background thread while the archive is streamed
+        into the request, so the archive is never written to disk.
+
+        :param endpoint: endpoint to make request to
+        :param reports: path to .zip archive, path to a directory with report files or
+            an iterable with report file paths
+        :param to_files: dict with files to be sent along with the archive
 
-            return self._request("post", endpoint, files=files, **kwargs)
+        :param keyword data: dict with form fields to be sent before the archive
+        :param keyword progress: callable(sent_bytes, total_bytes) called while the body is sent
+
+        :return: response json, empty str or raw response
+        :raises FileNotFoundError: if a reports path is neither a file nor a directory
+        """
+        if isinstance(reports, (str, os.PathLike)) and not os.path.isdir(reports):
+            if not os.path.isfile(reports):
+                raise FileNotFoundError(f"No such report file or directory: {reports!r}")
+            return self.post_file(endpoint, reports, to_files, **kwargs)
+        archive = ZipStream(reports)
+        file_field = ("file", (archive.filename, archive, "application/zip"))
+        return self._post_multipart(endpoint, file_field, to_files, **kwargs)
+
+    def _post_multipart(self, endpoint: str, file_field: tuple, to_files=None, **kwargs):
+        """Send data form fields, the file field and to_files as a streamed multipart body"""
+        progress = kwargs.pop("progress", None)
+        fields = form_fields(kwargs.pop("data", None))
+        fields.append(file_field)
+        fields.extend((to_files or {}).items())
+        body = MultipartEncoder(fields, callback=progress)
+        headers = dict(kwargs.pop("headers", None) or {}, **{"Content-Type": body.content_type})
+
+        return self._request("post", endpoint, data=body, headers=headers, **kwargs)
 
 
 class EndpointTemplate:
@@ -1,4 +1,5 @@
 """Common helper functions to use with the package"""
+import re
 
 
 def cookie_str_to_dict(cookie_str: str) -> dict:
@@ -13,3 +14,22 @@ def cookie_str_to_dict(cookie_str: str) -> dict:
         _key, _value = cookie_substr.strip().split("=", maxsplit=1)
         cookie_dict.update({_key: _value})
     return cookie_dict
+
+
+def path_patterns(*paths) -> list:
+    """
+    Build regular expressions matching endpoints of API paths classes (CloudPaths, ServerPaths).
+    The more specific templates (e.g. testcase/search) go before the generic ones (testcase/{}).
+
+    :param paths: paths classes
+    :returns: list with (name, template, compiled regex) tuples, the regex groups are
+        the template placeholders values
+    """
+    patterns = []
+    for paths_class in paths:
+        for name, template in vars(paths_class).items():
+            if name.isupper() and isinstance(template, str):
+                pattern = "([^/]+)".join(re.escape(part) for part in template.split("{}"))
+                patterns.append((name, template, re.compile(f"(?:^|/){pattern}/?$")))
+    patterns.sort(key=lambda item: -len(item[1].replace("{}", "")))
+    return patterns
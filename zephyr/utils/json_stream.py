@@ -0,0 +1,117 @@
+"""Incremental parsing of paginated response bodies"""
+import codecs
+from json import JSONDecodeError, JSONDecoder
+
+
+WHITESPACE = " \t\n\r"
+JSON_DECODER = JSONDecoder()
+
+
+class PageStream:
+    """
+    Incremental parser of a paginated response body, e.g.
+    {"next": "...", "startAt": 0, "maxResults": 10, "isLast": false, "values": [{...}, ...]}.
+
+    values() yields the items of the "values" array as soon as they are decoded, so only
+    one item is kept in memory at once. The rest of the top level fields (isLast, next, etc.)
+    are collected to the fields dict, which is complete when values() is exhausted.
+
+    :param chunks: iterable with bytes chunks of the body
+    :param encoding: body encoding
+    """
+    def __init__(self, chunks, encoding: str = "utf-8"):
+        self.fields = {}
+        self.has_values = False
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read(self) -> bool:
+        """
+        Read more chunks to the buffer, at least doubling the unparsed part of it.
+
+        :return: False if there is nothing more to read
+        """
+        if self._eof:
+            return False
+        parts = [self._buffer[self._pos:]]
+        wanted = max(len(parts[0]), 1)
+        read = 0
+        while read < wanted:
+            try:
+                text = self._text_decoder.decode(next(self._chunks))
+            except StopIteration:
+                text = self._text_decoder.decode(b"", final=True)
+                self._eof = True
+            parts.append(text)
+            read += len(text)
+            if self._eof:
+                break
+        self._buffer = "".join(parts)
+        self._pos = 0
+        return read > 0 or not self._eof
+
+    def _peek(self, skip: str = WHITESPACE) -> str:
+        """Skip chars and return the next significant one or empty string at the end"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in skip:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                return ""
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in the response body, got {found!r}")
+        self._pos += 1
+
+    def _decode(self):
+        """Decode a complete json value starting at the current position"""
+        self._peek()
+        while True:
+            try:
+                value, end = JSON_DECODER.raw_decode(self._buffer, self._pos)
+            except JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+            # A number or a literal at the end of the buffer could be cut by the chunk border
+            if end == len(self._buffer) and self._read():
+                continue
+            self._pos = end
+            return value
+
+    def values(self):
+        """
+        Generator with the items of the "values" array.
+
+        :raises: ValueError if the body is not a valid json object
+        """
+        self._expect("{")
+        while True:
+            char = self._peek(WHITESPACE + ",")
+            if char == "}":
+                self._pos += 1
+                return
+            if not char:
+                raise ValueError("Unexpected end of the response body")
+
+            key = self._decode()
+            self._expect(":")
+            if key == "values" and self._peek() == "[":
+                self.has_values = True
+                self._pos += 1
+                while True:
+                    char = self._peek(WHITESPACE + ",")
+                    if char == "]":
+                        self._pos += 1
+                        break
+                    if not char:
+                        raise ValueError("Unexpected end of the response body")
+                    yield self._decode()
+            else:
+                self.fields[key] = self._decode()
@@ -0,0 +1,177 @@
+"""Incremental conversion of JUnit XML reports into Zephyr Scale custom results format"""
+import json
+import os
+import re
+from xml.etree.ElementTree import XMLParser
+
+
+CHUNK_SIZE = 64 * 1024
+MAX_OUTPUT = 4096
+MAX_SHARD_BYTES = 16 * 1024 * 1024
+TEST_CASE_KEY = re.compile(r"(?<![A-Za-z0-9])[A-Z][A-Z0-9_]*-T\d+(?!\d)")
+RESULTS = {"failure": "Failed", "error": "Failed", "skipped": "Not Executed"}
+OUTPUTS = ("system-out", "system-err")
+
+
+class _BoundedText:
+    """Text accumulator keeping up to limit characters and counting the dropped ones"""
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+        self.dropped = 0
+
+    def add(self, data: str):
+        """Append the data if it fits"""
+        kept = data[:max(self.limit - self.size, 0)]
+        if kept:
+            self.parts.append(kept)
+            self.size += len(kept)
+        self.dropped += len(data) - len(kept)
+
+    def __str__(self):
+        text = "".join(self.parts).strip()
+        if self.dropped:
+            text += f"\n... [{self.dropped} characters truncated]"
+        return text
+
+
+class _JUnitTarget:
+    """
+    XMLParser target turning testcase elements into custom format executions. No element tree
+    is built: only the current test case and at most max_output characters of each of its
+    failure, system-out and system-err blocks are kept, test suite level output is dropped.
+    """
+    def __init__(self, source: str, max_output: int):
+        self.source = source
+        self.max_output = max_output
+        self.executions = []
+        self._case = None
+        self._text = None
+
+    def start(self, tag, attrib):
+        """Element start callback"""
+        if tag == "testcase":
+            self._case = {"name": attrib.get("name", ""), "classname": attrib.get("classname"),
+                          "result": "Passed", "comments": []}
+        elif self._case is not None and tag in RESULTS:
+            if self._case["result"] != "Failed":
+                self._case["result"] = RESULTS[tag]
+            self._text = _BoundedText(self.max_output)
+            if attrib.get("message"):
+                self._text.add(attrib["message"] + "\n")
+        elif self._case is not None and tag in OUTPUTS and self.max_output:
+            self._text = _BoundedText(self.max_output)
+
+    def data(self, data):
+        """Text callback"""
+        if self._text is not None:
+            self._text.add(data)
+
+    def end(self, tag):
+        """Element end callback"""
+        if tag == "testcase" and self._case is not None:
+            self.executions.append(self._execution(self._case))
+            self._case = None
+        elif self._text is not None and (tag in RESULTS or tag in OUTPUTS):
+            comment = str(self._text)
+            if comment:
+                self._case["comments"].append(comment)
+            self._text = None
+
+    def close(self):
+        """Parsing end callback"""
+
+    def _execution(self, case: dict) -> dict:
+        name = ".".join(filter(None, (case["classname"], case["name"])))
+        test_case = {"name": name}
+        key = TEST_CASE_KEY.search(name)
+        if key:
+            test_case["key"] = key.group()
+        execution = {"source": self.source, "result": case["result"], "testCase": test_case}
+        if case["comments"]:
+            execution["comment"] = "\n\n".join(case["comments"])
+        return execution
+
+
+def junit_files(reports) -> list:
+    """
+    Get JUnit XML report paths.
+
+    :param reports: path to a report file, path to a directory with .xml reports
+        (searched recursively) or an iterable with report file paths
+    :return: list with paths
+    """
+    if not isinstance(reports, (str, os.PathLike)):
+        return [os.fspath(report) for report in reports]
+    reports = os.fspath(reports)
+    if not os.path.isdir(reports):
+        return [reports]
+    paths = []
+    for root, dirs, files in os.walk(reports):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".xml"))
+    return paths
+
+
+def iter_junit_executions(source, max_output: int = MAX_OUTPUT, chunk_size: int = CHUNK_SIZE):
+    """
+    Parse a JUnit XML report incrementally into Zephyr Scale custom results format executions.
+    The report is fed to the parser in chunks and no element tree is built, so memory does not
+    depend on the report size.
+
+    Test cases with a failure or an error are Failed, skipped ones are Not Executed, the rest
+    are Passed. The test case is matched by classname.name, or by a test case key (like
+    PROJ-T1) if there is one in the name. Failure messages and test case output are put into
+    the comment, each block truncated to max_output characters.
+
+    :param source: path to a report or a binary file object
+    :param max_output: max number of characters kept from each failure, system-out and
+        system-err block, 0 to drop the output
+    :param chunk_size: size of chunks the report is read with
+
+    :return: generator with execution dicts
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            yield from iter_junit_executions(file, max_output, chunk_size)
+        return
+
+    target = _JUnitTarget(os.path.basename(getattr(source, "name", "") or "junit.xml"),
+                          max_output)
+    parser = XMLParser(target=target)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+        executions, target.executions = target.executions, []
+        yield from executions
+    parser.close()
+    yield from target.executions
+
+
+def shard_executions(executions, max_bytes: int = MAX_SHARD_BYTES):
+    """
+    Pack executions into custom results format json documents of a bounded size. Only one
+    document is held in memory at a time.
+
+    :param executions: iterable with execution dicts
+    :param max_bytes: max size of a document, a single execution larger than that makes
+        a document on its own
+
+    :return: generator with json documents as bytes
+    """
+    header, separator, footer = b'{"version": 1, "executions": [', b", ", b"]}"
+    parts = []
+    size = len(header) + len(footer)
+    for execution in executions:
+        data = json.dumps(execution).encode("utf-8")
+        if parts and size + len(separator) + len(data) > max_bytes:
+            yield header + separator.join(parts) + footer
+            parts = []
+            size = len(header) + len(footer)
+        size += len(data) + (len(separator) if parts else 0)
+        parts.append(data)
+    if parts:
+        yield header + separator.join(parts) + footer
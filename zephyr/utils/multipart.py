@@ -0,0 +1,239 @@
+"""Streaming multipart/form-data encoding of request bodies"""
+import io
+import os
+import uuid
+from collections.abc import Iterable, Iterator
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _quote(value: str) -> str:
+    """Escape a header parameter value like browsers do (HTML5 form encoding)"""
+    return value.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def _to_bytes(value) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else value
+
+
+def form_fields(data) -> list:
+    """
+    Get form fields of request data the way requests encodes data sent along with files:
+    None values are dropped, a list value makes a field per element, and values other
+    than str and bytes are converted with str.
+
+    :param data: dict or iterable with (name, value) pairs
+    :return: list with (name, value) pairs
+    """
+    fields = []
+    for name, values in (data.items() if isinstance(data, dict) else data or ()):
+        if isinstance(values, (str, bytes)) or not hasattr(values, "__iter__"):
+            values = [values]
+        fields.extend((name, value if isinstance(value, (str, bytes)) else str(value))
+                      for value in values if value is not None)
+    return fields
+
+
+def _content(value, file_content: bool):
+    """
+    Part content: bytes, a file object or an iterable with chunks. Iterators are streamed,
+    other iterables only if they are file contents (like ZipStream), other values are
+    converted with str.
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        return _to_bytes(value)
+    if (hasattr(value, "read") or isinstance(value, Iterator)
+            or (file_content and isinstance(value, Iterable))):
+        return value
+    return str(value).encode("utf-8")
+
+
+def _remaining_size(content):
+    """Number of bytes left to read from a file object, None if it is unknown"""
+    try:
+        return os.fstat(content.fileno()).st_size - content.tell()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+    try:
+        position = content.tell()
+        size = content.seek(0, io.SEEK_END) - position
+        content.seek(position)
+        return size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+class _Part:
+    """
+    A part of the body: the encoded headers and the content which is bytes, a file object
+    or an iterable with bytes chunks.
+    """
+    def __init__(self, boundary: str, name: str, value):
+        filename, content_type = None, None
+        file_content = isinstance(value, (tuple, list))
+        if file_content:
+            filename, value, *rest = value
+            content_type = rest[0] if rest else None
+        elif hasattr(value, "read"):
+            filename = os.path.basename(getattr(value, "name", "") or "") or name
+
+        disposition = f'form-data; name="{_quote(name)}"'
+        if filename is not None:
+            disposition += f'; filename="{_quote(filename)}"'
+        headers = f"--{boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type:
+            headers += f"Content-Type: {content_type}\r\n"
+        self.headers = (headers + "\r\n").encode("utf-8")
+
+        self.content = _content(value, file_content)
+        self.start = None
+        if isinstance(self.content, (bytes, bytearray)):
+            self.size = len(self.content)
+        elif hasattr(self.content, "read"):
+            self.size = _remaining_size(self.content)
+            try:
+                self.start = self.content.tell()
+            except (OSError, io.UnsupportedOperation):
+                pass
+        else:
+            self.size = None
+
+    @property
+    def rewindable(self) -> bool:
+        """Whether the content could be read again: bytes, a seekable file or a re-iterable"""
+        if hasattr(self.content, "read"):
+            return self.start is not None
+        return not isinstance(self.content, Iterator)
+
+    def rewind(self):
+        """Seek the file object back to the position the part has started at"""
+        if self.start is not None:
+            self.content.seek(self.start)
+
+    def chunks(self, chunk_size: int):
+        """Generator with the encoded part"""
+        yield self.headers
+        if isinstance(self.content, (bytes, bytearray)):
+            yield bytes(self.content)
+        elif hasattr(self.content, "read"):
+            while True:
+                chunk = self.content.read(chunk_size)
+                if not chunk:
+                    break
+                yield _to_bytes(chunk)
+        else:
+            for chunk in self.content:
+                yield _to_bytes(chunk)
+        yield b"\r\n"
+
+
+class MultipartEncoder:  # pylint: disable=too-many-instance-attributes
+    """
+    Streaming multipart/form-data request body. File contents are read in chunks while
+    the body is sent, so memory does not depend on their size. It is passed to requests as
+    data with the content_type as Content-Type header:
+
+        body = MultipartEncoder([("file", ("report.zip", open("report.zip", "rb")))])
+        session.post(url, data=body, headers={"Content-Type": body.content_type})
+
+    The len attribute with the body size is set only if the sizes of all the parts are known,
+    otherwise the body is sent with chunked transfer encoding.
+
+    :param fields: dict or list with (name, value) pairs, values are str, bytes, file objects,
+        iterators with bytes chunks or tuples (filename, content[, content_type]) with content
+        being str, bytes, a file object or an iterable with bytes chunks (filename could be None),
+        like requests files argument. Other values (e.g. numbers) are converted with str.
+        The body could be rewound unless it has an unseekable file or an iterator part
+    :param boundary: boundary string, generated by default
+    :param chunk_size: size of chunks file contents are read with
+    :param callback: callable(read_bytes, total_bytes) called while the body is read,
+        total_bytes is None if the size is unknown
+    """
+    def __init__(self, fields, boundary: str = None, chunk_size: int = CHUNK_SIZE,
+                 callback=None):
+        self.boundary = boundary or uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.callback = callback
+        if isinstance(fields, dict):
+            fields = fields.items()
+        self._parts = [_Part(self.boundary, name, value) for name, value in fields]
+        self._closing = f"--{self.boundary}--\r\n".encode("utf-8")
+        sizes = [part.size for part in self._parts]
+        if None not in sizes:
+            self.len = (sum(len(part.headers) + 2 for part in self._parts) + sum(sizes)
+                        + len(self._closing))
+        self._position = 0
+        self._buffer = b""
+        self._iterator = self._chunks()
+
+    @property
+    def content_type(self) -> str:
+        """Content-Type header value"""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _chunks(self):
+        for part in self._parts:
+            yield from part.chunks(self.chunk_size)
+        yield self._closing
+
+    def _advance(self, data: bytes) -> bytes:
+        self._position += len(data)
+        if self.callback and data:
+            self.callback(self._position, getattr(self, "len", None))
+        return data
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read the encoded body.
+
+        :param size: max number of bytes to read, all the rest by default
+        :return: bytes, empty at the end of the body
+        """
+        if size is None or size < 0:
+            data = self._buffer + b"".join(self._iterator)
+            self._buffer = b""
+            return self._advance(data)
+
+        chunks = [self._buffer]
+        available = len(self._buffer)
+        while available < size:
+            chunk = next(self._iterator, None)
+            if chunk is None:
+                break
+            chunks.append(chunk)
+            available += len(chunk)
+        data = b"".join(chunks)
+        self._buffer = data[size:]
+        return self._advance(data[:size])
+
+    def __iter__(self):
+        while True:
+            data = self.read(self.chunk_size)
+            if not data:
+                return
+            yield data
+
+    def tell(self) -> int:
+        """Number of bytes read"""
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """
+        Rewind the body to the beginning to send it again, e.g. on a retry.
+        Only seeking to the beginning is supported.
+
+        :raises: io.UnsupportedOperation if the body could not be rewound
+        """
+        if (offset, whence) != (0, io.SEEK_SET):
+            raise io.UnsupportedOperation("Multipart body could be rewound to the beginning only")
+        if self._position == 0:
+            return 0
+        if not all(part.rewindable for part in self._parts):
+            raise io.UnsupportedOperation("Multipart body with an iterator part is not rewindable")
+        for part in self._parts:
+            part.rewind()
+        self._position = 0
+        self._buffer = b""
+        self._iterator = self._chunks()
+        return 0
@@ -0,0 +1,141 @@
+"""Zip archives produced on the fly as a stream of bytes chunks"""
+import os
+import queue
+import threading
+import zipfile
+
+
+CHUNK_SIZE = 64 * 1024
+_END = object()
+
+
+class _Stopped(Exception):
+    """The consumer has stopped reading the archive"""
+
+
+class _QueueWriter:
+    """Unseekable file object passing the written data to a queue in chunks of chunk_size"""
+    def __init__(self, chunks: queue.Queue, stop: threading.Event, chunk_size: int):
+        self._chunks = chunks
+        self._stop = stop
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        """Buffer the data, put full chunks to the queue"""
+        self._buffer += data
+        if len(self._buffer) >= self._chunk_size:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        """Put the buffered data to the queue"""
+        if self._buffer:
+            self.put(bytes(self._buffer))
+            self._buffer = bytearray()
+
+    def put(self, item):
+        """Put an item to the queue waiting for a free slot, unless the consumer has stopped"""
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Stopped
+
+
+def _walk(directory: str, prefix: str = ""):
+    """Generator with (path, arcname) of the files in a directory tree, in a stable order"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            arcname = os.path.relpath(path, directory).replace(os.sep, "/")
+            yield path, f"{prefix}/{arcname}" if prefix else arcname
+
+
+class ZipStream:
+    """
+    Zip archive of report files produced on the fly. Iterating over it yields the archive
+    in bytes chunks, while the files are compressed in a background thread, so compression
+    overlaps with sending the chunks and the archive is never written to disk. At most
+    queue_size chunks are buffered in memory.
+
+    Every iteration produces the archive anew, so a request with it could be retried.
+
+        session.post(url, data=ZipStream("reports/"))
+
+    :param files: path to a directory with the files, archived with paths relative to it,
+        or an iterable with file paths (archived by their base names), directory paths
+        (archived as sub-directories) or (arcname, path or bytes content) tuples
+    :param compression: zipfile compression method
+    :param chunk_size: min size of the chunks yielded
+    :param queue_size: max number of chunks buffered ahead of the consumer
+    """
+    def __init__(self, files, compression: int = zipfile.ZIP_DEFLATED,
+                 chunk_size: int = CHUNK_SIZE, queue_size: int = 16):
+        self.files = files if isinstance(files, (str, os.PathLike)) else list(files)
+        self.compression = compression
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+
+    @property
+    def filename(self) -> str:
+        """Archive file name to be sent: the directory name or reports.zip"""
+        if isinstance(self.files, (str, os.PathLike)):
+            name = os.path.basename(os.path.normpath(os.fspath(self.files)))
+            return f"{name or 'reports'}.zip"
+        return "reports.zip"
+
+    def entries(self):
+        """
+        Files to be archived.
+
+        :return: generator with (path or bytes content, arcname) tuples
+        """
+        if isinstance(self.files, (str, os.PathLike)):
+            yield from _walk(os.fspath(self.files))
+            return
+        for entry in self.files:
+            arcname, path = entry if isinstance(entry, tuple) else (None, os.fspath(entry))
+            if arcname is None and os.path.isdir(path):
+                yield from _walk(path, os.path.basename(os.path.normpath(path)))
+            else:
+                yield path, arcname or os.path.basename(path)
+
+    def _produce(self, chunks: queue.Queue, stop: threading.Event):
+        writer = _QueueWriter(chunks, stop, self.chunk_size)
+        try:
+            with zipfile.ZipFile(writer, "w", compression=self.compression) as archive:
+                for path, arcname in self.entries():
+                    if isinstance(path, (bytes, bytearray)):
+                        archive.writestr(arcname, path)
+                    else:
+                        archive.write(path, arcname)
+            writer.flush()
+            writer.put(_END)
+        except _Stopped:
+            pass
+        except Exception as error:  # pylint: disable=broad-except
+            try:
+                writer.put(error)
+            except _Stopped:
+                pass
+
+    def __iter__(self):
+        chunks = queue.Queue(self.queue_size)
+        stop = threading.Event()
+        producer = threading.Thread(target=self._produce, args=(chunks, stop), daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            producer.join()